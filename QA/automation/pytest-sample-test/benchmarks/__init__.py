@@ -0,0 +1 @@
+"""Microbenchmarks for the test harness building blocks."""
@@ -0,0 +1,75 @@
+"""
+Run the harness microbenchmarks.
+
+    python -m benchmarks                    # run and compare with the baseline
+    python -m benchmarks --save-baseline    # run and store results as the baseline
+    python -m benchmarks --check            # fail on regressions against the baseline
+    python -m benchmarks -k validate        # only benchmarks whose name contains "validate"
+
+Exits with status 1 when --check finds a regression against the baseline.
+The baseline is committed as benchmarks/baseline.json.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks.runner import load_baseline, measure, regressions, save_baseline
+from benchmarks.suite import collect
+from utils.metrics import format_table
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Harness microbenchmarks")
+    parser.add_argument("-k", dest="selected", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file (default benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown or allocation growth as a fraction (default 0.2)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds spent timing each benchmark")
+    args = parser.parse_args(argv)
+
+    baseline = load_baseline(args.baseline)
+    results = []
+    rows = []
+    for benchmark in collect(args.selected):
+        result = measure(benchmark, min_time=args.min_time)
+        results.append(result)
+        reference = baseline.get(result.name)
+        rows.append((
+            result.name,
+            f"{result.ops_per_sec:,.0f}",
+            f"{1e6 / result.ops_per_sec:,.2f}",
+            f"{result.peak_bytes / 1024:,.1f}",
+            f"{(result.ops_per_sec / reference.ops_per_sec - 1) * 100:+.1f}%" if reference else "-",
+        ))
+        print(f"{result.name}: {result.ops_per_sec:,.0f} ops/s", file=sys.stderr)
+
+    print()
+    for line in format_table(("benchmark", "ops/s", "us/op", "peak KiB", "vs baseline"), rows):
+        print(line)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nbaseline saved to {args.baseline}")
+        return 0
+
+    if args.check:
+        if not baseline:
+            print(f"\nno baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        problems = regressions(results, baseline, tolerance=args.tolerance)
+        if problems:
+            print(f"\n{len(problems)} regressions beyond {args.tolerance * 100:.0f}%:")
+            for problem in problems:
+                print(f"  {problem}")
+            return 1
+        print(f"\nno regressions beyond {args.tolerance * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
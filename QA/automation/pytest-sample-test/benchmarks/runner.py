@@ -0,0 +1,116 @@
+"""
+Timing, allocation measurement and baseline comparison for benchmarks.
+
+Throughput is the best of several timed repeats after auto-calibrating
+the loop count. Memory is the tracemalloc peak of a single warm call,
+i.e. the most the operation holds at once.
+"""
+import gc
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Callable, List, Optional
+
+
+@dataclass
+class Benchmark:
+    """One registered operation at one payload size."""
+    name: str
+    func: Callable[[], Any]
+
+
+@dataclass
+class Result:
+    """Measured throughput and peak allocation of a benchmark."""
+    name: str
+    ops_per_sec: float
+    peak_bytes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _time(func: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def measure(benchmark: Benchmark, min_time: float = 0.2, repeats: int = 5) -> Result:
+    """Measure ops/sec (best of repeats) and peak bytes of one call."""
+    func = benchmark.func
+    func()
+
+    number = 1
+    while _time(func, number) < min_time / repeats:
+        number *= 2
+
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = min(_time(func, number) for _ in range(repeats))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return Result(benchmark.name, number / best if best else float("inf"), max(peak - baseline, 0))
+
+
+def load_baseline(path: str) -> Dict[str, Result]:
+    """Read a baseline written by save_baseline(), or {} when absent."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as baseline_file:
+        return {name: Result(**data) for name, data in json.load(baseline_file)["results"].items()}
+
+
+def save_baseline(path: str, results: List[Result]):
+    """Merge results into the baseline file, keeping benchmarks not run this time."""
+    merged = load_baseline(path)
+    merged.update({result.name: result for result in results})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as baseline_file:
+        json.dump({"results": {name: merged[name].to_dict() for name in sorted(merged)}}, baseline_file, indent=2)
+
+
+def regressions(
+    results: List[Result],
+    baseline: Dict[str, Result],
+    tolerance: float = 0.2,
+    memory_slack: int = 1024
+) -> List[str]:
+    """
+    Describe every result slower than its baseline by more than tolerance,
+    or allocating more than tolerance (plus a small absolute slack) above it.
+    """
+    problems = []
+    for result in results:
+        reference: Optional[Result] = baseline.get(result.name)
+        if reference is None:
+            continue
+        if result.ops_per_sec < reference.ops_per_sec * (1 - tolerance):
+            problems.append(
+                f"{result.name}: {result.ops_per_sec:,.0f} ops/s vs baseline {reference.ops_per_sec:,.0f} "
+                f"({_change(result.ops_per_sec, reference.ops_per_sec)})"
+            )
+        if result.peak_bytes > reference.peak_bytes * (1 + tolerance) + memory_slack:
+            problems.append(
+                f"{result.name}: peak {result.peak_bytes:,} B vs baseline {reference.peak_bytes:,} B "
+                f"({_change(result.peak_bytes, reference.peak_bytes)})"
+            )
+    return problems
+
+
+def _change(value: float, reference: float) -> str:
+    return f"{(value / reference - 1) * 100:+.1f}%" if reference else "new"
@@ -0,0 +1,249 @@
+"""
+Benchmarks of the harness building blocks, run offline on canned responses.
+
+Payload-dependent operations run at several list sizes. Names are
+``<operation>[<size>]`` so results line up with the stored baseline.
+"""
+import io
+import json
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from benchmarks.runner import Benchmark
+
+
+PAYLOAD_SIZES = (1, 100, 5000)
+BASE_URL = "http://petstore.bench/api"
+
+_REGISTRY: List[Tuple[str, Callable[..., Callable[[], Any]], Tuple[Any, ...]]] = []
+
+
+def benchmark(name: str, sizes: Tuple[Any, ...] = (None,)):
+    """Register a factory that builds the operation to time for each size."""
+    def register(factory: Callable[..., Callable[[], Any]]):
+        _REGISTRY.append((name, factory, sizes))
+        return factory
+    return register
+
+
+def collect(selected: str = "") -> Iterator[Benchmark]:
+    """Build every registered benchmark whose name contains ``selected``."""
+    for name, factory, sizes in _REGISTRY:
+        for size in sizes:
+            full_name = name if size is None else f"{name}[{size}]"
+            if selected in full_name:
+                yield Benchmark(full_name, factory() if size is None else factory(size))
+
+
+def _pets(count: int) -> List[Dict[str, Any]]:
+    from utils.data_factory import DataFactory
+    factory = DataFactory(seed=0, namespace="bench")
+    pets = []
+    for pet_id in range(1, count + 1):
+        pet = factory.pet()
+        pet["id"] = pet_id
+        pet["tags"] = [{"id": 1, "name": "bench"}]
+        pets.append(pet)
+    return pets
+
+
+def _body(count: int) -> bytes:
+    return json.dumps(_pets(count)).encode()
+
+
+class CannedAdapter(HTTPAdapter):
+    """Transport adapter that answers every request with the same JSON body."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        super().__init__()
+
+    def send(self, request, **kwargs):
+        raw = HTTPResponse(
+            body=io.BytesIO(self.body),
+            headers={"Content-Type": "application/json", "Content-Length": str(len(self.body))},
+            status=200,
+            preload_content=False,
+            decode_content=False
+        )
+        return self.build_response(request, raw)
+
+
+def _canned_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    response.encoding = "utf-8"
+    return response
+
+
+def _canned_session(body: bytes) -> requests.Session:
+    session = requests.Session()
+    session.mount("http://", CannedAdapter(body))
+    return session
+
+
+# Responses and requests
+
+@benchmark("api_response_json", PAYLOAD_SIZES)
+def _api_response_json(size: int):
+    from utils.api_helpers import APIResponse
+    body = _body(size)
+    return lambda: APIResponse(_canned_response(body), elapsed=0.0).json_data
+
+
+@benchmark("api_response_status_only", PAYLOAD_SIZES)
+def _api_response_status_only(size: int):
+    from utils.api_helpers import APIResponse
+    body = _body(size)
+    return lambda: APIResponse(_canned_response(body), elapsed=0.0).is_success()
+
+
+@benchmark("make_get_request", PAYLOAD_SIZES)
+def _make_get_request(size: int):
+    from utils.api_helpers import make_get_request
+    session = _canned_session(_body(size))
+    url = f"{BASE_URL}/pet/findByStatus"
+    return lambda: make_get_request(session, url, params={"status": "available"}).get_data()
+
+
+@benchmark("make_get_request_stream", PAYLOAD_SIZES)
+def _make_get_request_stream(size: int):
+    from utils.api_helpers import make_get_request
+    session = _canned_session(_body(size))
+    url = f"{BASE_URL}/pet/findByStatus"
+
+    def run():
+        for _ in make_get_request(session, url, params={"status": "available"}, stream=True).iter_items():
+            pass
+    return run
+
+
+@benchmark("make_post_request")
+def _make_post_request():
+    from utils.api_helpers import make_post_request
+    pet = _pets(1)[0]
+    session = _canned_session(json.dumps(pet).encode())
+    url = f"{BASE_URL}/pet"
+    return lambda: make_post_request(session, url, json_data=pet).get_data()
+
+
+@benchmark("endpoint_key")
+def _endpoint_key():
+    from utils.metrics import endpoint_key
+    return lambda: endpoint_key("GET", f"{BASE_URL}/pet/12345")
+
+
+@benchmark("record_request")
+def _record_request():
+    from utils.metrics import MetricsRecorder, endpoint_key
+    recorder = MetricsRecorder()
+    return lambda: recorder.record(endpoint_key("GET", f"{BASE_URL}/pet/12345"), 0.0123)
+
+
+# Validation and parsing
+
+@benchmark("validate_pet_structure", PAYLOAD_SIZES)
+def _validate_pet_structure(size: int):
+    from utils.validators import validate_pet_structure
+    pets = _pets(size)
+    return lambda: all(validate_pet_structure(pet) for pet in pets)
+
+
+@benchmark("schema_validate_many", PAYLOAD_SIZES)
+def _schema_validate_many(size: int):
+    from utils.validators import get_schema_validator
+    validator = get_schema_validator("Pet")
+    pets = _pets(size)
+    return lambda: validator.validate_many(pets)
+
+
+@benchmark("schema_validate_stream", PAYLOAD_SIZES)
+def _schema_validate_stream(size: int):
+    from utils.validators import get_schema_validator
+    validator = get_schema_validator("Pet")
+    pets = _pets(size)
+    return lambda: validator.validate_stream(iter(pets))
+
+
+@benchmark("iter_json_array", PAYLOAD_SIZES)
+def _iter_json_array(size: int):
+    from utils.streaming import iter_json_array
+    body = _body(size)
+    chunks = [body[offset:offset + 65536] for offset in range(0, len(body), 65536)]
+    return lambda: sum(1 for _ in iter_json_array(chunks))
+
+
+@benchmark("json_loads", PAYLOAD_SIZES)
+def _json_loads(size: int):
+    body = _body(size)
+    return lambda: json.loads(body)
+
+
+@benchmark("codec_loads", PAYLOAD_SIZES)
+def _codec_loads(size: int):
+    from utils.api_helpers import get_codec
+    codec = get_codec()
+    body = _body(size)
+    return lambda: codec.loads(body)
+
+
+@benchmark("codec_dumps", PAYLOAD_SIZES)
+def _codec_dumps(size: int):
+    from utils.api_helpers import get_codec
+    codec = get_codec()
+    pets = _pets(size)
+    return lambda: codec.dumps(pets)
+
+
+@benchmark("gzip_request_body", PAYLOAD_SIZES)
+def _gzip_request_body(size: int):
+    from utils.api_helpers import compress_body
+    body = _body(size)
+    return lambda: compress_body(body, "gzip")
+
+
+# Test data
+
+@benchmark("data_factory_pet")
+def _data_factory_pet():
+    from utils.data_factory import DataFactory
+    factory = DataFactory(seed=0, namespace="bench")
+    return factory.pet
+
+
+@benchmark("data_factory_order")
+def _data_factory_order():
+    from utils.data_factory import DataFactory
+    factory = DataFactory(seed=0, namespace="bench")
+    return factory.order
+
+
+@benchmark("data_factory_user")
+def _data_factory_user():
+    from utils.data_factory import DataFactory
+    factory = DataFactory(seed=0, namespace="bench")
+    return factory.user
+
+
+# conftest.py building blocks
+
+@benchmark("create_session")
+def _create_session():
+    from conftest import APIConfig, _create_session
+    api_config = APIConfig(base_url=BASE_URL)
+
+    def run():
+        _create_session(api_config).close()
+    return run
+
+
+@benchmark("cassette_request_key")
+def _cassette_request_key():
+    from utils.cassette import request_key
+    pet = _pets(1)[0]
+    request = requests.Request("POST", f"{BASE_URL}/pet", json=pet).prepare()
+    return lambda: request_key(request)
@@ -1,19 +1,389 @@
 """
 Pytest configuration and shared fixtures for Petstore API testing.
+
+The terminal summary and the option groups with hooks of their own live
+in the plugins under utils/plugins, registered below. Modules only some
+runs need (asyncio for the async client, the load and soak runners, the
+dist coordinator) are imported where they are used, so every xdist
+worker starts quickly.
 """
+# Imported first: marks the end of interpreter and plugin start-up.
+from utils.startup import COLLECTION, CONFIGURE, CONFTEST, startup_profiler
+
+import functools
+import glob
+import json
 import os
+import random
+import tempfile
+import time
+import uuid
 import pytest
 import requests
-from typing import Generator, Dict, Any, Optional
+from typing import TYPE_CHECKING, Generator, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+from utils.api_helpers import configure_transport
+from utils.cassette import Cassette, mount_cassette, read_metadata, write_metadata
+from utils.cleanup import CleanupEngine
+from utils.data_factory import DataFactory
+from utils.deadline import DeadlineBudget
+from utils.durations import DurationStore, run_durations, shared_fixture_time
+from utils.http_pool import build_retry, collect_pool_stats, mount_pooled_adapter, pool_totals, reset_pool_stats
+from utils.id_space import INTERFERENCE_MODES, IdScope, IdSpace, InterferenceDetector, worker_slot
+from utils.petstore_emulator import INPROC_HOST, InProcessAdapter, PetstoreEmulator, resolve_inproc_url
+from utils.metrics import export_stats, payload_metrics, request_metrics
+from utils.plugins.state import (
+    deadline_key, deadline_rejected_key, dist_coordinator_address, dist_coordinator_key, dist_worker_key,
+    id_space_key, is_worker, merge_worker_output, pool_stats_key, rate_limiter_key, results_run_key,
+    results_sink_key, startup_key, warmup_key, worker_input, worker_output, worker_settings
+)
+from utils.rate_limit import MODES as RATE_LIMIT_MODES, SharedRateLimiter
+from utils.resource_pool import ResourcePool
+from utils.results_sink import ResultsSink, clear_segments, merge_segments
+from utils.sla import SLASampler
+from utils.warmup import READY_STATUSES, APINotReady, WarmupReport, prewarm, wait_until_ready
+
+if TYPE_CHECKING:
+    from utils.async_helpers import AsyncAPIClient
+
+startup_profiler.mark(CONFTEST)
+
+
+pytest_plugins = [
+    "utils.plugins.load",
+    "utils.plugins.soak",
+    "utils.plugins.dist",
+    "utils.plugins.impact",
+    "utils.plugins.summary",
+]
+
+
+def pytest_addoption(parser):
+    """Register the harness command line options; the plugins under utils/plugins register their own."""
+    parser.addoption("--data-seed", type=int, default=None,
+                     help="Seed for generated test data; reuse the seed printed in the header to replay a run")
+    parser.addoption("--record-cassette", default=None, metavar="DIR",
+                     help="Record every request/response pair into this cassette directory")
+    parser.addoption("--replay-cassette", default=None, metavar="DIR",
+                     help="Serve responses from this cassette directory without network access")
+    parser.addoption("--cleanup-mode", choices=("immediate", "deferred"), default="immediate",
+                     help="Delete id-keyed resources after each test, or in one batch at session end")
+    parser.addoption("--cleanup-workers", type=int, default=8,
+                     help="Maximum number of concurrent cleanup deletes")
+    parser.addoption("--pool-size", type=int, default=2,
+                     help="Pets, orders and users pre-created per batch by the shared resource pool")
+    parser.addoption("--interference", choices=INTERFERENCE_MODES, default="report",
+                     help="Watch responses for tests touching each other's resources: report findings, "
+                          "also fail the run on any, or turn the check off")
+    parser.addoption("--run-deadline", type=float, default=float(os.getenv("API_RUN_DEADLINE", "0")),
+                     help="Whole-run time budget in seconds; request timeouts shrink as it runs out (0 disables)")
+    parser.addoption("--rate-limit", choices=RATE_LIMIT_MODES, default=os.getenv("API_RATE_LIMIT", "off"),
+                     help="Client-side rate limit shared by all xdist workers: adaptive finds the max safe "
+                          "throughput, fixed caps requests at --rate-limit-rps")
+    parser.addoption("--rate-limit-rps", type=float, default=float(os.getenv("API_RATE_LIMIT_RPS", "0")),
+                     help="Requests per second across all workers; the cap for fixed, a ceiling for adaptive (0: none)")
+    parser.addoption("--rate-limit-concurrency", type=int, default=int(os.getenv("API_RATE_LIMIT_CONCURRENCY", "8")),
+                     help="Adaptive: starting number of in-flight requests across all workers")
+    parser.addoption("--rate-limit-latency-ms", type=float, default=float(os.getenv("API_RATE_LIMIT_LATENCY_MS", "1000")),
+                     help="Adaptive: responses slower than this halve the in-flight limit")
+    parser.addoption("--import-profile", action="store_true", default=False,
+                     help="Report each process's start-up and collection time and fail the run when one exceeds --import-budget")
+    parser.addoption("--import-budget", type=float, default=float(os.getenv("API_IMPORT_BUDGET", "2.0")),
+                     help="Start-up plus collection budget in seconds per process for --import-profile (0: report only)")
+    parser.addoption("--durations-store", default="reports/durations.json",
+                     help="Per-test durations kept across runs to schedule xdist workers longest first (empty to disable)")
+    parser.addoption("--results-dir", default="reports/results",
+                     help="Stream one JSON line per finished test into <dir>/<worker>.jsonl, merged at the end (empty to disable)")
+    parser.addoption("--latency-report", default="reports/latency.json",
+                     help="Write per-endpoint request latency percentiles to this JSON file (empty to disable)")
+
+
+def pytest_configure(config):
+    """Validate options, pick the data seed, prepare cassettes, pick the JSON codec and start the run deadline clock, rate limiter and results sink."""
+    record_dir = config.getoption("record_cassette")
+    replay_dir = config.getoption("replay_cassette")
+    if record_dir and replay_dir:
+        raise pytest.UsageError("--record-cassette and --replay-cassette are mutually exclusive")
+    
+    workerinput = worker_input(config)
+    if "data_seed" in workerinput:
+        config.option.data_seed = workerinput["data_seed"]
+    elif config.getoption("data_seed") is None:
+        # Replays reuse the recorded seed so request bodies match the cassette.
+        recorded_seed = read_metadata(replay_dir).get("data_seed") if replay_dir else None
+        config.option.data_seed = recorded_seed if recorded_seed is not None else random.randrange(2 ** 32)
+    
+    try:
+        slot = workerinput.get("worker_slot", None)
+        id_space = IdSpace(
+            config.getoption("data_seed"),
+            slot if slot is not None else worker_slot(workerinput.get("workerid", "main"))
+        )
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+    config.stash[id_space_key] = id_space
+    if config.getoption("interference") != "off":
+        InterferenceDetector(id_space)
+    
+    if record_dir and not workerinput:
+        for segment_file in glob.glob(os.path.join(record_dir, "*.data")) + glob.glob(os.path.join(record_dir, "*.idx")):
+            os.remove(segment_file)
+        write_metadata(record_dir, {"data_seed": config.getoption("data_seed")})
+    
+    try:
+        configure_transport(
+            codec=os.getenv("API_JSON_CODEC", "auto"),
+            request_encoding=os.getenv("API_REQUEST_ENCODING", "").lower() or None,
+            compress_min_bytes=int(os.getenv("API_COMPRESS_MIN_BYTES", "1024"))
+        )
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+    
+    if config.getoption("run_deadline") > 0:
+        config.stash[deadline_key] = DeadlineBudget(config.getoption("run_deadline"))
+    
+    if config.getoption("rate_limit") != "off":
+        _configure_rate_limit(config, workerinput)
+    
+    results_dir = config.getoption("results_dir")
+    if results_dir and not (config.getoption("load") or config.getoption("soak")):
+        _configure_results_sink(config, workerinput, results_dir)
+
+
+def _configure_results_sink(config, workerinput: Dict[str, Any], results_dir: str):
+    """Open this process's results segment; the xdist controller and dist coordinator only merge the workers' segments."""
+    if workerinput:
+        if "results_run_id" in workerinput:
+            run_id = config.stash[results_run_key] = workerinput["results_run_id"]
+            config.stash[results_sink_key] = ResultsSink(results_dir, workerinput["workerid"], run_id)
+        return
+    
+    clear_segments(results_dir)
+    run_id = config.stash[results_run_key] = uuid.uuid4().hex
+    if not (config.getoption("numprocesses", None) or dist_coordinator_address(config)):
+        config.stash[results_sink_key] = ResultsSink(results_dir, "main", run_id)
+
+
+def _configure_rate_limit(config, workerinput: Dict[str, Any]):
+    """Create the shared limiter state on the controller; xdist workers attach to the same file."""
+    path = workerinput.get("rate_limit_state")
+    owner = path is None
+    if owner:
+        handle, path = tempfile.mkstemp(prefix="rate-limit-", suffix=".json")
+        os.close(handle)
+    try:
+        limiter = SharedRateLimiter(
+            path,
+            mode=config.getoption("rate_limit"),
+            rps=config.getoption("rate_limit_rps"),
+            concurrency=config.getoption("rate_limit_concurrency"),
+            latency_target=config.getoption("rate_limit_latency_ms") / 1000
+        )
+    except ValueError as exc:
+        if owner:
+            os.remove(path)
+        raise pytest.UsageError(str(exc))
+    if owner:
+        limiter.initialize()
+    config.stash[rate_limiter_key] = limiter
+
+
+def pytest_unconfigure(config):
+    """Remove the shared rate limiter state once the controller is done."""
+    limiter = config.stash.get(rate_limiter_key, None)
+    if limiter is not None and not hasattr(config, "workerinput"):
+        limiter.close()
+
+
+def pytest_report_header(config):
+    """Show the data seed so a failing run can be replayed, and where results stream to."""
+    lines = [f"data seed: {config.getoption('data_seed')} (replay with --data-seed)"]
+    if results_run_key in config.stash:
+        lines.append(f"results: {config.getoption('results_dir')}/*.jsonl (run {config.stash[results_run_key]})")
+    return lines
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionstart(session):
+    """End the configure phase of the start-up profile, before xdist starts its workers."""
+    startup_profiler.mark(CONFIGURE)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_make_collect_report(collector):
+    """Time the collection, and so the import, of each test module under --import-profile."""
+    if not isinstance(collector, pytest.Module) or not collector.config.getoption("import_profile"):
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    startup_profiler.add_test_module(collector.nodeid, time.perf_counter() - start)
+
+
+def pytest_collection_finish(session):
+    """End the start-up profile: this process is ready to run tests."""
+    startup_profiler.mark(COLLECTION)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Check that every test with an sla marker uses the sla fixture."""
+    for item in items:
+        if item.get_closest_marker("sla") is not None and "sla" not in item.fixturenames:
+            raise pytest.UsageError(f"{item.nodeid} has an sla marker but does not use the sla fixture")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Start capturing the test's requests for the results sink."""
+    sink = item.config.stash.get(results_sink_key, None)
+    if sink is not None:
+        sink.start_test()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    """Time fixtures broader than a function, so the test that happens to set them up is not charged for them."""
+    if fixturedef.scope == "function":
+        yield
+        return
+    with shared_fixture_time.setup():
+        yield
+    # Finalizers run last-in first-out: this one marks the start of the fixture's teardown.
+    fixturedef.addfinalizer(functools.partial(shared_fixture_time.teardown_started, fixturedef))
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    """End the teardown timing of a fixture broader than a function."""
+    if fixturedef.scope != "function":
+        shared_fixture_time.teardown_finished(fixturedef)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attach broad-fixture time to each report and stream each report to the results sink."""
+    outcome = yield
+    report = outcome.get_result()
+    report.shared_fixture_duration = shared_fixture_time.take()
+    
+    sink = item.config.stash.get(results_sink_key, None)
+    if sink is not None:
+        sink.add(report)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """Distribute tests longest first by their durations in previous runs (--dist load only)."""
+    path = config.getoption("durations_store")
+    if not path or config.getoption("dist") != "load":
+        return None
+    from utils.scheduling import DurationScheduling
+    return DurationScheduling(config, log, store=DurationStore(path))
+
+
+def pytest_runtest_logreport(report):
+    """Collect test phase durations, including those reported by xdist and dist workers."""
+    node = getattr(report, "node", None)
+    worker_id = node.gateway.id if node is not None else getattr(report, "dist_worker", "main")
+    run_durations.add(
+        report.nodeid,
+        worker_id,
+        report.duration,
+        finished=report.when == "teardown",
+        shared=getattr(report, "shared_fixture_duration", 0.0)
+    )
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Share the controller's data seed, rate limiter, results run id and impact analysis inputs with each xdist worker."""
+    node.workerinput.update(worker_settings(node.config))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge the stats recorded by an xdist worker."""
+    workeroutput = getattr(node, "workeroutput", {})
+    merge_worker_output(node.config, workeroutput.get("workerid", node.gateway.id), workeroutput)
+
+
+def pytest_sessionfinish(session):
+    """Close the results segment, then hand stats to the xdist controller or dist coordinator, or merge results, check the start-up budget and write the latency report and durations store."""
+    config = session.config
+    sink = config.stash.get(results_sink_key, None)
+    if sink is not None:
+        sink.close(session.exitstatus)
+    
+    if is_worker(config):
+        output = worker_output(config)
+        client = config.stash.get(dist_worker_key, None)
+        if client is not None:
+            client.finish(output)
+        else:
+            config.workeroutput.update(output)
+        return
+    
+    if config.getoption("import_profile"):
+        profiles = config.stash.setdefault(startup_key, {})
+        if config.getoption("numprocesses", None):
+            profiles["controller"] = startup_profiler.profile
+        else:
+            profiles["coordinator" if dist_coordinator_key in config.stash else "main"] = startup_profiler.profile
+        budget_seconds = config.getoption("import_budget")
+        over_budget = budget_seconds > 0 and any(profile.total > budget_seconds for profile in profiles.values())
+        if over_budget and session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    
+    budget = config.stash.get(deadline_key, None)
+    if budget is not None:
+        config.stash[deadline_rejected_key] = config.stash.get(deadline_rejected_key, 0) + budget.rejected
+    
+    detector = config.stash[id_space_key].detector if id_space_key in config.stash else None
+    if detector is not None and detector.total and config.getoption("interference") == "fail":
+        if session.exitstatus == pytest.ExitCode.OK:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+    
+    if pool_totals.requests:
+        config.stash.setdefault(pool_stats_key, {})["main"] = pool_totals
+    
+    durations_path = config.getoption("durations_store")
+    if durations_path and run_durations.tests and not (config.getoption("load") or config.getoption("soak")):
+        store = DurationStore(durations_path)
+        store.update(run_durations.tests)
+        store.save()
+    
+    if results_run_key in config.stash:
+        merge_segments(config.getoption("results_dir"))
+    
+    stats = export_stats(request_metrics.snapshot())
+    path = config.getoption("latency_report")
+    if path and stats:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as report_file:
+            json.dump({"endpoints": stats, "payloads": payload_metrics.export()}, report_file, indent=2)
+
 
 @dataclass
 class APIConfig:
     """API configuration settings."""
     base_url: str
     timeout: int = 30
+    connect_timeout: float = 5.0
     verify_ssl: bool = False
+    max_concurrency: int = 100
+    pool_connections: int = 10
+    pool_maxsize: int = 100
+    pool_block: bool = False
+    keep_alive: bool = True
+    retries: int = 2
+    retry_backoff: float = 0.2
+    retry_statuses: Tuple[int, ...] = (502, 503, 504)
+    ready_timeout: float = 120.0
+    ready_statuses: Tuple[int, ...] = READY_STATUSES
+    warmup_connections: int = 4
+    warmup_rounds: int = 3
+    accept_encoding: str = "gzip, deflate"
+    inproc: bool = False
 
 
 @pytest.fixture(scope="session")
@@ -23,95 +393,391 @@ def api_config() -> APIConfig:
     Reads from environment variables or uses defaults.
     """
     base_url = os.getenv("API_BASE_URL", "http://localhost:8080/api")
+    inproc_url = resolve_inproc_url(base_url)
     timeout = int(os.getenv("API_TIMEOUT", "30"))
+    connect_timeout = float(os.getenv("API_CONNECT_TIMEOUT", str(min(5, timeout))))
     verify_ssl = os.getenv("API_VERIFY_SSL", "false").lower() == "true"
+    max_concurrency = int(os.getenv("API_MAX_CONCURRENCY", "100"))
+    pool_connections = int(os.getenv("API_POOL_CONNECTIONS", "10"))
+    pool_maxsize = int(os.getenv("API_POOL_MAXSIZE", "100"))
+    pool_block = os.getenv("API_POOL_BLOCK", "false").lower() == "true"
+    keep_alive = os.getenv("API_KEEP_ALIVE", "true").lower() == "true"
+    retries = int(os.getenv("API_RETRIES", "2"))
+    retry_backoff = float(os.getenv("API_RETRY_BACKOFF", "0.2"))
+    retry_statuses = tuple(
+        int(status) for status in os.getenv("API_RETRY_STATUSES", "502,503,504").split(",") if status.strip()
+    )
+    ready_timeout = float(os.getenv("API_READY_TIMEOUT", "120"))
+    ready_statuses = tuple(
+        int(status) for status in os.getenv("API_READY_STATUSES", "").split(",") if status.strip()
+    ) or READY_STATUSES
+    warmup_connections = int(os.getenv("API_WARMUP_CONNECTIONS", "4"))
+    warmup_rounds = int(os.getenv("API_WARMUP_ROUNDS", "3"))
+    accept_encoding = os.getenv("API_ACCEPT_ENCODING", "gzip, deflate")
     
     return APIConfig(
-        base_url=base_url,
+        base_url=inproc_url or base_url,
         timeout=timeout,
-        verify_ssl=verify_ssl
+        connect_timeout=connect_timeout,
+        verify_ssl=verify_ssl,
+        max_concurrency=max_concurrency,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        keep_alive=keep_alive,
+        retries=retries,
+        retry_backoff=retry_backoff,
+        retry_statuses=retry_statuses,
+        ready_timeout=ready_timeout,
+        ready_statuses=ready_statuses,
+        warmup_connections=warmup_connections,
+        warmup_rounds=warmup_rounds,
+        accept_encoding=accept_encoding,
+        inproc=inproc_url is not None
     )
 
 
-@pytest.fixture(scope="session")
-def api_client(api_config: APIConfig) -> requests.Session:
-    """
-    Create a reusable requests session for API calls.
-    """
+def _create_session(
+    api_config: APIConfig,
+    budget: Optional[DeadlineBudget] = None,
+    pool_maxsize: Optional[int] = None,
+    emulator: Optional[PetstoreEmulator] = None,
+    cassette: Optional[Cassette] = None,
+    limiter: Optional[SharedRateLimiter] = None,
+    id_space: Optional[IdSpace] = None
+) -> requests.Session:
+    """Build a requests session with the shared headers, TLS, pool, timeout, retry and rate-limit settings and the interference detector."""
     session = requests.Session()
-    session.timeout = api_config.timeout
     session.verify = api_config.verify_ssl
     
+    mount_pooled_adapter(
+        session,
+        pool_connections=api_config.pool_connections,
+        pool_maxsize=pool_maxsize or api_config.pool_maxsize,
+        pool_block=api_config.pool_block,
+        retry=build_retry(api_config.retries, api_config.retry_backoff, api_config.retry_statuses, budget),
+        timeout=(api_config.connect_timeout, api_config.timeout),
+        budget=budget,
+        limiter=limiter
+    )
+    if emulator is not None:
+        base_path = api_config.base_url[len(INPROC_HOST):]
+        session.mount(INPROC_HOST, InProcessAdapter(emulator, base_path=base_path))
+    if cassette is not None:
+        mount_cassette(session, cassette)
+    
     session.headers.update({
         "Content-Type": "application/json",
-        "Accept": "application/json"
+        "Accept": "application/json",
+        "Accept-Encoding": api_config.accept_encoding
     })
+    if not api_config.keep_alive:
+        session.headers["Connection"] = "close"
+    if id_space is not None and id_space.detector is not None:
+        session.hooks["response"].append(id_space.detector.observe)
     
     return session
 
 
+def _close_session(session: requests.Session):
+    """Record the session's connection usage and close it."""
+    pool_totals.add(collect_pool_stats(session))
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def petstore_emulator(api_config: APIConfig) -> Optional[PetstoreEmulator]:
+    """
+    In-process Petstore used when API_BASE_URL is ``inproc://``.
+    None when running against a real server.
+    """
+    return PetstoreEmulator() if api_config.inproc else None
+
+
+@pytest.fixture(scope="session")
+def cassette(pytestconfig) -> Generator[Optional[Cassette], None, None]:
+    """
+    Cassette for --record-cassette / --replay-cassette, one segment per xdist worker.
+    None when neither option is given.
+    """
+    record_dir = pytestconfig.getoption("record_cassette")
+    replay_dir = pytestconfig.getoption("replay_cassette")
+    if not (record_dir or replay_dir):
+        yield None
+        return
+    
+    segment = worker_input(pytestconfig).get("workerid", "main")
+    opened = Cassette(record_dir or replay_dir, "record" if record_dir else "replay", segment=segment)
+    
+    yield opened
+    
+    opened.close()
+
+
+@pytest.fixture(scope="session")
+def api_client(
+    api_config: APIConfig,
+    pytestconfig,
+    petstore_emulator: Optional[PetstoreEmulator],
+    cassette: Optional[Cassette]
+) -> Generator[requests.Session, None, None]:
+    """
+    Create a reusable requests session for API calls.
+    Session scope makes it one pooled session per xdist worker.
+    """
+    session = _create_session(
+        api_config,
+        budget=pytestconfig.stash.get(deadline_key, None),
+        limiter=pytestconfig.stash.get(rate_limiter_key, None),
+        emulator=petstore_emulator,
+        cassette=cassette,
+        id_space=pytestconfig.stash.get(id_space_key, None)
+    )
+    
+    yield session
+    
+    _close_session(session)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def api_warmup(
+    api_client: requests.Session,
+    api_config: APIConfig,
+    pytestconfig,
+    cassette: Optional[Cassette]
+) -> Optional[WarmupReport]:
+    """
+    Wait for the API with backoff, then pre-open pooled connections and warm
+    every endpoint family before the first test. Skipped for the in-process
+    emulator and cassette replays, which have nothing to warm.
+    """
+    if api_config.inproc or (cassette is not None and cassette.mode == "replay"):
+        return None
+    
+    report = WarmupReport()
+    if api_config.ready_timeout > 0:
+        try:
+            wait_until_ready(
+                f"{api_config.base_url}/store/inventory",
+                api_config.ready_timeout,
+                report=report,
+                ready_statuses=api_config.ready_statuses
+            )
+        except APINotReady as exc:
+            pytest.exit(str(exc), returncode=3)
+    _prewarm_session(api_client, api_config, api_config.pool_maxsize, report)
+    pytestconfig.stash.setdefault(warmup_key, {})["main"] = report
+    return report
+
+
+def _prewarm_session(
+    session: requests.Session,
+    api_config: APIConfig,
+    pool_maxsize: int,
+    report: WarmupReport
+):
+    """Warm one session's pool and leave the warm-up out of its pool stats."""
+    prewarm(
+        session,
+        api_config.base_url,
+        connections=min(api_config.warmup_connections, pool_maxsize),
+        rounds=api_config.warmup_rounds,
+        report=report
+    )
+    reset_pool_stats(session)
+
+
+@pytest.fixture(scope="session")
+def async_api_client(
+    api_config: APIConfig,
+    pytestconfig,
+    petstore_emulator: Optional[PetstoreEmulator],
+    cassette: Optional[Cassette],
+    api_warmup: Optional[WarmupReport]
+) -> Generator["AsyncAPIClient", None, None]:
+    """
+    Async API client for fanning out concurrent requests.
+    The connection pool is sized to the concurrency limit so in-flight
+    calls never queue for a connection, and is warmed like api_client's.
+    """
+    pool_maxsize = max(api_config.pool_maxsize, api_config.max_concurrency)
+    session = _create_session(
+        api_config,
+        budget=pytestconfig.stash.get(deadline_key, None),
+        limiter=pytestconfig.stash.get(rate_limiter_key, None),
+        pool_maxsize=pool_maxsize,
+        emulator=petstore_emulator,
+        cassette=cassette,
+        id_space=pytestconfig.stash.get(id_space_key, None)
+    )
+    if api_warmup is not None:
+        _prewarm_session(session, api_config, pool_maxsize, api_warmup)
+    from utils.async_helpers import AsyncAPIClient
+    client = AsyncAPIClient(
+        session,
+        max_concurrency=api_config.max_concurrency,
+        id_space=pytestconfig.stash.get(id_space_key, None)
+    )
+    
+    yield client
+    
+    client.close()
+    _close_session(session)
+
+
+@pytest.fixture(scope="session")
+def cleanup_engine(api_client: requests.Session, pytestconfig) -> Generator[CleanupEngine, None, None]:
+    """
+    Session-wide engine that deletes tracked resources concurrently.
+    Deferred deletes are flushed once when the session ends.
+    """
+    engine = CleanupEngine(
+        api_client,
+        max_workers=pytestconfig.getoption("cleanup_workers"),
+        defer=pytestconfig.getoption("cleanup_mode") == "deferred"
+    )
+    
+    yield engine
+    
+    engine.close()
+
+
+@pytest.fixture(autouse=True)
+def resource_ids(request, pytestconfig) -> Generator[IdScope, None, None]:
+    """
+    Ids and usernames reserved for this test alone, from a namespace split
+    per run, worker and test. Released after the test's cleanup.
+    """
+    scope = pytestconfig.stash[id_space_key].scope(request.node.nodeid)
+    
+    yield scope
+    
+    scope.release()
+
+
 @pytest.fixture
-def cleanup_resources(api_client: requests.Session, api_config: APIConfig) -> Generator:
+def cleanup_resources(cleanup_engine: CleanupEngine, resource_ids: IdScope) -> Generator:
     """
     Fixture to track and cleanup created resources after tests.
+    Append {"type", "id", "url"} dicts; they are deleted concurrently, along
+    with anything else the test created in its namespace. Resources reserved
+    by another test or worker are never deleted.
     """
     created_resources = []
     
     yield created_resources
     
-    for resource in reversed(created_resources):
-        resource_type = resource.get("type")
-        resource_id = resource.get("id")
-        resource_url = resource.get("url")
-        
-        if resource_url:
-            try:
-                api_client.delete(resource_url)
-            except requests.RequestException:
-                pass 
+    cleanup_engine.cleanup(resource_ids.resources_to_delete(created_resources))
 
 
-@pytest.fixture
-def sample_pet_data() -> Dict[str, Any]:
-    """Generate sample pet data for testing."""
-    from faker import Faker
-    fake = Faker()
+@pytest.fixture(scope="session")
+def data_factory(pytestconfig) -> DataFactory:
+    """
+    Seeded pool of generated pet, order and user payloads.
+    Each xdist worker gets its own stream derived from --data-seed.
+    """
+    worker_id = worker_input(pytestconfig).get("workerid", "main")
+    factory = DataFactory(seed=pytestconfig.getoption("data_seed"), namespace=worker_id)
+    # Load Faker here rather than in the first test that generates a payload.
+    factory.fake
+    return factory
+
+
+@pytest.fixture(scope="session")
+def resource_pool(
+    api_client: requests.Session,
+    api_config: APIConfig,
+    data_factory: DataFactory,
+    cleanup_engine: CleanupEngine,
+    pytestconfig
+) -> Generator[ResourcePool, None, None]:
+    """
+    Pre-created pets, orders and users for tests that do not need their own.
+    They take ids from the pool's own namespace. Torn down once, before the
+    cleanup engine closes.
+    """
+    pool = ResourcePool(
+        api_client,
+        api_config.base_url,
+        data_factory,
+        cleanup_engine,
+        size=pytestconfig.getoption("pool_size"),
+        ids=pytestconfig.stash[id_space_key].scope("resource pool", shared=True, activate=False)
+    )
+    
+    yield pool
     
-    return {
-        "name": fake.first_name(),
-        "photoUrls": [fake.image_url()],
-        "status": "available"
-    }
+    pool.close()
 
 
 @pytest.fixture
-def sample_order_data() -> Dict[str, Any]:
-    """Generate sample order data for testing."""
-    from faker import Faker
-    fake = Faker()
-    
-    import random
-    return {
-        "petId": random.randint(1, 1000),
-        "quantity": random.randint(1, 10),
-        "shipDate": fake.iso8601(),
-        "status": "placed",
-        "complete": False
-    }
+def shared_pet(resource_pool: ResourcePool) -> Dict[str, Any]:
+    """A pooled pet for read-only tests. Do not modify it on the server."""
+    # Batches are created on first use; that time belongs to the pool, not to this test.
+    with shared_fixture_time.setup():
+        return resource_pool.shared("pet")
+
+
+@pytest.fixture
+def shared_order(resource_pool: ResourcePool) -> Dict[str, Any]:
+    """A pooled order for read-only tests. Do not modify it on the server."""
+    with shared_fixture_time.setup():
+        return resource_pool.shared("order")
+
+
+@pytest.fixture
+def shared_user(resource_pool: ResourcePool) -> Dict[str, Any]:
+    """A pooled user for read-only tests. Do not modify it on the server."""
+    with shared_fixture_time.setup():
+        return resource_pool.shared("user")
+
+
+@pytest.fixture
+def exclusive_pet(resource_pool: ResourcePool, resource_ids: IdScope) -> Dict[str, Any]:
+    """A pooled pet owned by this test alone; it may be updated or deleted."""
+    with shared_fixture_time.setup():
+        return resource_pool.checkout("pet", owner=resource_ids)
+
+
+@pytest.fixture
+def exclusive_order(resource_pool: ResourcePool, resource_ids: IdScope) -> Dict[str, Any]:
+    """A pooled order owned by this test alone; it may be deleted."""
+    with shared_fixture_time.setup():
+        return resource_pool.checkout("order", owner=resource_ids)
+
+
+@pytest.fixture
+def exclusive_user(resource_pool: ResourcePool, resource_ids: IdScope) -> Dict[str, Any]:
+    """A pooled user owned by this test alone; it may be updated or deleted."""
+    with shared_fixture_time.setup():
+        return resource_pool.checkout("user", owner=resource_ids)
+
+
+@pytest.fixture
+def sla(request, pytestconfig) -> SLASampler:
+    """
+    Sampler for the test's ``@pytest.mark.sla`` budgets. Pass the request
+    to sla.sample(); it runs ``samples`` times and asserts the percentiles.
+    """
+    marker = request.node.get_closest_marker("sla")
+    if marker is None:
+        raise pytest.UsageError(f"{request.node.nodeid} uses the sla fixture without an sla marker")
+    return SLASampler.from_marker(marker, label=request.node.name, id_space=pytestconfig.stash.get(id_space_key, None))
+
+
+@pytest.fixture
+def sample_pet_data(data_factory: DataFactory, resource_ids: IdScope) -> Dict[str, Any]:
+    """Generate sample pet data for testing, with an id reserved for this test."""
+    return data_factory.pet(resource_ids)
+
+
+@pytest.fixture
+def sample_order_data(data_factory: DataFactory, resource_ids: IdScope) -> Dict[str, Any]:
+    """Generate sample order data for testing, with ids reserved for this test."""
+    return data_factory.order(resource_ids)
 
 
 @pytest.fixture
-def sample_user_data() -> Dict[str, Any]:
-    """Generate sample user data for testing."""
-    from faker import Faker
-    fake = Faker()
-    
-    return {
-        "username": fake.user_name(),
-        "firstName": fake.first_name(),
-        "lastName": fake.last_name(),
-        "email": fake.email(),
-        "password": fake.password(),
-        "phone": fake.phone_number(),
-        "userStatus": 0
-    }
+def sample_user_data(data_factory: DataFactory, resource_ids: IdScope) -> Dict[str, Any]:
+    """Generate sample user data for testing, with a username reserved for this test."""
+    return data_factory.user(resource_ids)
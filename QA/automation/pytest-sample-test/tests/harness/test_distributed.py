@@ -0,0 +1,191 @@
+"""
+Test cases for the coordinator/worker distribution.
+Runs a coordinator on 127.0.0.1 and drives it with raw or local workers.
+"""
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from utils import distributed
+from utils.distributed import Coordinator, LocalWorkers, WorkQueue
+
+
+ROOT = Path(__file__).resolve().parents[2]
+
+# A local worker that takes one test, starts it and is then killed.
+KILLED_WORKER = """
+import os, signal, sys
+from utils.distributed import DistWorker
+client = DistWorker((sys.argv[1], int(sys.argv[2])), sys.argv[3], connect_timeout=10)
+client.join()
+nodeid = client.take()[0]
+client.send("logstart", nodeid=nodeid, location=[nodeid, 0, nodeid])
+if sys.argv[3] == "local0":
+    os.kill(os.getpid(), signal.SIGKILL)
+client.finish({})
+"""
+
+
+def _raw_worker(coordinator: Coordinator, worker: str) -> distributed._Connection:
+    """A worker that only speaks when told to, so it sends no heartbeats."""
+    connection = distributed._Connection(socket.create_connection(coordinator.address, timeout=10))
+    connection.send({"type": "hello", "worker": worker})
+    assert connection.receive()["type"] == "welcome"
+    return connection
+
+
+def _wait_for(condition, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.05)
+
+
+def _handle_events(coordinator: Coordinator, log: list):
+    """Apply queued joined/logstart/lost events the way run_coordinator does."""
+    while not coordinator.events.empty():
+        kind, worker, message = coordinator.events.get()
+        distributed._handle_event(None, coordinator, {}, kind, worker, message, log.append)
+
+
+@pytest.fixture
+def coordinator():
+    coordinator = Coordinator(("127.0.0.1", 0), {}, timeout=0.5)
+    coordinator.start()
+    
+    yield coordinator
+    
+    coordinator.stop()
+
+
+@pytest.mark.harness
+@pytest.mark.load_weight(0)
+class TestWorkQueue:
+    """Test the coordinator's work queue."""
+    
+    def test_take_hands_out_tests_in_order(self):
+        """Tests go out in queue order, up to the count asked for."""
+        work = WorkQueue(["a", "b", "c"])
+        
+        assert work.take("w1", 2) == ["a", "b"]
+        assert work.take("w2", 2) == ["c"]
+        assert work.assigned == {"w1": ["a", "b"], "w2": ["c"]}
+    
+    def test_take_waits_while_tests_are_assigned_then_finishes(self):
+        """An empty queue means wait while others hold tests, and done once they finish."""
+        work = WorkQueue(["a"])
+        work.take("w1")
+        
+        assert work.take("w2") == []
+        assert not work.done
+        
+        work.complete("w1", "a")
+        
+        assert work.take("w2") is None
+        assert work.done
+    
+    def test_lose_requeues_unfinished_tests_at_the_front(self):
+        """A lost worker's tests run next, in their original order."""
+        work = WorkQueue(["a", "b", "c", "d"])
+        work.take("w1", 2)
+        
+        requeued, given_up = work.lose("w1", running=None)
+        
+        assert (requeued, given_up) == (["a", "b"], [])
+        assert list(work.pending) == ["a", "b", "c", "d"]
+        assert work.requeued == 2
+        assert work.take("w1") is None, "A lost worker gets no more tests"
+    
+    def test_lose_gives_up_on_a_test_that_keeps_killing_workers(self):
+        """The running test is retried max_requeue times, then given up."""
+        work = WorkQueue(["a", "b"], max_requeue=1)
+        work.take("w1", 2)
+        
+        assert work.lose("w1", running="a") == (["a", "b"], [])
+        
+        work.take("w2")
+        
+        assert work.lose("w2", running="a") == ([], ["a"])
+        assert list(work.pending) == ["b"]
+    
+    def test_close_drops_pending_tests(self):
+        """Closing the queue (e.g. --maxfail) hands nothing more out."""
+        work = WorkQueue(["a", "b"])
+        work.take("w1")
+        work.close()
+        
+        assert work.take("w2") == []
+        
+        work.complete("w1", "a")
+        
+        assert work.done
+
+
+@pytest.mark.harness
+@pytest.mark.load_weight(0)
+class TestCoordinator:
+    """Test how the coordinator tracks and drops workers."""
+    
+    def test_silent_worker_is_dropped_and_its_tests_requeued(self, coordinator):
+        """A worker that sends no heartbeat for longer than the timeout is lost."""
+        coordinator.load(["a", "b"])
+        connection = _raw_worker(coordinator, "w1")
+        connection.send({"type": "take"})
+        assert connection.receive()["nodeids"] == ["a"]
+        
+        _wait_for(lambda: coordinator.silent_workers() == ["w1"])
+        log = []
+        _handle_events(coordinator, log)
+        distributed._handle_event(None, coordinator, {}, "lost", "w1", {"reason": "silent"}, log.append)
+        
+        assert coordinator.workers["w1"].lost == "silent"
+        assert list(coordinator.queue.pending) == ["a", "b"]
+        assert log[-1] == "dist worker w1 lost (silent), 1 tests requeued"
+        connection.close()
+    
+    def test_worker_waiting_for_collection_is_not_silent(self, coordinator):
+        """A worker blocked until the coordinator has collected still counts as alive."""
+        connection = _raw_worker(coordinator, "w1")
+        connection.send({"type": "take"})
+        
+        time.sleep(coordinator.timeout * 3)
+        
+        assert coordinator.silent_workers() == []
+        
+        coordinator.load(["a"])
+        
+        assert connection.receive()["nodeids"] == ["a"]
+        connection.close()
+    
+    def test_killed_local_worker_is_replaced_and_its_test_requeued(self, coordinator, monkeypatch, tmp_path):
+        """A --dist-local worker killed mid-test is reaped, replaced and its test requeued."""
+        monkeypatch.setattr(
+            distributed,
+            "local_worker_command",
+            lambda args, address, worker: [sys.executable, "-c", KILLED_WORKER, address[0], str(address[1]), worker]
+        )
+        coordinator.timeout = 30
+        coordinator.load(["a", "b"])
+        local_workers = LocalWorkers([], coordinator.address, str(tmp_path), str(ROOT))
+        local_workers.start(1)
+        log = []
+        
+        try:
+            _wait_for(lambda: local_workers.processes["local0"].poll() is not None)
+            _wait_for(lambda: "local0" in coordinator.workers)
+            _handle_events(coordinator, log)
+            distributed._reap_local_workers(None, coordinator, {}, local_workers, log.append)
+            
+            assert coordinator.workers["local0"].lost
+            assert coordinator.queue.attempts == {"a": 1}
+            assert list(coordinator.queue.pending) == ["a", "b"]
+            assert "dist worker local1 started to replace local0" in log
+            
+            _wait_for(lambda: local_workers.processes["local1"].poll() is not None)
+            
+            assert local_workers.processes["local1"].returncode == 0
+        finally:
+            local_workers.stop(timeout=5)
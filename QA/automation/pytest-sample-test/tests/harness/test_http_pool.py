@@ -0,0 +1,39 @@
+"""
+Test cases for the retry policy's run deadline checks.
+Drives the urllib3 retry state directly; no API calls.
+"""
+import pytest
+from urllib3.exceptions import ConnectTimeoutError
+from utils.deadline import DeadlineBudget, RunDeadlineExceeded
+from utils.http_pool import build_retry
+
+
+def _failed_twice(budget: DeadlineBudget):
+    retry = build_retry(3, 10.0, [503], budget)
+    for _ in range(2):
+        retry = retry.increment("GET", "/pet/1", error=ConnectTimeoutError())
+    return retry
+
+
+@pytest.mark.harness
+@pytest.mark.load_weight(0)
+class TestDeadlineRetry:
+    """Test that retries stop at the run deadline."""
+    
+    def test_backoff_past_the_deadline_is_not_slept(self):
+        """A 20s backoff with 5s left raises instead of sleeping."""
+        budget = DeadlineBudget(5)
+        retry = _failed_twice(budget)
+        
+        assert retry.budget is budget
+        with pytest.raises(RunDeadlineExceeded):
+            retry.sleep()
+        assert budget.rejected == 1
+    
+    def test_backoff_within_the_deadline_is_slept(self, monkeypatch):
+        slept = []
+        monkeypatch.setattr("urllib3.util.retry.time.sleep", slept.append)
+        
+        _failed_twice(DeadlineBudget(60)).sleep()
+        
+        assert slept == [20.0]
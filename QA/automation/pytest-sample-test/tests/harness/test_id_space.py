@@ -0,0 +1,269 @@
+"""
+Test cases for the per-run, per-worker, per-test id namespace.
+Feeds hand-built responses to the interference detector; no API calls.
+"""
+import json
+import threading
+
+import pytest
+import requests
+from utils import id_space
+from utils.api_helpers import APIResponse
+from utils.async_helpers import AsyncAPIClient
+from utils.cleanup import CleanupEngine
+from utils.data_factory import DataFactory
+from utils.id_space import IdSpace, InterferenceDetector, run_number, worker_slot
+from utils.resource_pool import ResourcePool
+from utils.sla import SLASampler
+
+
+API = "http://petstore.test/api"
+
+
+def _response(method: str, path: str, status: int = 200, body=None, sent=None) -> requests.Response:
+    response = requests.Response()
+    response.request = requests.Request(method, f"{API}{path}", json=sent).prepare()
+    response.url = response.request.url
+    response.status_code = status
+    response._content = json.dumps(body).encode() if body is not None else b""
+    return response
+
+
+def _observe(space: IdSpace, response: requests.Response) -> APIResponse:
+    """Run the detector's response hook, then decode the body as a test would."""
+    space.detector.observe(response)
+    wrapped = APIResponse(response)
+    wrapped.json_data
+    return wrapped
+
+
+@pytest.fixture
+def space() -> IdSpace:
+    space = IdSpace(seed=1234, slot=3)
+    InterferenceDetector(space)
+    return space
+
+
+def _kinds(space: IdSpace):
+    return [finding["kind"] for finding in space.detector.findings]
+
+
+@pytest.mark.harness
+@pytest.mark.load_weight(0)
+class TestIdLayout:
+    """Test how ids and names encode the run, worker and test."""
+    
+    def test_ids_encode_run_slot_block_and_item(self, space):
+        """Consecutive ids share a block; the 1025th starts the next one."""
+        scope = space.scope("test_a")
+        ids = [scope.next_id() for _ in range(1025)]
+        
+        assert ids[0] >> id_space._RUN_SHIFT == run_number(1234)
+        assert all((resource_id >> id_space._SLOT_SHIFT) & id_space.MAX_SLOT == 3 for resource_id in ids)
+        assert [resource_id & (1 << id_space.ITEM_BITS) - 1 for resource_id in ids[:3]] == [0, 1, 2]
+        assert len(set(ids)) == 1025
+        assert len(scope.blocks) == 2
+        assert ids[0] > 2 ** 41
+    
+    def test_names_and_ids_decode_back(self, space):
+        """Names end in the hex id; ids from another run or non-ids decode to None."""
+        scope = space.scope("test_a")
+        resource_id = scope.next_id()
+        name = scope.name("user", resource_id)
+        
+        assert name == f"user_x{resource_id:x}"
+        assert space.decode_key(name) == resource_id
+        assert space.decode_key(str(resource_id)) == resource_id
+        assert space.decode_key(resource_id) == resource_id
+        assert space.decode_key(IdSpace(seed=99).scope("other").next_id()) is None
+        assert space.decode_key(999999999) is None
+        assert space.decode_key("nonexistentuser12345") is None
+        assert space.decode_key(True) is None
+    
+    def test_worker_slots(self):
+        """main is slot 0 and gw<n> is n + 1; anything else or too large is refused."""
+        assert worker_slot("main") == 0
+        assert worker_slot("gw7") == 8
+        with pytest.raises(ValueError):
+            worker_slot("local0")
+        with pytest.raises(ValueError):
+            IdSpace(seed=1, slot=id_space.MAX_SLOT + 1)
+    
+    def test_released_blocks_are_reused_after_wrapping(self, space, monkeypatch):
+        """Blocks wrap around, skip live ones and run out only when all are live."""
+        monkeypatch.setattr(id_space, "_BLOCKS", 4)
+        scopes = [space.scope(f"test_{index}") for index in range(4)]
+        for scope in scopes:
+            scope.next_id()
+        
+        with pytest.raises(RuntimeError):
+            space.scope("test_full").next_id()
+        
+        scopes[1].release()
+        reused = space.scope("test_reuse")
+        reused.next_id()
+        
+        assert reused.blocks == [1]
+        assert space.owner_of(reused.next_id()) is reused
+
+
+@pytest.mark.harness
+@pytest.mark.load_weight(0)
+class TestInterferenceDetector:
+    """Test each kind of interference finding."""
+    
+    def test_reading_another_tests_resource_is_foreign(self, space):
+        owner = space.scope("test_owner")
+        pet_id = owner.next_id()
+        space.scope("test_reader")
+        
+        _observe(space, _response("GET", f"/pet/{pet_id}", body={"id": pet_id}))
+        
+        assert _kinds(space) == ["foreign"]
+        assert space.detector.findings[0]["test"] == "test_reader"
+    
+    def test_writing_a_pool_resource_is_a_shared_write(self, space):
+        pool = space.scope("resource pool", shared=True, activate=False)
+        pet_id = pool.next_id()
+        space.scope("test_writer")
+        
+        _observe(space, _response("GET", f"/pet/{pet_id}", body={"id": pet_id}))
+        _observe(space, _response("PUT", "/pet", body={"id": pet_id}, sent={"id": pet_id, "name": "rex"}))
+        
+        assert _kinds(space) == ["shared-write"]
+    
+    def test_resource_missing_on_read_back_has_vanished(self, space):
+        scope = space.scope("test_a")
+        pet_id = scope.next_id()
+        
+        _observe(space, _response("POST", "/pet", body={"id": pet_id}, sent={"id": pet_id, "name": "rex"}))
+        _observe(space, _response("GET", f"/pet/{pet_id}", status=404))
+        
+        assert _kinds(space) == ["vanished"]
+    
+    def test_resource_changed_behind_the_test_is_overwritten(self, space):
+        scope = space.scope("test_a")
+        pet_id = scope.next_id()
+        
+        _observe(space, _response("POST", "/pet", body={"id": pet_id}, sent={"id": pet_id, "name": "rex"}))
+        _observe(space, _response("GET", f"/pet/{pet_id}", body={"id": pet_id, "name": "max"}))
+        
+        assert _kinds(space) == ["overwritten"]
+        assert "'rex' -> 'max'" in space.detector.findings[0]["detail"]
+    
+    def test_bodies_are_only_checked_once_the_test_decodes_them(self, space):
+        """The detector leaves parsing to APIResponse; bodies nobody reads are not checked."""
+        scope = space.scope("test_a")
+        pet_id = scope.next_id()
+        _observe(space, _response("POST", "/pet", body={"id": pet_id}, sent={"id": pet_id, "name": "rex"}))
+        response = _response("GET", f"/pet/{pet_id}", body={"id": pet_id, "name": "max"})
+        
+        space.detector.observe(response)
+        
+        assert _kinds(space) == []
+        
+        APIResponse(response).json_data
+        
+        assert _kinds(space) == ["overwritten"]
+    
+    def test_id_picked_by_the_server_is_registered_when_read(self, space):
+        scope = space.scope("test_a")
+        pet_id = scope.next_id()
+        
+        _observe(space, _response("POST", "/pet", body={"id": pet_id, "name": "rex"}, sent={"name": "rex"}))
+        
+        assert scope.resources_to_delete([]) == [{"type": "pet", "url": f"{API}/pet/{pet_id}", "id": pet_id}]
+    
+    def test_write_outside_the_namespace_is_unpartitioned(self, space):
+        """Fixed ids are flagged on successful writes, but not on deletes or failures."""
+        space.scope("test_a")
+        
+        _observe(space, _response("POST", "/pet", body={"id": 12345}, sent={"id": 12345}))
+        _observe(space, _response("DELETE", "/pet/999999999"))
+        _observe(space, _response("PUT", "/user/nonexistentuser12345", status=404, sent={}))
+        
+        assert _kinds(space) == ["unpartitioned"]
+    
+    def test_findings_merge_across_workers(self, space):
+        space.detector.add("foreign", "pet 1", "test_a", "detail")
+        other = InterferenceDetector(IdSpace(seed=1234, slot=4))
+        other.merge(space.detector.export())
+        
+        assert other.total == 1
+        assert other.findings == space.detector.findings
+
+
+@pytest.mark.harness
+@pytest.mark.load_weight(0)
+class TestScopes:
+    """Test cleanup selection and the acting scope across threads."""
+    
+    def test_resources_to_delete(self, space):
+        """Own and unregistered created resources are deleted; foreign ones are reported."""
+        other = space.scope("test_other")
+        foreign_id = other.next_id()
+        scope = space.scope("test_a")
+        own_id, created_id, deleted_id = scope.next_id(), scope.next_id(), scope.next_id()
+        for pet_id in (created_id, deleted_id):
+            _observe(space, _response("POST", "/pet", body={"id": pet_id}, sent={"id": pet_id}))
+        _observe(space, _response("DELETE", f"/pet/{deleted_id}"))
+        registered = [{"type": "pet", "id": own_id}, {"type": "pet", "id": foreign_id}]
+        
+        resources = scope.resources_to_delete(registered)
+        
+        assert resources == [
+            {"type": "pet", "id": own_id},
+            {"type": "pet", "url": f"{API}/pet/{created_id}", "id": created_id},
+        ]
+        assert _kinds(space) == ["foreign"]
+    
+    def test_release_frees_blocks_claims_and_the_acting_scope(self, space):
+        pool = space.scope("resource pool", shared=True, activate=False)
+        pooled_id = pool.next_id()
+        scope = space.scope("test_a")
+        scope.claim(pooled_id)
+        
+        assert space.owner_of(pooled_id) is scope
+        
+        scope.release()
+        
+        assert space.owner_of(pooled_id) is pool
+        assert space.current is None
+    
+    def test_bound_calls_act_for_the_calling_test(self, space):
+        """Executor threads, async_api_client and sla samplers inherit the test's scope."""
+        scope = space.scope("test_a")
+        seen = []
+        
+        thread = threading.Thread(target=space.bound(lambda: seen.append(space.current)))
+        thread.start()
+        thread.join()
+        client = AsyncAPIClient(requests.Session(), max_concurrency=2, id_space=space)
+        try:
+            seen.extend(client.gather(*(client.call(lambda session: space.current) for _ in range(2))))
+        finally:
+            client.close()
+        SLASampler({95.0: 1000.0}, samples=4, concurrency=2, id_space=space).sample(
+            lambda: seen.append(space.current)
+        )
+        
+        assert seen == [scope] * 7
+        assert space.current is scope
+    
+    def test_pool_creates_act_for_the_pool_on_executor_threads(self, space):
+        """Pool POSTs run on executor threads, still under the pool's scope."""
+        seen = []
+        
+        class RecordingSession(requests.Session):
+            def request(self, method, url, **kwargs):
+                seen.append(space.current)
+                return _response(method, "/pet", body={"id": len(seen)})
+        
+        pool_scope = space.scope("resource pool", shared=True, activate=False)
+        pool = ResourcePool(RecordingSession(), API, DataFactory(seed=1), CleanupEngine(requests.Session()), size=2, ids=pool_scope)
+        try:
+            pool.shared("pet")
+        finally:
+            pool._executor.shutdown(wait=True)
+        
+        assert seen == [pool_scope] * 2
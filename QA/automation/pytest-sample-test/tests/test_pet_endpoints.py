@@ -10,7 +10,12 @@ from utils.api_helpers import (
     make_delete_request,
     APIResponse
 )
-from utils.validators import validate_pet_structure, validate_id_field
+from utils.validators import (
+    validate_pet_structure,
+    validate_pet_schema,
+    validate_id_field,
+    get_schema_validator
+)
 
 
 @pytest.mark.api
@@ -27,63 +32,65 @@ class TestPetEndpoints:
         1. Get pets with status=available
         2. Verify response is 200 OK
         3. Verify response is a list
-        4. Verify each pet has required fields
+        4. Verify each pet matches the Pet schema, streaming the list
         """
         url = f"{api_config.base_url}/pet/findByStatus"
         params = {"status": "available"}
         
-        response = make_get_request(api_client, url, params=params)
+        response = make_get_request(api_client, url, params=params, stream=True)
         
         response.assert_success("Should return 200 for available pets")
-        data = response.get_data()
-        
-        assert isinstance(data, list), "Response should be a list"
-        if len(data) > 0:
-            assert validate_pet_structure(data[0]), "Pet should have required fields"
+        validator = get_schema_validator("Pet")
+        for pet in response.iter_items():
+            assert validate_pet_structure(pet), "Pet should have required fields"
+            validator.assert_valid(pet)
     
     def test_get_pets_by_status_pending(self, api_client, api_config):
         """Test GET /pet/findByStatus with status=pending."""
         url = f"{api_config.base_url}/pet/findByStatus"
         params = {"status": "pending"}
         
-        response = make_get_request(api_client, url, params=params)
+        response = make_get_request(api_client, url, params=params, stream=True)
         response.assert_success()
-        assert isinstance(response.get_data(), list)
+        get_schema_validator("Pet").assert_valid_stream(response.iter_items())
     
     def test_get_pets_by_status_sold(self, api_client, api_config):
         """Test GET /pet/findByStatus with status=sold."""
         url = f"{api_config.base_url}/pet/findByStatus"
         params = {"status": "sold"}
         
-        response = make_get_request(api_client, url, params=params)
+        response = make_get_request(api_client, url, params=params, stream=True)
         response.assert_success()
-        assert isinstance(response.get_data(), list)
+        get_schema_validator("Pet").assert_valid_stream(response.iter_items())
+    
+    def test_get_pets_by_all_statuses_concurrently(self, async_api_client, api_config):
+        """Test GET /pet/findByStatus for every status in one concurrent fan-out."""
+        from utils.async_helpers import async_make_get_request
+        url = f"{api_config.base_url}/pet/findByStatus"
+        statuses = ["available", "pending", "sold"]
+        
+        responses = async_api_client.gather(*(
+            async_make_get_request(async_api_client, url, params={"status": status})
+            for status in statuses
+        ))
+        
+        for status, response in zip(statuses, responses):
+            response.assert_success(f"Should return 200 for {status} pets")
+            assert isinstance(response.get_data(), list)
     
-    def test_get_pet_by_id_success(self, api_client, api_config, cleanup_resources):
+    def test_get_pet_by_id_success(self, api_client, api_config, shared_pet):
         """
         Test GET /pet/{petId} - Get pet by ID
         
         Test Steps:
-        1. Create a pet
+        1. Borrow a pet from the shared pool
         2. Get pet by ID
         3. Verify response is 200 OK
         4. Verify pet data matches
         """
-        # Create a pet first
-        create_url = f"{api_config.base_url}/pet"
-        pet_data = {
-            "name": "TestPet",
-            "photoUrls": ["http://example.com/photo.jpg"],
-            "status": "available"
-        }
-        
-        create_response = make_post_request(api_client, create_url, json_data=pet_data)
-        create_response.assert_success("Should create pet successfully")
-        created_pet = create_response.get_data()
-        pet_id = created_pet.get("id")
-        
-        assert pet_id is not None, "Created pet should have an ID"
-        cleanup_resources.append({"type": "pet", "id": pet_id, "url": f"{create_url}/{pet_id}"})
+        pet_data = shared_pet
+        pet_id = pet_data.get("id")
+        assert pet_id is not None, "Pooled pet should have an ID"
         
         # Get pet by ID
         get_url = f"{api_config.base_url}/pet/{pet_id}"
@@ -95,6 +102,16 @@ class TestPetEndpoints:
         assert pet.get("id") == pet_id, "Should return correct pet"
         assert pet.get("name") == pet_data["name"], "Pet name should match"
     
+    @pytest.mark.sla(p95_ms=300, samples=40, concurrency=4)
+    def test_get_pet_by_id_latency(self, api_client, api_config, shared_pet, sla):
+        """Test GET /pet/{petId} stays within its p95 latency budget under concurrent reads."""
+        url = f"{api_config.base_url}/pet/{shared_pet['id']}"
+        
+        result = sla.sample(lambda: make_get_request(api_client, url))
+        
+        for response in result.results:
+            response.assert_success("Should return pet by ID")
+    
     def test_get_pet_by_id_not_found(self, api_client, api_config):
         """Test GET /pet/{petId} with non-existent ID."""
         url = f"{api_config.base_url}/pet/999999999"
@@ -120,6 +137,7 @@ class TestPetEndpoints:
         created_pet = response.get_data()
         
         assert validate_id_field(created_pet), "Created pet should have an ID"
+        assert validate_pet_schema(created_pet), "Created pet should match the Pet schema"
         assert created_pet.get("name") == sample_pet_data["name"], "Pet name should match"
         
         pet_id = created_pet.get("id")
@@ -135,29 +153,17 @@ class TestPetEndpoints:
         assert response.is_client_error() or response.is_server_error(), \
             "Should return error for invalid data"
     
-    def test_update_pet_success(self, api_client, api_config, cleanup_resources):
+    def test_update_pet_success(self, api_client, api_config, exclusive_pet):
         """
         Test PUT /pet - Update an existing pet
         
         Test Steps:
-        1. Create a pet
+        1. Check out an exclusive pet from the pool
         2. Update pet data
         3. Verify response is 200 OK
         4. Verify pet was updated
         """
-        # Create a pet
-        create_url = f"{api_config.base_url}/pet"
-        pet_data = {
-            "name": "OriginalName",
-            "photoUrls": ["http://example.com/photo.jpg"],
-            "status": "available"
-        }
-        
-        create_response = make_post_request(api_client, create_url, json_data=pet_data)
-        create_response.assert_success()
-        created_pet = create_response.get_data()
-        pet_id = created_pet.get("id")
-        cleanup_resources.append({"type": "pet", "id": pet_id, "url": f"{create_url}/{pet_id}"})
+        pet_id = exclusive_pet.get("id")
         
         # Update pet
         updated_data = {
@@ -176,27 +182,17 @@ class TestPetEndpoints:
         assert updated_pet.get("name") == "UpdatedName", "Pet name should be updated"
         assert updated_pet.get("status") == "sold", "Pet status should be updated"
     
-    def test_delete_pet_success(self, api_client, api_config):
+    def test_delete_pet_success(self, api_client, api_config, exclusive_pet):
         """
         Test DELETE /pet/{petId} - Delete a pet
         
         Test Steps:
-        1. Create a pet
+        1. Check out an exclusive pet from the pool
         2. Delete the pet
         3. Verify response is 200 OK
         4. Verify pet is deleted (GET returns 404)
         """
-        # Create a pet
-        create_url = f"{api_config.base_url}/pet"
-        pet_data = {
-            "name": "PetToDelete",
-            "photoUrls": ["http://example.com/photo.jpg"],
-            "status": "available"
-        }
-        
-        create_response = make_post_request(api_client, create_url, json_data=pet_data)
-        create_response.assert_success()
-        pet_id = create_response.get_data().get("id")
+        pet_id = exclusive_pet.get("id")
         
         # Delete pet
         delete_url = f"{api_config.base_url}/pet/{pet_id}"
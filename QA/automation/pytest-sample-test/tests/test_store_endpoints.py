@@ -9,7 +9,7 @@ from utils.api_helpers import (
     make_delete_request,
     APIResponse
 )
-from utils.validators import validate_order_structure, validate_id_field
+from utils.validators import validate_order_structure, validate_order_schema, validate_id_field
 
 
 @pytest.mark.api
@@ -35,6 +35,16 @@ class TestStoreEndpoints:
         
         assert isinstance(data, dict), "Inventory should be a dictionary"
     
+    @pytest.mark.sla(p95_ms=500, samples=30)
+    def test_get_store_inventory_latency(self, api_client, api_config, sla):
+        """Test GET /store/inventory stays within its p95 latency budget."""
+        url = f"{api_config.base_url}/store/inventory"
+        
+        result = sla.sample(lambda: make_get_request(api_client, url))
+        
+        for response in result.results:
+            response.assert_success("Should return inventory")
+    
     def test_create_order_success(self, api_client, api_config, sample_order_data, cleanup_resources):
         """
         Test POST /store/order - Place an order
@@ -54,6 +64,7 @@ class TestStoreEndpoints:
         
         assert validate_id_field(created_order), "Created order should have an ID"
         assert validate_order_structure(created_order), "Order should have required fields"
+        assert validate_order_schema(created_order), "Order should match the Order schema"
         
         order_id = created_order.get("id")
         cleanup_resources.append({
@@ -62,35 +73,18 @@ class TestStoreEndpoints:
             "url": f"{url}/{order_id}"
         })
     
-    def test_get_order_by_id_success(self, api_client, api_config, cleanup_resources):
+    def test_get_order_by_id_success(self, api_client, api_config, shared_order):
         """
         Test GET /store/order/{orderId} - Get order by ID
         
         Test Steps:
-        1. Create an order
+        1. Borrow an order from the shared pool
         2. Get order by ID
         3. Verify response is 200 OK
         4. Verify order data matches
         """
-        # Create an order
-        create_url = f"{api_config.base_url}/store/order"
-        order_data = {
-            "petId": 1,
-            "quantity": 1,
-            "status": "placed",
-            "complete": False
-        }
-        
-        create_response = make_post_request(api_client, create_url, json_data=order_data)
-        create_response.assert_success()
-        created_order = create_response.get_data()
-        order_id = created_order.get("id")
-        
-        cleanup_resources.append({
-            "type": "order",
-            "id": order_id,
-            "url": f"{create_url}/{order_id}"
-        })
+        order_data = shared_order
+        order_id = order_data.get("id")
         
         # Get order by ID
         get_url = f"{api_config.base_url}/store/order/{order_id}"
@@ -109,28 +103,17 @@ class TestStoreEndpoints:
         response = make_get_request(api_client, url)
         response.assert_status_code(404, "Should return 404 for non-existent order")
     
-    def test_delete_order_success(self, api_client, api_config):
+    def test_delete_order_success(self, api_client, api_config, exclusive_order):
         """
         Test DELETE /store/order/{orderId} - Delete an order
         
         Test Steps:
-        1. Create an order
+        1. Check out an exclusive order from the pool
         2. Delete the order
         3. Verify response is 200 OK
         4. Verify order is deleted
         """
-        # Create an order
-        create_url = f"{api_config.base_url}/store/order"
-        order_data = {
-            "petId": 1,
-            "quantity": 1,
-            "status": "placed",
-            "complete": False
-        }
-        
-        create_response = make_post_request(api_client, create_url, json_data=order_data)
-        create_response.assert_success()
-        order_id = create_response.get_data().get("id")
+        order_id = exclusive_order.get("id")
         
         # Delete order
         delete_url = f"{api_config.base_url}/store/order/{order_id}"
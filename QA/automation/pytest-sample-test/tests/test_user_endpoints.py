@@ -10,7 +10,7 @@ from utils.api_helpers import (
     make_delete_request,
     APIResponse
 )
-from utils.validators import validate_user_structure, validate_id_field
+from utils.validators import validate_user_structure, validate_user_schema, validate_id_field
 
 
 @pytest.mark.api
@@ -41,27 +41,17 @@ class TestUserEndpoints:
             "url": f"{url}/{sample_user_data['username']}"
         })
     
-    def test_get_user_by_username_success(self, api_client, api_config, sample_user_data, cleanup_resources):
+    def test_get_user_by_username_success(self, api_client, api_config, shared_user):
         """
         Test GET /user/{username} - Get user by username
         
         Test Steps:
-        1. Create a user
+        1. Borrow a user from the shared pool
         2. Get user by username
         3. Verify response is 200 OK
         4. Verify user data matches
         """
-        # Create a user
-        create_url = f"{api_config.base_url}/user"
-        create_response = make_post_request(api_client, create_url, json_data=sample_user_data)
-        create_response.assert_success()
-        
-        username = sample_user_data["username"]
-        cleanup_resources.append({
-            "type": "user",
-            "username": username,
-            "url": f"{create_url}/{username}"
-        })
+        username = shared_user["username"]
         
         # Get user by username
         get_url = f"{api_config.base_url}/user/{username}"
@@ -72,6 +62,7 @@ class TestUserEndpoints:
         
         assert user.get("username") == username, "Should return correct user"
         assert validate_user_structure(user), "User should have required fields"
+        assert validate_user_schema(user), "User should match the User schema"
     
     def test_get_user_by_username_not_found(self, api_client, api_config):
         """Test GET /user/{username} with non-existent username."""
@@ -80,30 +71,20 @@ class TestUserEndpoints:
         response = make_get_request(api_client, url)
         response.assert_status_code(404, "Should return 404 for non-existent user")
     
-    def test_update_user_success(self, api_client, api_config, sample_user_data, cleanup_resources):
+    def test_update_user_success(self, api_client, api_config, exclusive_user):
         """
         Test PUT /user/{username} - Update user
         
         Test Steps:
-        1. Create a user
+        1. Check out an exclusive user from the pool
         2. Update user data
         3. Verify response is 200 OK
         4. Verify user was updated
         """
-        # Create a user
-        create_url = f"{api_config.base_url}/user"
-        create_response = make_post_request(api_client, create_url, json_data=sample_user_data)
-        create_response.assert_success()
-        
-        username = sample_user_data["username"]
-        cleanup_resources.append({
-            "type": "user",
-            "username": username,
-            "url": f"{create_url}/{username}"
-        })
+        username = exclusive_user["username"]
         
         # Update user
-        updated_data = sample_user_data.copy()
+        updated_data = exclusive_user.copy()
         updated_data["firstName"] = "UpdatedFirstName"
         updated_data["email"] = "updated@example.com"
         
@@ -120,22 +101,17 @@ class TestUserEndpoints:
         assert updated_user.get("firstName") == "UpdatedFirstName", "User firstName should be updated"
         assert updated_user.get("email") == "updated@example.com", "User email should be updated"
     
-    def test_delete_user_success(self, api_client, api_config, sample_user_data):
+    def test_delete_user_success(self, api_client, api_config, exclusive_user):
         """
         Test DELETE /user/{username} - Delete user
         
         Test Steps:
-        1. Create a user
+        1. Check out an exclusive user from the pool
         2. Delete the user
         3. Verify response is 200 OK
         4. Verify user is deleted
         """
-        # Create a user
-        create_url = f"{api_config.base_url}/user"
-        create_response = make_post_request(api_client, create_url, json_data=sample_user_data)
-        create_response.assert_success()
-        
-        username = sample_user_data["username"]
+        username = exclusive_user["username"]
         
         # Delete user
         delete_url = f"{api_config.base_url}/user/{username}"
@@ -155,33 +131,23 @@ class TestUserEndpoints:
         # API might return 200 or 404
         assert response.status_code in [200, 404], "Should handle non-existent user deletion"
     
-    def test_user_login(self, api_client, api_config, sample_user_data, cleanup_resources):
+    def test_user_login(self, api_client, api_config, shared_user):
         """
         Test GET /user/login - User login
         
         Test Steps:
-        1. Create a user
+        1. Borrow a user from the shared pool
         2. Login with username and password
         3. Verify response is 200 OK
         4. Verify response contains session information
         """
-        # Create a user
-        create_url = f"{api_config.base_url}/user"
-        create_response = make_post_request(api_client, create_url, json_data=sample_user_data)
-        create_response.assert_success()
-        
-        username = sample_user_data["username"]
-        cleanup_resources.append({
-            "type": "user",
-            "username": username,
-            "url": f"{create_url}/{username}"
-        })
+        username = shared_user["username"]
         
         # Login
         login_url = f"{api_config.base_url}/user/login"
         params = {
             "username": username,
-            "password": sample_user_data["password"]
+            "password": shared_user["password"]
         }
         
         response = make_get_request(api_client, login_url, params=params)
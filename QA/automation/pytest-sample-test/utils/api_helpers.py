@@ -1,25 +1,229 @@
 """
 API helper functions for making requests and handling responses.
+
+Request and response bodies go through a pluggable JSON codec (orjson
+when installed, stdlib json otherwise), and JSON request bodies can be
+gzip/deflate compressed. Encode/decode time and body sizes on the wire
+are recorded per endpoint in ``utils.metrics.payload_metrics``.
 """
 import requests
-from typing import Dict, Any, Optional, List
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Optional, List, Iterator, Tuple
+import gzip
 import json
+import time
+import zlib
+
+from utils.metrics import endpoint_key, payload_metrics, record_request
+from utils.streaming import iter_json_array
+
+
+_UNSET = object()
+_STREAM_CHUNK_SIZE = 64 * 1024
+REQUEST_ENCODINGS = ("gzip", "deflate")
+# Fastest level: JSON payloads still shrink several times over.
+_COMPRESS_LEVEL = 1
+
+
+class JSONCodec:
+    """Stdlib JSON codec; subclasses swap in faster implementations."""
+    
+    name = "json"
+    
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, allow_nan=False).encode()
+    
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+
+class OrjsonCodec(JSONCodec):
+    """JSON codec backed by orjson."""
+    
+    name = "orjson"
+    
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+    
+    def dumps(self, data: Any) -> bytes:
+        return self._orjson.dumps(data, option=self._options)
+    
+    def loads(self, content: bytes) -> Any:
+        return self._orjson.loads(content)
+
+
+_CODECS = {"json": JSONCodec, "orjson": OrjsonCodec}
+
+
+def get_codec(name: str = "auto") -> JSONCodec:
+    """
+    Return the named JSON codec. ``auto`` picks the fastest installed one.
+    Raises ValueError for an unknown or unavailable codec.
+    """
+    if name == "auto":
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return JSONCodec()
+    if name not in _CODECS:
+        raise ValueError(f"Unknown JSON codec {name!r}; use auto, {', '.join(_CODECS)}")
+    try:
+        return _CODECS[name]()
+    except ImportError as exc:
+        raise ValueError(f"JSON codec {name!r} is not installed: {exc}")
+
+
+@dataclass
+class TransportSettings:
+    """Process-wide body encoding settings used by the make_*_request helpers."""
+    codec: JSONCodec
+    request_encoding: Optional[str] = None
+    compress_min_bytes: int = 1024
+
+
+transport = TransportSettings(codec=get_codec())
+
+
+def configure_transport(codec: str = "auto", request_encoding: Optional[str] = None, compress_min_bytes: int = 1024):
+    """
+    Select the JSON codec and request body compression. Bodies smaller than
+    compress_min_bytes are sent uncompressed.
+    """
+    if request_encoding and request_encoding not in REQUEST_ENCODINGS:
+        raise ValueError(f"Unsupported request encoding {request_encoding!r}; use {', '.join(REQUEST_ENCODINGS)}")
+    transport.codec = get_codec(codec)
+    transport.request_encoding = request_encoding or None
+    transport.compress_min_bytes = compress_min_bytes
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress a request body; gzip output is reproducible so cassette keys stay stable."""
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=_COMPRESS_LEVEL, mtime=0)
+    return zlib.compress(body, _COMPRESS_LEVEL)
+
+
+def decompress_body(body: bytes, encoding: Optional[str]) -> bytes:
+    """Undo compress_body() for a request carrying the given Content-Encoding."""
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    return body
+
+
+def _response_endpoint(response: Optional[requests.Response]) -> str:
+    request = getattr(response, "request", None)
+    if request is None or not request.method or not request.url:
+        return "other"
+    return endpoint_key(request.method, request.url)
+
+
+def _wire_size(response: requests.Response, size: int) -> int:
+    # urllib3 counts the bytes read off the socket, before gzip/deflate decoding.
+    tell = getattr(response.raw, "tell", None)
+    try:
+        wire_size = tell() if tell is not None else 0
+    except (OSError, ValueError):
+        wire_size = 0
+    return wire_size if isinstance(wire_size, int) and wire_size > 0 else size
+
+
+def observe_json(response: requests.Response, observer: Callable[[Any], None]):
+    """
+    Call observer with the response's parsed JSON once the APIResponse
+    wrapping it decodes the body, so response hooks can inspect bodies
+    without parsing them a second time. Bodies nobody decodes are never
+    passed on.
+    """
+    observers = getattr(response, "json_observers", None)
+    if observers is None:
+        observers = response.json_observers = []
+    observers.append(observer)
 
 
 class APIResponse:
-    """Wrapper for API responses with helper methods."""
+    """
+    Wrapper for API responses with helper methods.
+    
+    JSON and text are decoded lazily on first access, so status-only
+    checks never parse the body.
+    """
     
-    def __init__(self, response: requests.Response):
+    __slots__ = ("response", "status_code", "headers", "elapsed", "_json_data", "_text")
+    
+    def __init__(self, response: requests.Response, elapsed: Optional[float] = None):
         self.response = response
         self.status_code = response.status_code
         self.headers = response.headers
+        self.elapsed = elapsed if elapsed is not None else response.elapsed.total_seconds()
+        self._json_data = _UNSET
+        self._text = _UNSET
+    
+    @property
+    def json_data(self) -> Any:
+        """Parsed JSON body, or None when the body is not JSON (or was released unread)."""
+        if self._json_data is _UNSET:
+            content = self.response.content if self.response is not None else None
+            self._json_data = None
+            if content:
+                start = time.perf_counter()
+                try:
+                    self._json_data = transport.codec.loads(content)
+                except ValueError:
+                    pass
+                payload_metrics.record_decode(_response_endpoint(self.response), time.perf_counter() - start)
+            for observer in getattr(self.response, "json_observers", ()):
+                observer(self._json_data)
+        return self._json_data
+    
+    @property
+    def text(self) -> str:
+        """Decoded body text (empty once released without being read)."""
+        if self._text is _UNSET:
+            self._text = self.response.text if self.response is not None else ""
+        return self._text
+    
+    def iter_items(self) -> Iterator[Any]:
+        """
+        Yield the elements of a JSON array body one at a time.
+        
+        For responses requested with ``stream=True`` the array is parsed
+        incrementally from the socket, so memory is bounded by the largest
+        element. Streaming consumes the body: json_data and text are not
+        available afterwards. Stopping early closes the connection.
+        """
+        if self._json_data is not _UNSET or self.response is None:
+            if not isinstance(self.json_data, list):
+                raise ValueError("Response body is not a JSON array")
+            yield from self.json_data
+            return
+        
+        response = self.response
+        received = 0
+        
+        def _chunks() -> Iterator[bytes]:
+            nonlocal received
+            for chunk in response.iter_content(chunk_size=_STREAM_CHUNK_SIZE):
+                received += len(chunk)
+                yield chunk
         
         try:
-            self.json_data = response.json()
-        except (ValueError, json.JSONDecodeError):
-            self.json_data = None
+            yield from iter_json_array(_chunks())
+        finally:
+            payload_metrics.record_response(_response_endpoint(response), received, _wire_size(response, received))
+            response.close()
+    
+    def release(self):
+        """
+        Drop the underlying response and its raw body.
         
-        self.text = response.text
+        Nothing is decoded on the way out: json_data and text are only kept
+        if they were already read, and are None and empty otherwise.
+        """
+        self.response = None
     
     def is_success(self) -> bool:
         """Check if response is successful (2xx status)."""
@@ -61,15 +265,77 @@ class APIResponse:
             )
 
 
+def _encode_json(
+    method: str,
+    url: str,
+    json_data: Any,
+    headers: Optional[Dict[str, str]],
+    encoding: Optional[str]
+) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize json_data with the configured codec, compressing it when large enough."""
+    start = time.perf_counter()
+    body = transport.codec.dumps(json_data)
+    size = len(body)
+    headers = dict(headers or {})
+    headers.setdefault("Content-Type", "application/json")
+    if encoding and size >= transport.compress_min_bytes:
+        body = compress_body(body, encoding)
+        headers["Content-Encoding"] = encoding
+    payload_metrics.record_encode(endpoint_key(method, url), time.perf_counter() - start, size, len(body))
+    return body, headers
+
+
+def _send(
+    session: requests.Session,
+    method: str,
+    url: str,
+    json_data: Any = None,
+    **kwargs
+) -> APIResponse:
+    """Send a request and record its latency in the request metrics."""
+    headers = kwargs.get("headers")
+    encoded = json_data is not None and not kwargs.get("data")
+    if encoded:
+        encoding = None if getattr(session, "plain_request_bodies", False) else transport.request_encoding
+        kwargs["data"], kwargs["headers"] = _encode_json(method, url, json_data, headers, encoding)
+    
+    start = time.perf_counter()
+    try:
+        response = session.request(method, url, **kwargs)
+        if encoded and response.status_code == 415 and "Content-Encoding" in kwargs["headers"]:
+            # The server does not take compressed bodies: stop compressing on
+            # this session and resend plain. Only the resend is timed. Bodies
+            # the caller encoded are not ours to resend; their 415 is returned.
+            response.close()
+            session.plain_request_bodies = True
+            kwargs["data"], kwargs["headers"] = _encode_json(method, url, json_data, headers, None)
+            start = time.perf_counter()
+            response = session.request(method, url, **kwargs)
+    except requests.RequestException:
+        record_request(method, url, time.perf_counter() - start, error=True)
+        raise
+    elapsed = time.perf_counter() - start - getattr(response, "rate_limit_wait", 0.0)
+    record_request(method, url, elapsed, error=response.status_code >= 500)
+    if not kwargs.get("stream"):
+        size = len(response.content)
+        payload_metrics.record_response(endpoint_key(method, url), size, _wire_size(response, size))
+    return APIResponse(response, elapsed=elapsed)
+
+
 def make_get_request(
     session: requests.Session,
     url: str,
     params: Optional[Dict[str, Any]] = None,
-    headers: Optional[Dict[str, str]] = None
+    headers: Optional[Dict[str, str]] = None,
+    stream: bool = False
 ) -> APIResponse:
-    """Make a GET request."""
-    response = session.get(url, params=params, headers=headers)
-    return APIResponse(response)
+    """
+    Make a GET request.
+    
+    With stream=True only the headers are read up front; use
+    APIResponse.iter_items() to walk a list body without loading it whole.
+    """
+    return _send(session, "GET", url, params=params, headers=headers, stream=stream)
 
 
 def make_post_request(
@@ -80,8 +346,7 @@ def make_post_request(
     headers: Optional[Dict[str, str]] = None
 ) -> APIResponse:
     """Make a POST request."""
-    response = session.post(url, json=json_data, data=data, headers=headers)
-    return APIResponse(response)
+    return _send(session, "POST", url, json_data=json_data, data=data, headers=headers)
 
 
 def make_put_request(
@@ -92,8 +357,7 @@ def make_put_request(
     headers: Optional[Dict[str, str]] = None
 ) -> APIResponse:
     """Make a PUT request."""
-    response = session.put(url, json=json_data, data=data, headers=headers)
-    return APIResponse(response)
+    return _send(session, "PUT", url, json_data=json_data, data=data, headers=headers)
 
 
 def make_delete_request(
@@ -102,5 +366,4 @@ def make_delete_request(
     headers: Optional[Dict[str, str]] = None
 ) -> APIResponse:
     """Make a DELETE request."""
-    response = session.delete(url, headers=headers)
-    return APIResponse(response)
+    return _send(session, "DELETE", url, headers=headers)
@@ -0,0 +1,108 @@
+"""
+Asyncio counterparts of the API helper functions.
+
+Requests are dispatched to a bounded thread pool that shares a single
+requests.Session, so everything mounted on the session (adapters, headers,
+TLS settings) applies to the async path exactly as it does to the blocking
+make_*_request helpers, and both return the same APIResponse. With an
+IdSpace, each request is attributed to the test that awaited it, not to
+the executor thread.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+import requests
+
+from utils.api_helpers import (
+    APIResponse,
+    make_get_request,
+    make_post_request,
+    make_put_request,
+    make_delete_request
+)
+from utils.id_space import IdSpace
+
+
+class AsyncAPIClient:
+    """Event-loop friendly client that fans requests out over a shared session."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        max_concurrency: int = 100,
+        id_space: Optional[IdSpace] = None
+    ):
+        self.session = session
+        self.max_concurrency = max_concurrency
+        self.id_space = id_space
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix="async-api"
+        )
+
+    async def call(self, func: Callable[..., APIResponse], *args, **kwargs) -> APIResponse:
+        """Run a blocking make_*_request helper without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        request = functools.partial(func, self.session, *args, **kwargs)
+        if self.id_space is not None:
+            request = self.id_space.bound(request)
+        return await loop.run_in_executor(self._executor, request)
+
+    def gather(self, *awaitables: Awaitable) -> List[Any]:
+        """
+        Run awaitables concurrently and return their results in order.
+
+        Intended for synchronous tests; from inside a running event loop
+        use ``await asyncio.gather(...)`` directly.
+        """
+        async def _gather() -> List[Any]:
+            return list(await asyncio.gather(*awaitables))
+
+        return asyncio.run(_gather())
+
+    def close(self):
+        """Wait for in-flight requests and release the worker threads."""
+        self._executor.shutdown(wait=True)
+
+
+async def async_make_get_request(
+    client: AsyncAPIClient,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> APIResponse:
+    """Make a GET request asynchronously."""
+    return await client.call(make_get_request, url, params=params, headers=headers)
+
+
+async def async_make_post_request(
+    client: AsyncAPIClient,
+    url: str,
+    json_data: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> APIResponse:
+    """Make a POST request asynchronously."""
+    return await client.call(make_post_request, url, json_data=json_data, data=data, headers=headers)
+
+
+async def async_make_put_request(
+    client: AsyncAPIClient,
+    url: str,
+    json_data: Optional[Dict[str, Any]] = None,
+    data: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> APIResponse:
+    """Make a PUT request asynchronously."""
+    return await client.call(make_put_request, url, json_data=json_data, data=data, headers=headers)
+
+
+async def async_make_delete_request(
+    client: AsyncAPIClient,
+    url: str,
+    headers: Optional[Dict[str, str]] = None
+) -> APIResponse:
+    """Make a DELETE request asynchronously."""
+    return await client.call(make_delete_request, url, headers=headers)
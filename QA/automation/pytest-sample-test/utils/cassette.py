@@ -0,0 +1,211 @@
+"""
+Record/replay store for API traffic.
+
+A cassette is a directory with one segment per process (``main``, ``gw0``,
+...). Each segment has an append-only ``.data`` file of response records
+and an ``.idx`` file of fixed-size ``(key digest, offset)`` entries.
+Replay memory-maps the data files and builds a dict from the indexes, so
+loading cost does not grow with body sizes and matching is O(1) per
+request.
+
+The key is a digest of the method, the templated path (``GET /pet/{petId}``)
+and a normalized request hash covering the concrete path, the sorted
+query string and the canonical (decompressed) JSON body. Repeated identical requests
+are replayed in the order they were recorded.
+"""
+import glob
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from utils.api_helpers import decompress_body
+from utils.metrics import endpoint_key, resource_path
+
+
+_RECORD_HEADER = struct.Struct("<16sHII")
+_INDEX_ENTRY = struct.Struct("<16sQ")
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+def _normalized_body(body: Any, encoding: Optional[str] = None) -> bytes:
+    if not body:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    body = decompress_body(body, encoding)
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode()
+    except ValueError:
+        return bytes(body)
+
+
+def request_key(request: requests.PreparedRequest) -> Tuple[bytes, str]:
+    """Return the (digest, endpoint) key of a prepared request."""
+    url = urlsplit(request.url)
+    endpoint = endpoint_key(request.method, request.url)
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (
+        endpoint.encode(),
+        resource_path(url.path).encode(),
+        urlencode(sorted(parse_qsl(url.query, keep_blank_values=True))).encode(),
+        _normalized_body(request.body, request.headers.get("Content-Encoding")),
+    ):
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.digest(), endpoint
+
+
+class Cassette:
+    """One cassette directory opened for recording or replay."""
+
+    def __init__(self, directory: str, mode: str, segment: str = "main"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.segment = segment
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._maps: List[mmap.mmap] = []
+        self._index: Dict[bytes, List[Tuple[int, int]]] = {}
+        self._cursors: Dict[bytes, int] = {}
+
+        if mode == "record":
+            os.makedirs(directory, exist_ok=True)
+            self._data = open(os.path.join(directory, f"{segment}.data"), "wb")
+            self._idx = open(os.path.join(directory, f"{segment}.idx"), "wb")
+        else:
+            self._load()
+
+    def _load(self):
+        for index_path in sorted(glob.glob(os.path.join(self.directory, "*.idx"))):
+            data_path = index_path[:-len(".idx")] + ".data"
+            if not os.path.getsize(data_path):
+                continue
+            with open(data_path, "rb") as data_file:
+                self._maps.append(mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ))
+            segment = len(self._maps) - 1
+            with open(index_path, "rb") as index_file:
+                entries = index_file.read()
+            for digest, offset in _INDEX_ENTRY.iter_unpack(entries):
+                self._index.setdefault(digest, []).append((segment, offset))
+
+    def __len__(self) -> int:
+        return sum(len(offsets) for offsets in self._index.values())
+
+    def record(self, request: requests.PreparedRequest, status: int, headers: Dict[str, str], body: bytes):
+        """Append one interaction."""
+        digest, endpoint = request_key(request)
+        meta = json.dumps({
+            "method": request.method,
+            "url": request.url,
+            "endpoint": endpoint,
+            "headers": {
+                name: value for name, value in headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+        }).encode()
+        with self._lock:
+            offset = self._data.tell()
+            self._data.write(_RECORD_HEADER.pack(digest, status, len(meta), len(body)))
+            self._data.write(meta)
+            self._data.write(body)
+            self._data.flush()
+            self._idx.write(_INDEX_ENTRY.pack(digest, offset))
+            self._idx.flush()
+
+    def lookup(self, request: requests.PreparedRequest) -> Tuple[int, Dict[str, str], bytes]:
+        """Return (status, headers, body) of the next recorded match."""
+        digest, endpoint = request_key(request)
+        with self._lock:
+            offsets = self._index.get(digest)
+            if not offsets:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded interaction for {endpoint} ({request.url})")
+            position = self._cursors.get(digest, 0)
+            self._cursors[digest] = position + 1
+        segment, offset = offsets[min(position, len(offsets) - 1)]
+
+        data = self._maps[segment]
+        _, status, meta_len, body_len = _RECORD_HEADER.unpack_from(data, offset)
+        start = offset + _RECORD_HEADER.size
+        meta = json.loads(data[start:start + meta_len])
+        body = data[start + meta_len:start + meta_len + body_len]
+        return status, meta["headers"], body
+
+    def close(self):
+        if self.mode == "record":
+            self._data.close()
+            self._idx.close()
+        for data in self._maps:
+            data.close()
+        self._maps = []
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    Transport adapter that records traffic through an inner adapter, or
+    replays it from the cassette without any network access.
+    """
+
+    def __init__(self, cassette: Cassette, inner: HTTPAdapter):
+        self.cassette = cassette
+        self.inner = inner
+        super().__init__()
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "record":
+            response = self.inner.send(request, **kwargs)
+            self.cassette.record(request, response.status_code, dict(response.headers), response.content)
+            return response
+
+        status, headers, body = self.cassette.lookup(request)
+        headers["Content-Length"] = str(len(body))
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=status,
+            preload_content=False,
+            decode_content=False
+        )
+        return self.build_response(request, raw)
+
+    def close(self):
+        self.inner.close()
+        super().close()
+
+
+def mount_cassette(session: requests.Session, cassette: Cassette):
+    """Wrap every adapter mounted on the session with a CassetteAdapter."""
+    for prefix, adapter in list(session.adapters.items()):
+        session.mount(prefix, CassetteAdapter(cassette, inner=adapter))
+
+
+def write_metadata(directory: str, metadata: Dict[str, Any]):
+    """Store run metadata, such as the data seed, next to the cassette."""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "meta.json"), "w") as meta_file:
+        json.dump(metadata, meta_file)
+
+
+def read_metadata(directory: str) -> Dict[str, Any]:
+    """Read metadata stored with write_metadata(), or {} when absent."""
+    path = os.path.join(directory, "meta.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path) as meta_file:
+        return json.load(meta_file)
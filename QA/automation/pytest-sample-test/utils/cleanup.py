@@ -0,0 +1,151 @@
+"""
+Concurrent cleanup of resources created by tests.
+
+Resources are registered as ``{"type", "id", "url"}`` dicts. Deletes run
+on a bounded worker pool; resources keyed by a server-assigned ``id`` can
+optionally be deferred to one batch at session end, since no later test
+can collide with them. Name-keyed resources such as users are always
+deleted right after their test.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, List, Optional
+
+import requests
+
+
+@dataclass
+class CleanupStats:
+    """Cleanup outcome counts and time for one resource type."""
+    deleted: int = 0
+    missing: int = 0
+    leaked: int = 0
+    seconds: float = 0.0
+
+    def add(self, other: "CleanupStats"):
+        self.deleted += other.deleted
+        self.missing += other.missing
+        self.leaked += other.leaked
+        self.seconds += other.seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class CleanupReport:
+    """Cleanup outcomes of every engine in a run, merged across xdist workers."""
+    stats: Dict[str, CleanupStats] = field(default_factory=dict)
+    leaks: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add(self, stats: Dict[str, CleanupStats], leaks: List[Dict[str, Any]]):
+        for resource_type, type_stats in stats.items():
+            self.stats.setdefault(resource_type, CleanupStats()).add(type_stats)
+        self.leaks.extend(leaks)
+
+    def merge(self, exported: Dict[str, Any]):
+        """Merge a report serialized with to_dict()."""
+        self.add(
+            {resource_type: CleanupStats(**data) for resource_type, data in exported["stats"].items()},
+            exported["leaks"]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stats": {resource_type: stats.to_dict() for resource_type, stats in self.stats.items()},
+            "leaks": list(self.leaks),
+        }
+
+
+cleanup_report = CleanupReport()
+"""Cleanup outcomes of every engine closed in this process."""
+
+
+def is_deferrable(resource: Dict[str, Any]) -> bool:
+    """A resource can wait for the session batch when it has a server-assigned id."""
+    return resource.get("defer", resource.get("id") is not None)
+
+
+class CleanupEngine:
+    """Deletes tracked resources concurrently and records what leaked."""
+
+    def __init__(self, session: requests.Session, max_workers: int = 8, defer: bool = False):
+        self.session = session
+        self.defer = defer
+        self.stats: Dict[str, CleanupStats] = {}
+        self.leaks: List[Dict[str, Any]] = []
+        self._deferred: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cleanup")
+
+    def cleanup(self, resources: List[Dict[str, Any]]):
+        """Delete a test's resources now, or queue deferrable ones for flush()."""
+        immediate = []
+        for resource in _unique(resources):
+            if self.defer and is_deferrable(resource):
+                with self._lock:
+                    self._deferred.append(resource)
+            else:
+                immediate.append(resource)
+        self._delete_all(immediate)
+
+    def flush(self):
+        """Delete every deferred resource."""
+        with self._lock:
+            deferred, self._deferred = self._deferred, []
+        self._delete_all(deferred)
+
+    def close(self):
+        """Flush deferred deletes, stop the worker pool and add to cleanup_report."""
+        self.flush()
+        self._executor.shutdown(wait=True)
+        cleanup_report.add(self.stats, self.leaks)
+
+    def _delete_all(self, resources: List[Dict[str, Any]]):
+        if len(resources) == 1:
+            self._delete(resources[0])
+        elif resources:
+            list(self._executor.map(self._delete, resources))
+
+    def _delete(self, resource: Dict[str, Any]):
+        url = resource.get("url")
+        if not url:
+            return
+
+        error: Optional[str] = None
+        status_code: Optional[int] = None
+        start = time.perf_counter()
+        try:
+            status_code = self.session.delete(url).status_code
+        except requests.RequestException as exc:
+            error = str(exc)
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            stats = self.stats.setdefault(resource.get("type") or "unknown", CleanupStats())
+            stats.seconds += elapsed
+            if error is None and 200 <= status_code < 300:
+                stats.deleted += 1
+            elif status_code == 404:
+                stats.missing += 1
+            else:
+                stats.leaked += 1
+                self.leaks.append({
+                    "type": resource.get("type"),
+                    "id": resource.get("id", resource.get("username")),
+                    "url": url,
+                    "error": error or f"status {status_code}",
+                })
+
+
+def _unique(resources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen = set()
+    unique = []
+    for resource in resources:
+        url = resource.get("url")
+        if url not in seen:
+            seen.add(url)
+            unique.append(resource)
+    return unique
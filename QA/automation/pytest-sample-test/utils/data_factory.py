@@ -0,0 +1,107 @@
+"""
+Seeded, pooled test data for pet, order and user payloads.
+
+One Faker instance per process generates payloads in batches; fixtures
+pop from the pool in O(1). The stream is derived from the data seed and
+the xdist worker id, so reruns with the same ``--data-seed`` and worker
+layout produce the same payloads. Given an ``IdScope``, payloads get ids
+(and usernames) from the calling test's namespace, so they never collide
+with another test's or worker's.
+"""
+import random
+import threading
+import zlib
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Callable, Deque, Optional
+
+from utils.id_space import IdScope
+
+
+# Faker's date providers default to "now" as the upper bound, which would
+# make seeded payloads differ from run to run.
+_LATEST_SHIP_DATE = datetime(2030, 1, 1)
+
+
+class DataFactory:
+    """Generates reproducible test payloads in bulk."""
+
+    def __init__(self, seed: int, namespace: str = "main", batch_size: int = 64):
+        self.seed = seed
+        self.namespace = namespace
+        self.batch_size = batch_size
+        self._stream_seed = zlib.crc32(f"{seed}:{namespace}".encode())
+        self._random = random.Random(self._stream_seed)
+        self._fake = None
+        self._serial = 0
+        self._pools: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fake(self):
+        """Seeded Faker instance, created on first use."""
+        if self._fake is None:
+            from faker import Faker
+            self._fake = Faker()
+            self._fake.seed_instance(self._stream_seed)
+        return self._fake
+
+    def pet(self, ids: Optional[IdScope] = None) -> Dict[str, Any]:
+        """Return a new pet payload, with an id from ``ids`` when given."""
+        pet = self._take("pet", self._generate_pet)
+        if ids is not None:
+            pet["id"] = ids.next_id()
+        return pet
+
+    def order(self, ids: Optional[IdScope] = None) -> Dict[str, Any]:
+        """Return a new order payload, with an id from ``ids`` when given (petId is random)."""
+        order = self._take("order", self._generate_order)
+        if ids is not None:
+            order["id"] = ids.next_id()
+        return order
+
+    def user(self, ids: Optional[IdScope] = None) -> Dict[str, Any]:
+        """Return a new user payload with a username unique to this run and worker (and test, with ``ids``)."""
+        user = self._take("user", self._generate_user)
+        if ids is not None:
+            user["id"] = ids.next_id()
+            user["username"] = ids.name(user["username"], user["id"])
+        else:
+            with self._lock:
+                self._serial += 1
+                user["username"] = f"{user['username']}_{self.namespace}_{self._serial}"
+        return user
+
+    def _take(self, kind: str, generate: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            pool = self._pools.setdefault(kind, deque())
+            if not pool:
+                pool.extend(generate() for _ in range(self.batch_size))
+            return pool.popleft()
+
+    def _generate_pet(self) -> Dict[str, Any]:
+        return {
+            "name": self.fake.first_name(),
+            "photoUrls": [self.fake.image_url()],
+            "status": "available"
+        }
+
+    def _generate_order(self) -> Dict[str, Any]:
+        return {
+            "petId": self._random.randint(1, 1000),
+            "quantity": self._random.randint(1, 10),
+            "shipDate": self.fake.iso8601(end_datetime=_LATEST_SHIP_DATE),
+            "status": "placed",
+            "complete": False
+        }
+
+    def _generate_user(self) -> Dict[str, Any]:
+        return {
+            "username": self.fake.user_name(),
+            "firstName": self.fake.first_name(),
+            "lastName": self.fake.last_name(),
+            "email": self.fake.email(),
+            "password": self.fake.password(),
+            "phone": self.fake.phone_number(),
+            "userStatus": 0
+        }
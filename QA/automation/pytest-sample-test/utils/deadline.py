@@ -0,0 +1,57 @@
+"""
+Whole-run deadline budget for API requests.
+"""
+import threading
+import time
+from typing import Optional, Tuple
+
+import requests
+
+
+class RunDeadlineExceeded(requests.exceptions.Timeout):
+    """Raised instead of sending a request once the run deadline has passed."""
+
+
+class DeadlineBudget:
+    """
+    Time budget for a whole test run.
+
+    Per-request timeouts are capped at the time left, so requests issued
+    near the end of the budget fail fast instead of overrunning it, and
+    requests issued after it are rejected without touching the network.
+    """
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining(self) -> float:
+        return self.seconds - self.elapsed()
+
+    def is_exhausted(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self, url: Optional[str] = None, wait: float = 0.0) -> float:
+        """
+        Return the time left, raising RunDeadlineExceeded when it is not
+        more than wait (e.g. a retry backoff about to be slept).
+        """
+        remaining = self.remaining()
+        if remaining <= wait:
+            with self._lock:
+                self.rejected += 1
+            raise RunDeadlineExceeded(
+                f"Run deadline of {self.seconds:.0f}s exceeded, not sending request to {url}"
+            )
+        return remaining
+
+    def clamp(self, timeout: Tuple[float, float], url: Optional[str] = None) -> Tuple[float, float]:
+        """Cap a (connect, read) timeout at the remaining budget."""
+        remaining = self.check(url)
+        connect, read = timeout
+        return min(connect, remaining), min(read, remaining)
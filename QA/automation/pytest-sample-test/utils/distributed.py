@@ -0,0 +1,598 @@
+"""
+Coordinator/worker test distribution across machines.
+
+The coordinator collects the suite, queues the node ids longest first by
+their recorded durations and serves them over TCP, one at a time, to any
+number of workers running this harness with ``--dist-worker=HOST:PORT``.
+Workers stream their test reports back and, when the queue is empty, the
+same stats an xdist worker hands its controller. A worker that
+disconnects or stops sending heartbeats is dropped and the tests it was
+handed but had not finished go back to the front of the queue; a test
+that was running when its worker died is retried ``max_requeue`` times
+before it is reported as an error.
+
+Messages are JSON lines. ``--dist-local=N`` runs N workers as local
+processes against a coordinator on 127.0.0.1, which behaves exactly like
+pods on a cluster and so can be tested offline.
+"""
+import json
+import os
+import queue
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Deque, List, Optional, Set, Tuple
+
+import pytest
+
+
+_POLL_SECONDS = 0.2
+_CONNECT_RETRY_SECONDS = 1.0
+# Options that make a process a coordinator; local workers are started without them.
+_COORDINATOR_OPTIONS = ("--dist-coordinator", "--dist-local")
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """Split HOST:PORT; raises ValueError when the port is missing or not a number."""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Expected HOST:PORT, got {address!r}")
+    return host, int(port)
+
+
+class WorkQueue:
+    """Pending node ids plus the ones handed to each worker and not yet finished."""
+
+    def __init__(self, nodeids: List[str], max_requeue: int = 1):
+        self.pending: Deque[str] = deque(nodeids)
+        self.assigned: Dict[str, List[str]] = {}
+        self.attempts: Dict[str, int] = {}
+        self.max_requeue = max_requeue
+        self.requeued = 0
+        self._lost: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def take(self, worker: str, count: int = 1) -> Optional[List[str]]:
+        """
+        Hand up to count tests to a worker. An empty list means wait (other
+        workers may still lose tests back to the queue); None means done.
+        """
+        with self._lock:
+            if worker in self._lost:
+                return None
+            if not self.pending:
+                return [] if any(self.assigned.values()) else None
+            tests = [self.pending.popleft() for _ in range(min(count, len(self.pending)))]
+            self.assigned.setdefault(worker, []).extend(tests)
+            return tests
+
+    def complete(self, worker: str, nodeid: str):
+        """Mark a test finished by the worker it was handed to."""
+        with self._lock:
+            tests = self.assigned.get(worker, [])
+            if nodeid in tests:
+                tests.remove(nodeid)
+
+    def lose(self, worker: str, running: Optional[str]) -> Tuple[List[str], List[str]]:
+        """
+        Put a lost worker's unfinished tests back on the queue. The test it
+        was running counts as an attempt; return (requeued, given up).
+        """
+        with self._lock:
+            self._lost.add(worker)
+            tests = self.assigned.pop(worker, [])
+            requeued, given_up = [], []
+            for nodeid in tests:
+                if nodeid == running:
+                    self.attempts[nodeid] = self.attempts.get(nodeid, 0) + 1
+                    if self.attempts[nodeid] > self.max_requeue:
+                        given_up.append(nodeid)
+                        continue
+                requeued.append(nodeid)
+            self.pending.extendleft(reversed(requeued))
+            self.requeued += len(requeued)
+            return requeued, given_up
+
+    def close(self):
+        """Hand out nothing more, e.g. once --maxfail is reached."""
+        with self._lock:
+            self.pending.clear()
+
+    @property
+    def done(self) -> bool:
+        with self._lock:
+            return not self.pending and not any(self.assigned.values())
+
+
+class _Connection:
+    """One JSON-lines socket; writes may come from several threads."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict[str, Any]):
+        data = (json.dumps(message, separators=(",", ":"), default=str) + "\n").encode()
+        with self._lock:
+            self.sock.sendall(data)
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        line = self._reader.readline()
+        return json.loads(line) if line else None
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class WorkerState:
+    """What the coordinator knows about one connected worker."""
+
+    def __init__(self, worker: str, connection: _Connection):
+        self.worker = worker
+        self.connection = connection
+        self.last_seen = time.monotonic()
+        self.tests = 0
+        self.finished = False
+        self.output: Dict[str, Any] = {}
+        self.lost: Optional[str] = None
+        self.requeued = 0
+        self.running: Optional[str] = None
+        self.buffered: List[Dict[str, Any]] = []
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def handle(self):
+        self.server.coordinator._serve(_Connection(self.request))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int], coordinator: "Coordinator"):
+        self.coordinator = coordinator
+        super().__init__(address, _Handler)
+
+
+class Coordinator:
+    """Serves the work queue and replays the workers' reports into this pytest session."""
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        settings: Dict[str, Any],
+        timeout: float = 120.0,
+        max_requeue: int = 1
+    ):
+        self.settings = settings
+        self.timeout = timeout
+        self.queue = WorkQueue([], max_requeue)
+        self.nodeids: Set[str] = set()
+        self.workers: Dict[str, WorkerState] = {}
+        self.given_up: List[Tuple[str, str]] = []
+        self.events: "queue.Queue[Tuple[str, str, Dict[str, Any]]]" = queue.Queue()
+        self._loaded = threading.Event()
+        self._lock = threading.Lock()
+        self._slots = 0
+        self._server = _Server(address, self)
+        self.address = self._server.server_address[:2]
+
+    def start(self):
+        """Accept workers; they can join and collect while this process is still collecting."""
+        threading.Thread(target=self._server.serve_forever, name="dist-coordinator", daemon=True).start()
+
+    def load(self, nodeids: List[str]):
+        """Queue the collected tests, in the order given, and start handing them out."""
+        self.queue = WorkQueue(nodeids, self.queue.max_requeue)
+        self.nodeids = set(nodeids)
+        self._loaded.set()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        for state in list(self.workers.values()):
+            state.connection.close()
+
+    def _serve(self, connection: _Connection):
+        """Handle one worker connection until it closes (runs on a server thread)."""
+        hello = connection.receive()
+        if not hello or hello.get("type") != "hello":
+            connection.close()
+            return
+        worker = hello["worker"]
+        with self._lock:
+            taken = worker in self.workers
+            if not taken:
+                state = self.workers[worker] = WorkerState(worker, connection)
+                # Slot 0 is this process; every worker that joins gets the next one.
+                self._slots += 1
+                slot = self._slots
+        if taken:
+            connection.send({"type": "refused", "reason": f"worker id {worker!r} is already taken"})
+            connection.close()
+            return
+        connection.send(dict(self.settings, type="welcome", workerid=worker, worker_slot=slot, timeout=self.timeout))
+        self.events.put(("joined", worker, {}))
+
+        try:
+            while True:
+                message = connection.receive()
+                if message is None:
+                    break
+                state.last_seen = time.monotonic()
+                if state.lost:
+                    continue
+                kind = message["type"]
+                if kind in ("collected", "take"):
+                    # Heartbeats pile up unread while this thread waits for the
+                    # coordinator to collect, so the wait counts as contact.
+                    while not self._loaded.wait(_POLL_SECONDS):
+                        state.last_seen = time.monotonic()
+                if kind == "collected":
+                    missing = self.nodeids - set(message["nodeids"])
+                    if missing:
+                        reason = f"{len(missing)} queued tests were not collected, e.g. {sorted(missing)[0]}"
+                        connection.send({"type": "refused", "reason": reason})
+                        self.events.put(("lost", worker, {"reason": reason}))
+                        return
+                    connection.send({"type": "ok"})
+                elif kind == "take":
+                    connection.send({"type": "tests", "nodeids": self.queue.take(worker, message.get("count", 1))})
+                elif kind != "heartbeat":
+                    self.events.put((kind, worker, message))
+        except (OSError, ValueError) as exc:
+            self.events.put(("lost", worker, {"reason": f"connection error: {exc}"}))
+            return
+        self.events.put(("lost", worker, {"reason": "disconnected"}))
+
+    def silent_workers(self) -> List[str]:
+        """Workers that have sent nothing, not even a heartbeat, for longer than the timeout."""
+        now = time.monotonic()
+        return [
+            state.worker for state in list(self.workers.values())
+            if not state.lost and not state.finished and now - state.last_seen > self.timeout
+        ]
+
+    def lose(self, worker: str, reason: str) -> Tuple[List[str], List[str]]:
+        """Drop a worker, discard its unfinished test's reports and requeue its tests."""
+        state = self.workers[worker]
+        if state.lost or state.finished:
+            return [], []
+        state.lost = reason
+        running, state.running, state.buffered = state.running, None, []
+        requeued, given_up = self.queue.lose(worker, running)
+        self.given_up.extend((nodeid, worker) for nodeid in given_up)
+        state.connection.close()
+        return requeued, given_up
+
+    @property
+    def active(self) -> List[WorkerState]:
+        return [state for state in list(self.workers.values()) if not state.lost and not state.finished]
+
+
+class DistWorker:
+    """Worker side of the protocol: takes tests from the coordinator and streams reports back."""
+
+    def __init__(self, address: Tuple[str, int], worker: str, connect_timeout: float = 120.0):
+        self.worker = worker
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                sock = socket.create_connection(address, timeout=connect_timeout)
+                break
+            except OSError:
+                # The coordinator pod may still be starting.
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(_CONNECT_RETRY_SECONDS)
+        sock.settimeout(None)
+        self.connection = _Connection(sock)
+        self._stop = threading.Event()
+
+    def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        self.connection.send(message)
+        reply = self.connection.receive()
+        if reply is None:
+            raise ConnectionError("coordinator closed the connection")
+        if reply["type"] == "refused":
+            raise ConnectionError(f"coordinator refused worker {self.worker}: {reply['reason']}")
+        return reply
+
+    def join(self) -> Dict[str, Any]:
+        """Announce this worker and return the run settings shared by the coordinator."""
+        settings = self._request({"type": "hello", "worker": self.worker})
+        interval = max(0.5, settings["timeout"] / 4)
+        threading.Thread(target=self._heartbeat, args=(interval,), name="dist-heartbeat", daemon=True).start()
+        return settings
+
+    def check_collection(self, nodeids: List[str]):
+        """Make sure this worker collected every test the coordinator queued."""
+        self._request({"type": "collected", "nodeids": nodeids})
+
+    def _heartbeat(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.connection.send({"type": "heartbeat"})
+            except OSError:
+                return
+
+    def take(self, count: int = 1) -> Optional[List[str]]:
+        """Next tests to run; an empty list means poll again, None means the queue is done."""
+        return self._request({"type": "take", "count": count})["nodeids"]
+
+    def send(self, kind: str, **fields):
+        self.connection.send(dict(fields, type=kind))
+
+    def finish(self, output: Dict[str, Any]):
+        """Send this worker's stats and disconnect."""
+        self._stop.set()
+        try:
+            self.send("finished", output=output)
+        finally:
+            self.connection.close()
+
+
+class WorkerReporter:
+    """pytest plugin that forwards this worker's test reports to the coordinator."""
+
+    def __init__(self, client: DistWorker, config: pytest.Config):
+        self.client = client
+        self.config = config
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self.client.send("logstart", nodeid=nodeid, location=location)
+
+    def pytest_runtest_logreport(self, report):
+        data = self.config.hook.pytest_report_to_serializable(config=self.config, report=report)
+        self.client.send("report", report=data)
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        self.client.send("logfinish", nodeid=nodeid, location=location)
+
+
+def run_worker(session: pytest.Session, client: DistWorker):
+    """Run the tests the coordinator hands out until it has none left."""
+    items = {item.nodeid: item for item in session.items}
+    queued: Deque[Any] = deque()
+    current = None
+    done = False
+    while True:
+        if not queued and not done:
+            tests = client.take()
+            if tests is None:
+                done = True
+            else:
+                queued.extend(items[nodeid] for nodeid in tests)
+        # With nothing queued the item runs as the last one: fixtures are torn down.
+        if current is not None:
+            current.config.hook.pytest_runtest_protocol(item=current, nextitem=queued[0] if queued else None)
+        if session.shouldfail or session.shouldstop:
+            return
+        current = queued.popleft() if queued else None
+        if current is None:
+            if done:
+                return
+            time.sleep(_POLL_SECONDS)
+
+
+def local_worker_command(args: List[str], address: Tuple[str, int], worker: str) -> List[str]:
+    """pytest command line for a local worker: the coordinator's own arguments, pointed at it."""
+    worker_args = []
+    skip_value = False
+    for arg in args:
+        if skip_value:
+            skip_value = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in _COORDINATOR_OPTIONS:
+            skip_value = "=" not in arg
+            continue
+        worker_args.append(arg)
+    return [
+        sys.executable, "-m", "pytest", *worker_args,
+        f"--dist-worker={address[0]}:{address[1]}", "--dist-worker-id", worker
+    ]
+
+
+class LocalWorkers:
+    """
+    Worker processes started on this machine for --dist-local, logging to
+    <log_dir>/<worker>.log. A worker that dies while tests remain is
+    replaced, like xdist restarts crashed nodes, while restarts are left.
+    """
+
+    def __init__(self, args: List[str], address: Tuple[str, int], log_dir: str, cwd: str):
+        self.args = args
+        self.address = address
+        self.log_dir = log_dir
+        self.cwd = cwd
+        self.processes: Dict[str, subprocess.Popen] = {}
+        self.restarts_left = 0
+        self._reaped: Set[str] = set()
+
+    def start(self, count: int):
+        os.makedirs(self.log_dir, exist_ok=True)
+        self.restarts_left = count
+        for _ in range(count):
+            self._spawn()
+
+    def _spawn(self) -> str:
+        worker = f"local{len(self.processes)}"
+        with open(os.path.join(self.log_dir, f"{worker}.log"), "wb") as log_file:
+            self.processes[worker] = subprocess.Popen(
+                local_worker_command(self.args, self.address, worker),
+                cwd=self.cwd,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+        return worker
+
+    def reap(self) -> List[Tuple[str, int]]:
+        """Workers that exited since the last call, with their exit codes."""
+        exited = []
+        for worker, process in list(self.processes.items()):
+            if worker not in self._reaped and process.poll() is not None:
+                self._reaped.add(worker)
+                exited.append((worker, process.returncode))
+        return exited
+
+    def replace(self) -> Optional[str]:
+        """Start a replacement worker if restarts are left and return its name."""
+        if self.restarts_left <= 0:
+            return None
+        self.restarts_left -= 1
+        return self._spawn()
+
+    @property
+    def running(self) -> int:
+        return sum(process.poll() is None for process in self.processes.values())
+
+    def stop(self, timeout: float = 10.0):
+        """Wait for the workers to exit, killing stragglers."""
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+def run_coordinator(
+    session: pytest.Session,
+    coordinator: Coordinator,
+    local_workers: Optional[LocalWorkers],
+    log: Callable[[str], None]
+):
+    """
+    Replay the workers' reports through this session's hooks until every
+    test has finished and every worker has handed in its stats.
+    """
+    config = session.config
+    items = {item.nodeid: item for item in session.items}
+    last_active = time.monotonic()
+    while not (coordinator.queue.done and coordinator.workers and not coordinator.active):
+        if session.shouldfail or session.shouldstop:
+            coordinator.queue.close()
+        try:
+            kind, worker, message = coordinator.events.get(timeout=_POLL_SECONDS)
+            _handle_event(config, coordinator, items, kind, worker, message, log)
+        except queue.Empty:
+            pass
+
+        for worker in coordinator.silent_workers():
+            reason = f"silent for over {coordinator.timeout:.0f}s"
+            _handle_event(config, coordinator, items, "lost", worker, {"reason": reason}, log)
+        if local_workers is not None:
+            _reap_local_workers(config, coordinator, items, local_workers, log)
+
+        if coordinator.active:
+            last_active = time.monotonic()
+            continue
+        if local_workers is not None and not local_workers.running:
+            reason = "every local worker exited"
+        elif time.monotonic() - last_active > coordinator.timeout:
+            reason = f"no dist worker connected for {coordinator.timeout:.0f}s"
+        else:
+            continue
+        log(f"{reason}; {len(coordinator.queue.pending)} tests did not run")
+        raise session.Failed(reason)
+
+
+def _reap_local_workers(
+    config: pytest.Config,
+    coordinator: Coordinator,
+    items: Dict[str, Any],
+    local_workers: LocalWorkers,
+    log: Callable[[str], None]
+):
+    for worker, returncode in local_workers.reap():
+        state = coordinator.workers.get(worker)
+        if state is not None and state.finished:
+            continue
+        reason = f"exited with code {returncode}, see {os.path.join(local_workers.log_dir, worker)}.log"
+        if state is not None:
+            _handle_event(config, coordinator, items, "lost", worker, {"reason": reason}, log)
+        else:
+            log(f"dist worker {worker} {reason}")
+        if not coordinator.queue.done:
+            replacement = local_workers.replace()
+            if replacement is not None:
+                log(f"dist worker {replacement} started to replace {worker}")
+
+
+def _handle_event(
+    config: pytest.Config,
+    coordinator: Coordinator,
+    items: Dict[str, Any],
+    kind: str,
+    worker: str,
+    message: Dict[str, Any],
+    log: Callable[[str], None]
+):
+    state = coordinator.workers[worker]
+    if state.lost or state.finished:
+        return
+    if kind == "joined":
+        log(f"dist worker {worker} joined")
+    elif kind == "logstart":
+        state.running = message["nodeid"]
+        state.buffered = [message]
+    elif kind == "report":
+        state.buffered.append(message)
+    elif kind == "logfinish":
+        # Reports are replayed per finished test, so a test whose worker dies
+        # midway is rerun elsewhere without leaving half its reports behind.
+        for buffered in state.buffered + [message]:
+            _replay(config, worker, buffered)
+        coordinator.queue.complete(worker, message["nodeid"])
+        state.running, state.buffered = None, []
+        state.tests += 1
+    elif kind == "finished":
+        state.finished = True
+        state.output = message["output"]
+    elif kind == "lost":
+        requeued, given_up = coordinator.lose(worker, message["reason"])
+        state.requeued = len(requeued)
+        log(f"dist worker {worker} lost ({message['reason']}), {len(requeued)} tests requeued")
+        for nodeid in given_up:
+            _report_crash(config, items[nodeid], worker, message["reason"])
+
+
+def _replay(config: pytest.Config, worker: str, message: Dict[str, Any]):
+    kind = message["type"]
+    if kind == "logstart":
+        config.hook.pytest_runtest_logstart(nodeid=message["nodeid"], location=tuple(message["location"]))
+    elif kind == "logfinish":
+        config.hook.pytest_runtest_logfinish(nodeid=message["nodeid"], location=tuple(message["location"]))
+    else:
+        report = config.hook.pytest_report_from_serializable(config=config, data=message["report"])
+        report.dist_worker = worker
+        config.hook.pytest_runtest_logreport(report=report)
+
+
+def _report_crash(config: pytest.Config, item, worker: str, reason: str):
+    location = item.location
+    config.hook.pytest_runtest_logstart(nodeid=item.nodeid, location=location)
+    report = pytest.TestReport(
+        item.nodeid,
+        location,
+        {},
+        "failed",
+        f"dist worker {worker} was lost while running this test ({reason}) on every attempt",
+        "call"
+    )
+    report.dist_worker = worker
+    config.hook.pytest_runtest_logreport(report=report)
+    config.hook.pytest_runtest_logfinish(nodeid=item.nodeid, location=location)
@@ -0,0 +1,147 @@
+"""
+Persistent per-test durations used to balance xdist workers.
+
+Each run folds its measured setup + call + teardown time per test into a
+JSON store with an exponential moving average, so one slow outlier does
+not reorder the next run. Time spent in session-, package-, module- or
+class-scoped fixtures is left out: only the test that happens to run
+first (or last) on a worker pays it, wherever it is scheduled. Tests
+missing from the store are estimated from their module, then from the
+whole suite.
+"""
+import json
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+
+DEFAULT_ESTIMATE = 0.5
+SMOOTHING = 0.5
+
+
+def _module(nodeid: str) -> str:
+    return nodeid.split("::", 1)[0]
+
+
+class DurationStore:
+    """Historical test durations keyed by node id."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.durations: Dict[str, float] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as store_file:
+                    self.durations = {
+                        nodeid: float(seconds) for nodeid, seconds in json.load(store_file).items()
+                    }
+            except (ValueError, AttributeError):
+                self.durations = {}
+        self._module_estimates: Dict[str, float] = {}
+        self._suite_estimate = DEFAULT_ESTIMATE
+        self._refresh_estimates()
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def _refresh_estimates(self):
+        by_module: Dict[str, List[float]] = {}
+        for nodeid, seconds in self.durations.items():
+            by_module.setdefault(_module(nodeid), []).append(seconds)
+        self._module_estimates = {module: statistics.median(values) for module, values in by_module.items()}
+        if self.durations:
+            self._suite_estimate = statistics.median(self.durations.values())
+
+    def estimate(self, nodeid: str) -> float:
+        """Recorded duration of a test, or the median of its module or of the suite."""
+        if nodeid in self.durations:
+            return self.durations[nodeid]
+        return self._module_estimates.get(_module(nodeid), self._suite_estimate)
+
+    def update(self, measured: Dict[str, float]):
+        """Fold one run's durations into the store."""
+        for nodeid, seconds in measured.items():
+            previous = self.durations.get(nodeid)
+            self.durations[nodeid] = seconds if previous is None else previous + SMOOTHING * (seconds - previous)
+        self._refresh_estimates()
+
+    def save(self):
+        """Write the store atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as store_file:
+            json.dump(dict(sorted(self.durations.items())), store_file, indent=2)
+        os.replace(temporary, self.path)
+
+
+def longest_first(nodeids: Iterable[str], store: DurationStore) -> List[int]:
+    """Indices of nodeids ordered by estimated duration, longest first (stable on ties)."""
+    estimates = [store.estimate(nodeid) for nodeid in nodeids]
+    return sorted(range(len(estimates)), key=lambda index: -estimates[index])
+
+
+class RunDurations:
+    """Durations measured in this run, per test and per xdist worker."""
+
+    def __init__(self):
+        self.tests: Dict[str, float] = {}
+        self.workers: Dict[str, float] = {}
+        self.worker_tests: Dict[str, int] = {}
+
+    def add(self, nodeid: str, worker: str, seconds: float, finished: bool, shared: float = 0.0):
+        """
+        Add one setup, call or teardown phase; finished marks the teardown.
+        ``shared`` seconds of broader fixtures count towards the worker's busy
+        time but not towards the test's own duration.
+        """
+        self.tests[nodeid] = self.tests.get(nodeid, 0.0) + max(seconds - shared, 0.0)
+        self.workers[worker] = self.workers.get(worker, 0.0) + seconds
+        if finished:
+            self.worker_tests[worker] = self.worker_tests.get(worker, 0) + 1
+
+
+run_durations = RunDurations()
+"""Test phase durations reported to this process (the controller under xdist)."""
+
+
+class SharedFixtureTime:
+    """
+    Time the current test phase spent setting up or tearing down fixtures
+    broader than a function. Nested fixture setups are counted once.
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._depth = 0
+        self._teardown_started: Dict[int, float] = {}
+
+    @contextmanager
+    def setup(self) -> Iterator[None]:
+        """Time one fixture setup."""
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.seconds += time.perf_counter() - start
+
+    def teardown_started(self, fixturedef):
+        self._teardown_started[id(fixturedef)] = time.perf_counter()
+
+    def teardown_finished(self, fixturedef):
+        started = self._teardown_started.pop(id(fixturedef), None)
+        if started is not None:
+            self.seconds += time.perf_counter() - started
+
+    def take(self) -> float:
+        """Return the time counted since the last call and start over."""
+        seconds, self.seconds = self.seconds, 0.0
+        return seconds
+
+
+shared_fixture_time = SharedFixtureTime()
+"""Broad-fixture time of the test phase running in this process."""
@@ -0,0 +1,237 @@
+"""
+Connection pooling, keep-alive, timeout, retry and rate-limit policy for API sessions.
+"""
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from utils.deadline import DeadlineBudget, RunDeadlineExceeded
+from utils.rate_limit import SharedRateLimiter, is_backpressure
+
+
+@dataclass
+class PoolStats:
+    """Connection usage of one or more sessions."""
+    connections_opened: int = 0
+    requests: int = 0
+
+    @property
+    def connections_reused(self) -> int:
+        return max(self.requests - self.connections_opened, 0)
+
+    def reuse_ratio(self) -> float:
+        """Return the fraction of requests served on an existing connection."""
+        return self.connections_reused / self.requests if self.requests else 0.0
+
+    def add(self, other: "PoolStats"):
+        self.connections_opened += other.connections_opened
+        self.requests += other.requests
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class DeadlineRetry(Retry):
+    """
+    Retry policy that stops retrying once the run deadline would pass
+    during the backoff (or Retry-After) sleep before the next attempt.
+    """
+
+    def __init__(self, *args, budget: Optional[DeadlineBudget] = None, **kwargs):
+        self.budget = budget
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kw) -> "DeadlineRetry":
+        kw.setdefault("budget", self.budget)
+        return super().new(**kw)
+
+    def sleep(self, response=None):
+        if self.budget is not None:
+            wait = self.get_backoff_time()
+            if response is not None and self.respect_retry_after_header:
+                wait = self.get_retry_after(response) or wait
+            url = self.history[-1].url if self.history else None
+            self.budget.check(url, wait)
+        super().sleep(response)
+
+
+def build_retry(
+    retries: int,
+    backoff_factor: float,
+    status_forcelist: Iterable[int],
+    budget: Optional[DeadlineBudget] = None
+) -> Retry:
+    """
+    Build an idempotency-aware retry policy.
+
+    Connection failures are retried for every method because the request
+    never reached the server. Read errors and retryable statuses are only
+    retried for idempotent methods, so a POST is never sent twice. With a
+    budget, a retry whose backoff would outlast the run deadline raises
+    RunDeadlineExceeded instead.
+    """
+    return DeadlineRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(status_forcelist),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False,
+        respect_retry_after_header=True,
+        budget=budget
+    )
+
+
+_attempts = threading.local()
+
+
+class _LimitedPoolMixin:
+    """
+    Connection pool whose every attempt, including urllib3's retries, waits
+    for a rate limiter slot and reports its own latency and outcome.
+    """
+
+    limiter: SharedRateLimiter
+
+    def _make_request(self, conn, method, url, *args, **kwargs):
+        _attempts.waited = getattr(_attempts, "waited", 0.0) + self.limiter.acquire()
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = super()._make_request(conn, method, url, *args, **kwargs)
+            failed = is_backpressure(response.status)
+            return response
+        finally:
+            self.limiter.release(time.perf_counter() - start, failed)
+
+
+def _limited_pool_classes(limiter: SharedRateLimiter) -> Dict[str, type]:
+    return {
+        scheme: type(f"Limited{pool_class.__name__}", (_LimitedPoolMixin, pool_class), {"limiter": limiter})
+        for scheme, pool_class in (("http", HTTPConnectionPool), ("https", HTTPSConnectionPool))
+    }
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter that applies a default (connect, read) timeout to every
+    request and caps it at the remaining run deadline, if any (retries stop
+    at the deadline through DeadlineRetry). With a rate
+    limiter, every attempt (retries included) waits for a slot and reports
+    its latency and outcome; the total wait is stored on the response as
+    ``rate_limit_wait``.
+    """
+
+    def __init__(
+        self,
+        timeout: Tuple[float, float],
+        budget: Optional[DeadlineBudget] = None,
+        limiter: Optional[SharedRateLimiter] = None,
+        **kwargs
+    ):
+        self.timeout = timeout
+        self.budget = budget
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        if self.limiter is not None:
+            self.poolmanager.pool_classes_by_scheme = _limited_pool_classes(self.limiter)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.timeout
+        elif not isinstance(timeout, tuple):
+            timeout = (timeout, timeout)
+        if self.budget is not None:
+            timeout = self.budget.clamp(timeout, request.url)
+        if self.limiter is None:
+            return self._send(request, timeout, **kwargs)
+
+        _attempts.waited = 0.0
+        response = self._send(request, timeout, **kwargs)
+        # Time spent queued behind the limiter is not server latency.
+        response.rate_limit_wait = _attempts.waited
+        return response
+
+    def _send(self, request, timeout, **kwargs):
+        try:
+            return super().send(request, timeout=timeout, **kwargs)
+        except requests.ConnectionError as error:
+            # requests wraps DeadlineRetry's RunDeadlineExceeded (an OSError).
+            if error.args and isinstance(error.args[0], RunDeadlineExceeded):
+                raise error.args[0] from None
+            raise
+
+
+def mount_pooled_adapter(
+    session: requests.Session,
+    pool_connections: int,
+    pool_maxsize: int,
+    pool_block: bool,
+    retry: Retry,
+    timeout: Tuple[float, float],
+    budget: Optional[DeadlineBudget] = None,
+    limiter: Optional[SharedRateLimiter] = None
+) -> HTTPAdapter:
+    """Mount one pooled adapter on the session for both http and https."""
+    adapter = PooledHTTPAdapter(
+        timeout=timeout,
+        budget=budget,
+        limiter=limiter,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=retry
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
+
+
+def _session_pools(session: requests.Session) -> Iterator[HTTPConnectionPool]:
+    adapters = {
+        id(adapter): adapter
+        for adapter in (getattr(adapter, "inner", adapter) for adapter in session.adapters.values())
+    }
+    for adapter in adapters.values():
+        pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+        if pools is None:
+            continue
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                yield pool
+
+
+def collect_pool_stats(session: requests.Session) -> PoolStats:
+    """Sum the connections opened and requests served by the session's pools."""
+    stats = PoolStats()
+    for pool in _session_pools(session):
+        stats.connections_opened += pool.num_connections
+        stats.requests += pool.num_requests
+    return stats
+
+
+def reset_pool_stats(session: requests.Session):
+    """
+    Zero the session's pool counters, so connections opened and requests
+    sent before the first test (warm-up) are not counted. Open connections
+    stay in the pool.
+    """
+    for pool in _session_pools(session):
+        pool.num_connections = 0
+        pool.num_requests = 0
+
+
+pool_totals = PoolStats()
+"""Connection usage of every API session closed in this process."""
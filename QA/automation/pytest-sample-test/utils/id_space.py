@@ -0,0 +1,483 @@
+"""
+Collision-free resource ids and names for parallel runs.
+
+Every id the harness sends to the API is laid out as
+
+    run (20 bits) | worker slot (11 bits) | block (20 bits) | item (10 bits)
+
+The run part is derived from the data seed, the worker slot from the xdist
+worker number (or handed out by the dist coordinator), and every test, as
+well as the resource pool, reserves its own blocks of 1024 ids. Two tests
+can only get the same id by sharing a data seed, a worker slot and a block,
+so workers never overwrite or delete each other's resources. Usernames end
+in ``_x<id in hex>`` and decode the same way. All ids are above 2**41, clear
+of the small ids other clients of a shared server use and of the fixed ids
+the not-found tests probe.
+
+The InterferenceDetector watches every response of a session and reports
+cross-test interference: a test touching a resource reserved by another
+test or worker, a write to a shared pool resource, a resource that
+vanished or changed behind this process's back, and writes outside the
+namespace. It never decodes a response body itself: ids assigned by the
+server and read-back fields are checked when the test's APIResponse
+decodes the body.
+"""
+import functools
+import re
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import requests
+
+from utils.api_helpers import decompress_body, observe_json, transport
+
+
+RUN_BITS = 20
+SLOT_BITS = 11
+BLOCK_BITS = 20
+ITEM_BITS = 10
+
+MAX_SLOT = (1 << SLOT_BITS) - 1
+_BLOCKS = 1 << BLOCK_BITS
+_ITEMS = 1 << ITEM_BITS
+_BLOCK_SHIFT = ITEM_BITS
+_SLOT_SHIFT = ITEM_BITS + BLOCK_BITS
+_RUN_SHIFT = ITEM_BITS + BLOCK_BITS + SLOT_BITS
+
+INTERFERENCE_MODES = ("off", "report", "fail")
+_NAME_SUFFIX = re.compile(r"_x([0-9a-f]+)$")
+_FINDINGS_LIMIT = 100
+
+T = TypeVar("T")
+
+
+def run_number(seed: int) -> int:
+    """Run part of the ids for a data seed; never 0, so every id is above 2**41."""
+    return 1 + zlib.crc32(f"run:{seed}".encode()) % ((1 << RUN_BITS) - 1)
+
+
+def worker_slot(worker_id: str) -> int:
+    """Slot of ``main`` (0) or an xdist worker ``gw<n>`` (n + 1)."""
+    if worker_id == "main":
+        return 0
+    if worker_id.startswith("gw") and worker_id[2:].isdigit():
+        return int(worker_id[2:]) + 1
+    raise ValueError(f"No id slot for worker {worker_id!r}")
+
+
+class IdScope:
+    """Ids and names reserved for one test (or the resource pool)."""
+
+    def __init__(self, space: "IdSpace", owner: str, shared: bool = False):
+        self.space = space
+        self.owner = owner
+        self.shared = shared
+        self.blocks: List[int] = []
+        self.claimed: List[int] = []
+        self.created: Dict[str, Dict[str, Any]] = {}
+        self._next_item = _ITEMS
+
+    def next_id(self) -> int:
+        """Return an id no other test or worker of this run gets."""
+        with self.space.lock:
+            if self._next_item == _ITEMS:
+                self.blocks.append(self.space._reserve_block(self))
+                self._next_item = 0
+            item = self._next_item
+            self._next_item += 1
+            return self.space.base | (self.blocks[-1] << _BLOCK_SHIFT) | item
+
+    def name(self, base: str, resource_id: Optional[int] = None) -> str:
+        """Return ``base`` made unique, e.g. a username, with a new id or the given one."""
+        if resource_id is None:
+            resource_id = self.next_id()
+        return f"{base}_x{resource_id:x}"
+
+    def claim(self, resource_id: int):
+        """Take over a resource reserved by another scope, e.g. a pool instance checked out by a test."""
+        with self.space.lock:
+            self.space._claims[resource_id] = self
+            self.claimed.append(resource_id)
+
+    def resources_to_delete(self, registered: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        The registered resources this test may delete, plus the ones it created
+        (as seen by the detector) but never registered or deleted. Registered
+        resources reserved by another test or worker are left alone and reported.
+        """
+        resources = []
+        for resource in registered:
+            resource_id = self.space.decode_key(resource.get("id", resource.get("username")))
+            owner = self.space.foreign_owner(resource_id, self) if resource_id is not None else None
+            if owner is None:
+                resources.append(resource)
+            elif self.space.detector is not None:
+                self.space.detector.add(
+                    "foreign",
+                    f"{resource.get('type')} {resource.get('id', resource.get('username'))}",
+                    self.owner,
+                    f"registered for cleanup but reserved by {owner}; not deleted"
+                )
+        with self.space.lock:
+            resources.extend(self.created.values())
+        return resources
+
+    def release(self):
+        """Give the blocks back once the test and its cleanup are done."""
+        with self.space.lock:
+            for block in self.blocks:
+                if self.space._owners.get(block) is self:
+                    del self.space._owners[block]
+            for resource_id in self.claimed:
+                if self.space._claims.get(resource_id) is self:
+                    del self.space._claims[resource_id]
+            self.blocks, self.claimed = [], []
+            self.created.clear()
+        if getattr(self.space._active, "scope", None) is self:
+            self.space._active.scope = None
+
+
+class IdSpace:
+    """The ids of one run and worker slot, split into per-test blocks."""
+
+    def __init__(self, seed: int, slot: int = 0):
+        if not 0 <= slot <= MAX_SLOT:
+            raise ValueError(f"Worker slot {slot} is outside 0..{MAX_SLOT}")
+        self.run = run_number(seed)
+        self.slot = slot
+        self.base = (self.run << _RUN_SHIFT) | (slot << _SLOT_SHIFT)
+        self.detector: Optional["InterferenceDetector"] = None
+        self.lock = threading.RLock()
+        self._owners: Dict[int, IdScope] = {}
+        self._claims: Dict[int, IdScope] = {}
+        self._next_block = 0
+        self._active = threading.local()
+
+    def scope(self, owner: str, shared: bool = False, activate: bool = True) -> IdScope:
+        """
+        Open a scope for a test, which becomes the acting scope of the calling
+        thread until released. Pool scopes are shared and not activated.
+        """
+        scope = IdScope(self, owner, shared=shared)
+        if activate:
+            self._active.scope = scope
+        return scope
+
+    @property
+    def current(self) -> Optional[IdScope]:
+        """The scope of the test running on this thread, if any."""
+        return getattr(self._active, "scope", None)
+
+    @contextmanager
+    def acting(self, scope: IdScope) -> Iterator[IdScope]:
+        """Attribute this thread's requests to ``scope`` for the duration of the block."""
+        previous = self.current
+        self._active.scope = scope
+        try:
+            yield scope
+        finally:
+            self._active.scope = previous
+
+    def bound(self, func: Callable[..., T]) -> Callable[..., T]:
+        """
+        Wrap func to run under the calling thread's acting scope on whichever
+        thread calls it, e.g. an executor's; the scope is thread-local.
+        """
+        scope = self.current
+        if scope is None:
+            return func
+
+        def run(*args, **kwargs) -> T:
+            with self.acting(scope):
+                return func(*args, **kwargs)
+
+        return run
+
+    def _reserve_block(self, scope: IdScope) -> int:
+        # Blocks wrap around for very long runs (soak); live blocks are skipped.
+        for _ in range(_BLOCKS):
+            block = self._next_block
+            self._next_block = (block + 1) % _BLOCKS
+            if block not in self._owners:
+                self._owners[block] = scope
+                return block
+        raise RuntimeError(f"All {_BLOCKS} id blocks of worker slot {self.slot} are in use")
+
+    def decode_key(self, key: Any) -> Optional[int]:
+        """The id behind a resource id or username, or None when it is not from this run."""
+        if isinstance(key, str):
+            match = _NAME_SUFFIX.search(key)
+            if match:
+                key = int(match.group(1), 16)
+            elif key.isdigit():
+                key = int(key)
+        if isinstance(key, bool) or not isinstance(key, int):
+            return None
+        return key if key >> _RUN_SHIFT == self.run else None
+
+    def owner_of(self, resource_id: int) -> Optional[IdScope]:
+        """The live scope a decoded id belongs to in this process."""
+        with self.lock:
+            claimed = self._claims.get(resource_id)
+            if claimed is not None:
+                return claimed
+            if (resource_id >> _SLOT_SHIFT) & MAX_SLOT != self.slot:
+                return None
+            return self._owners.get((resource_id >> _BLOCK_SHIFT) & (_BLOCKS - 1))
+
+    def foreign_owner(self, resource_id: int, scope: IdScope, write: bool = True) -> Optional[str]:
+        """Describe who reserved ``resource_id`` when ``scope`` should not touch it, else None."""
+        slot = (resource_id >> _SLOT_SHIFT) & MAX_SLOT
+        owner = self.owner_of(resource_id)
+        if slot != self.slot and owner is None:
+            return f"worker slot {slot}"
+        if owner is scope:
+            return None
+        if owner is None:
+            return "a finished test"
+        if owner.shared:
+            return f"the shared {owner.owner}" if write else None
+        return owner.owner
+
+
+class _Resource:
+    """A resource this process created and has not deleted."""
+
+    __slots__ = ("kind", "key", "creator", "fields")
+
+    def __init__(self, kind: str, key: str, creator: str, fields: Optional[Dict[str, Any]]):
+        self.kind = kind
+        self.key = key
+        self.creator = creator
+        self.fields = fields
+
+
+# Fields compared when a resource is read back; the server echoes them unchanged.
+_COMPARED_FIELDS = {
+    "pet": ("name", "status"),
+    "order": ("petId", "quantity", "status", "complete"),
+    "user": ("firstName", "lastName", "email", "phone", "userStatus"),
+}
+_RESOURCE_PATH = re.compile(r"/(?P<collection>pet|store/order|user)(?:/(?P<key>[^/]+))?/?$")
+_COLLECTIONS = {"pet": "pet", "store/order": "order", "user": "user"}
+_BULK_USER_PATHS = ("createWithArray", "createWithList")
+_USER_ACTIONS = ("login", "logout") + _BULK_USER_PATHS
+
+
+class InterferenceDetector:
+    """
+    Response hook that tracks the resources this process creates and reports
+    interference between tests. Install with ``session.hooks["response"]``.
+    Response bodies are inspected through observe_json(), so they are only
+    parsed once, by the APIResponse that wraps them.
+    """
+
+    def __init__(self, space: IdSpace):
+        self.space = space
+        self.counts: Counter = Counter()
+        self.findings: List[Dict[str, str]] = []
+        self._live: Dict[Tuple[str, str], _Resource] = {}
+        self._lock = threading.Lock()
+        space.detector = self
+
+    def add(self, kind: str, resource: str, test: str, detail: str):
+        """Record one finding; only the first ones are kept in full."""
+        with self._lock:
+            self.counts[kind] += 1
+            if len(self.findings) < _FINDINGS_LIMIT:
+                self.findings.append({"kind": kind, "resource": resource, "test": test, "detail": detail})
+
+    def export(self) -> Dict[str, Any]:
+        return {"counts": dict(self.counts), "findings": list(self.findings)}
+
+    def merge(self, exported: Dict[str, Any]):
+        """Merge findings serialized with export() by another worker."""
+        with self._lock:
+            self.counts.update(exported["counts"])
+            room = _FINDINGS_LIMIT - len(self.findings)
+            self.findings.extend(exported["findings"][:max(room, 0)])
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def observe(self, response: requests.Response, *args, **kwargs) -> requests.Response:
+        """requests response hook."""
+        request = response.request
+        path = urlsplit(request.url).path
+        match = _RESOURCE_PATH.search(path)
+        if match is None:
+            return response
+        kind = _COLLECTIONS[match.group("collection")]
+        key = match.group("key")
+        method = request.method
+        ok = 200 <= response.status_code < 300
+
+        if kind == "user" and key in _USER_ACTIONS:
+            if key in _BULK_USER_PATHS and method == "POST" and ok:
+                collection_url = request.url.rsplit("/", 1)[0]
+                for user in self._request_json(request) or []:
+                    if isinstance(user, dict) and user.get("username"):
+                        username = str(user["username"])
+                        self._check_actor(kind, username, write=True)
+                        self._created(kind, username, f"{collection_url}/{username}", user)
+            return response
+        if key is not None and kind != "user" and not key.isdigit():
+            return response
+
+        if key is None:
+            # POST creates and PUT /pet updates carry the key in the body.
+            if method not in ("POST", "PUT") or not ok:
+                return response
+            body = self._request_json(request)
+            if not isinstance(body, dict):
+                return response
+            key = body.get("username" if kind == "user" else "id")
+            if key is None and method == "POST" and kind != "user":
+                # The server picks the id: register the resource once the test reads it.
+                observe_json(response, functools.partial(self._created_by_server, kind, request.url, body))
+            else:
+                self._written(kind, key, method, request.url, body)
+            return response
+
+        if ok:
+            self._check_actor(kind, key, write=method != "GET", delete=method == "DELETE")
+        if method == "GET":
+            self._read(kind, key, response)
+        elif method == "DELETE":
+            self._deleted(kind, key, response.status_code)
+        elif ok:
+            # PUT /user/{username} sends the full user; POST /pet/{petId} is a form update.
+            self._updated(kind, key, self._request_json(request) if method == "PUT" else None)
+        return response
+
+    def _written(self, kind: str, key: Any, method: str, url: str, body: Dict[str, Any]):
+        key = None if key is None else str(key)
+        if key is None or (kind != "user" and not key.isdigit()):
+            return
+        self._check_actor(kind, key, write=True)
+        if method == "POST":
+            self._created(kind, key, f"{url.rstrip('/')}/{key}", body)
+        else:
+            self._updated(kind, key, body)
+
+    def _created_by_server(self, kind: str, url: str, body: Dict[str, Any], created: Any):
+        if isinstance(created, dict):
+            self._written(kind, created.get("id"), "POST", url, body)
+
+    def _request_json(self, request: requests.PreparedRequest) -> Any:
+        body = request.body
+        if not body:
+            return None
+        if isinstance(body, str):
+            body = body.encode()
+        try:
+            return transport.codec.loads(decompress_body(body, request.headers.get("Content-Encoding")))
+        except (ValueError, OSError):
+            return None
+
+    def _actor(self) -> Optional[IdScope]:
+        return self.space.current
+
+    def _check_actor(self, kind: str, key: str, write: bool, delete: bool = False):
+        actor = self._actor()
+        resource_id = self.space.decode_key(key)
+        if resource_id is None:
+            # Not-found tests probe fixed ids far below the namespace; some servers answer their deletes with 200.
+            if write and not delete:
+                self.add(
+                    "unpartitioned",
+                    f"{kind} {key}",
+                    actor.owner if actor else "-",
+                    "written outside this run's id namespace; another run or worker may use it too"
+                )
+            return
+        if actor is None:
+            return
+        owner = self.space.foreign_owner(resource_id, actor, write=write)
+        if owner is not None:
+            self.add("shared-write" if owner.startswith("the shared ") else "foreign",
+                     f"{kind} {key}", actor.owner, f"{'modified' if write else 'read'} a resource reserved by {owner}")
+
+    def _creator(self, key: str) -> Tuple[str, Optional[IdScope]]:
+        resource_id = self.space.decode_key(key)
+        owner = self.space.owner_of(resource_id) if resource_id is not None else None
+        if owner is None:
+            owner = self._actor()
+        return (owner.owner if owner else "-"), owner
+
+    def _created(self, kind: str, key: str, url: str, body: Dict[str, Any]):
+        creator, scope = self._creator(key)
+        with self._lock:
+            self._live[(kind, key)] = _Resource(kind, key, creator, _compared(kind, body))
+        if scope is not None and not scope.shared:
+            resource: Dict[str, Any] = {"type": kind, "url": url}
+            if kind == "user":
+                resource["username"] = key
+            else:
+                resource["id"] = int(key)
+            with self.space.lock:
+                scope.created[url] = resource
+
+    def _updated(self, kind: str, key: str, body: Any):
+        with self._lock:
+            live = self._live.get((kind, key))
+            if live is not None:
+                live.fields = _compared(kind, body) if isinstance(body, dict) else None
+
+    def _forget(self, kind: str, key: str) -> Optional[_Resource]:
+        with self._lock:
+            live = self._live.pop((kind, key), None)
+        resource_id = self.space.decode_key(key)
+        scope = self.space.owner_of(resource_id) if resource_id is not None else None
+        if scope is not None:
+            with self.space.lock:
+                for url in [url for url, resource in scope.created.items()
+                            if str(resource.get("id", resource.get("username"))) == key and resource["type"] == kind]:
+                    del scope.created[url]
+        return live
+
+    def _deleted(self, kind: str, key: str, status_code: int):
+        if 200 <= status_code < 300:
+            self._forget(kind, key)
+        elif status_code == 404:
+            live = self._forget(kind, key)
+            if live is not None:
+                self.add("vanished", f"{kind} {key}", live.creator, "deleted by someone else before its cleanup")
+
+    def _read(self, kind: str, key: str, response: requests.Response):
+        with self._lock:
+            live = self._live.get((kind, key))
+        if live is None:
+            return
+        if response.status_code == 404:
+            self._forget(kind, key)
+            self.add("vanished", f"{kind} {key}", live.creator, "read back 404 although this process never deleted it")
+            return
+        if live.fields and 200 <= response.status_code < 300:
+            observe_json(response, functools.partial(self._compare, kind, key))
+
+    def _compare(self, kind: str, key: str, current: Any):
+        with self._lock:
+            live = self._live.get((kind, key))
+        if live is None or not live.fields or not isinstance(current, dict):
+            return
+        changed = [name for name, value in live.fields.items() if name in current and current[name] != value]
+        if changed:
+            self.add(
+                "overwritten",
+                f"{kind} {key}",
+                live.creator,
+                "changed behind this process: " + ", ".join(
+                    f"{name} {live.fields[name]!r} -> {current[name]!r}" for name in changed
+                )
+            )
+            live.fields = _compared(kind, current)
+
+
+def _compared(kind: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: body[name] for name in _COMPARED_FIELDS[kind] if name in body}
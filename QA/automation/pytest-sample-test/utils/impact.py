@@ -0,0 +1,289 @@
+"""
+Test impact analysis for ``--changed-only`` runs.
+
+A test's fingerprint covers:
+
+- the source of the test function, of the local fixtures it uses and of
+  the module-level helpers they call,
+- the ``utils`` modules any of those reference, plus the ``utils``
+  modules those import,
+- the OpenAPI operations the test called when it last passed, with
+  their ``$ref``-resolved definitions from the API spec,
+- the target build identifier.
+
+Passing tests are cached with their fingerprint; the next ``--changed-only``
+run deselects every test whose fingerprint is unchanged.
+"""
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import types
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+import requests
+
+
+_LOCAL_PACKAGE = "utils"
+_HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch")
+
+
+def _digest(*parts: Any) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_spec(source: str, timeout: float = 5.0) -> Dict[str, Any]:
+    """
+    Load an OpenAPI/Swagger JSON document from a URL or file.
+    Raises ValueError saying why when it is unavailable or has no operations.
+    """
+    if not source:
+        raise ValueError("no API spec source given")
+    try:
+        if source.startswith(("http://", "https://")):
+            response = requests.get(source, timeout=timeout)
+            response.raise_for_status()
+            spec = response.json()
+        else:
+            with open(source) as spec_file:
+                spec = json.load(spec_file)
+    except (OSError, ValueError, requests.RequestException) as exc:
+        raise ValueError(f"cannot load the API spec from {source}: {exc}")
+    if not isinstance(spec, dict) or not isinstance(spec.get("paths"), dict) or not spec["paths"]:
+        raise ValueError(f"the API spec at {source} defines no paths")
+    return spec
+
+
+def _resolve_refs(node: Any, spec: Dict[str, Any], seen: Set[str]) -> Any:
+    if isinstance(node, dict):
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/"):
+            if ref in seen:
+                return {"$ref": ref}
+            target: Any = spec
+            for part in ref[2:].split("/"):
+                target = target.get(part, {}) if isinstance(target, dict) else {}
+            return _resolve_refs(target, spec, seen | {ref})
+        return {key: _resolve_refs(value, spec, seen) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_resolve_refs(value, spec, seen) for value in node]
+    return node
+
+
+def operation_digests(spec: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Digest of each spec operation keyed like the metrics, e.g. ``GET /pet/{petId}``."""
+    if not spec:
+        return {}
+    digests = {}
+    for path, operations in spec.get("paths", {}).items():
+        for method, operation in operations.items():
+            if method in _HTTP_METHODS:
+                resolved = _resolve_refs(operation, spec, set())
+                digests[f"{method.upper()} {path}"] = _digest(json.dumps(resolved, sort_keys=True))
+    return digests
+
+
+class ImpactCache:
+    """Passed tests with the fingerprint they passed under."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as cache_file:
+                    self.tests = json.load(cache_file).get("tests", {})
+            except (ValueError, AttributeError):
+                self.tests = {}
+
+    def operations(self, nodeid: str) -> Optional[List[str]]:
+        """Operations the test called when it last passed, or None when not cached."""
+        entry = self.tests.get(nodeid)
+        return entry["operations"] if entry else None
+
+    def is_unchanged(self, nodeid: str, fingerprint: str) -> bool:
+        entry = self.tests.get(nodeid)
+        return entry is not None and entry["fingerprint"] == fingerprint
+
+    def record(self, nodeid: str, fingerprint: str, operations: Iterable[str]):
+        self.tests[nodeid] = {"fingerprint": fingerprint, "operations": sorted(operations)}
+
+    def forget(self, nodeid: str):
+        self.tests.pop(nodeid, None)
+
+    def save(self):
+        """Write the cache atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as cache_file:
+            json.dump({"tests": dict(sorted(self.tests.items()))}, cache_file, indent=2)
+        os.replace(temporary, self.path)
+
+
+def _code_names(code: types.CodeType) -> Set[str]:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _is_local_module(name: Optional[str]) -> bool:
+    return bool(name) and name.split(".", 1)[0] == _LOCAL_PACKAGE
+
+
+class Fingerprinter:
+    """Computes test fingerprints; source and module digests are cached per run."""
+
+    def __init__(self, root: str, build: str, operations: Dict[str, str]):
+        self.root = os.path.abspath(root)
+        self.build = build
+        self.operations = operations
+        self._functions: Dict[Any, str] = {}
+        self._modules: Dict[str, str] = {}
+        self._module_imports: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def spec_build(operations: Dict[str, str]) -> str:
+        """Build identifier derived from the spec when none is given."""
+        return "spec-" + _digest(*sorted(operations.items()))[:12]
+
+    def fingerprint(self, item, operations: Iterable[str]) -> str:
+        """Fingerprint of a collected test given the operations it calls."""
+        functions = [item.function]
+        for name in sorted(item.fixturenames):
+            fixturedefs = item._fixtureinfo.name2fixturedefs.get(name)
+            if fixturedefs and self._is_project_code(fixturedefs[-1].func):
+                functions.append(fixturedefs[-1].func)
+
+        sources: List[str] = []
+        modules: Set[str] = set()
+        seen: Set[Any] = set()
+        for function in functions:
+            self._collect(function, item.cls, sources, modules, seen)
+
+        params = repr(sorted(item.callspec.params.items())) if hasattr(item, "callspec") else ""
+        return _digest(
+            self.build,
+            params,
+            *sorted(sources),
+            *(self._module_digest(module) for module in sorted(self._with_imports(modules))),
+            *(f"{operation}={self.operations.get(operation, '')}" for operation in sorted(operations))
+        )
+
+    def _is_project_code(self, function) -> bool:
+        try:
+            path = inspect.getsourcefile(inspect.unwrap(function))
+        except TypeError:
+            return False
+        return bool(path) and os.path.abspath(path).startswith(self.root + os.sep)
+
+    def _collect(self, function, owner, sources: List[str], modules: Set[str], seen: Set[Any]):
+        function = inspect.unwrap(function)
+        if function in seen or not hasattr(function, "__code__"):
+            return
+        seen.add(function)
+        sources.append(self._function_digest(function))
+
+        namespace = function.__globals__
+        for name in _code_names(function.__code__):
+            value = namespace.get(name)
+            if value is None and owner is not None:
+                value = owner.__dict__.get(name)
+            if value is None:
+                continue
+            if isinstance(value, types.ModuleType):
+                if _is_local_module(value.__name__):
+                    modules.add(value.__name__)
+                continue
+            module = getattr(value, "__module__", None)
+            if _is_local_module(module):
+                modules.add(module)
+            elif inspect.isfunction(value) and module == function.__module__:
+                self._collect(value, owner, sources, modules, seen)
+
+    def _function_digest(self, function) -> str:
+        if function not in self._functions:
+            try:
+                source = inspect.getsource(function)
+            except (OSError, TypeError):
+                source = function.__code__.co_code
+            self._functions[function] = _digest(function.__module__, function.__qualname__, source)
+        return self._functions[function]
+
+    def _with_imports(self, modules: Set[str]) -> Set[str]:
+        pending = list(modules)
+        closure: Set[str] = set()
+        while pending:
+            module = pending.pop()
+            if module in closure:
+                continue
+            closure.add(module)
+            pending.extend(self._imports(module))
+        return closure
+
+    def _origin(self, module: str) -> Optional[str]:
+        spec = importlib.util.find_spec(module)
+        return spec.origin if spec is not None else None
+
+    def _imports(self, module: str) -> Set[str]:
+        if module not in self._module_imports:
+            imports: Set[str] = set()
+            origin = self._origin(module)
+            if origin and origin.endswith(".py"):
+                with open(origin, "rb") as source_file:
+                    tree = ast.parse(source_file.read())
+                for node in ast.walk(tree):
+                    if isinstance(node, ast.Import):
+                        imports.update(alias.name for alias in node.names if _is_local_module(alias.name))
+                    elif isinstance(node, ast.ImportFrom) and _is_local_module(node.module):
+                        imports.add(node.module)
+            self._module_imports[module] = imports
+        return self._module_imports[module]
+
+    def _module_digest(self, module: str) -> str:
+        if module not in self._modules:
+            origin = self._origin(module)
+            content = b""
+            if origin and os.path.exists(origin):
+                with open(origin, "rb") as module_file:
+                    content = module_file.read()
+            self._modules[module] = _digest(module, content)
+        return self._modules[module]
+
+
+class ImpactResults:
+    """Per-test outcomes and fingerprints reported in this run."""
+
+    def __init__(self):
+        self.fingerprints: Dict[str, Dict[str, Any]] = {}
+        self.not_passed: Set[str] = set()
+
+    def add(self, report):
+        """Track a setup, call or teardown report."""
+        if report.outcome != "passed":
+            self.not_passed.add(report.nodeid)
+        fingerprint = getattr(report, "impact_fingerprint", None)
+        if fingerprint is not None:
+            self.fingerprints[report.nodeid] = {
+                "fingerprint": fingerprint,
+                "operations": getattr(report, "impact_operations", []),
+            }
+
+    def apply(self, cache: ImpactCache):
+        """Cache tests that passed every phase and drop the ones that did not."""
+        for nodeid in self.not_passed:
+            cache.forget(nodeid)
+        for nodeid, entry in self.fingerprints.items():
+            if nodeid not in self.not_passed:
+                cache.record(nodeid, entry["fingerprint"], entry["operations"])
+
+
+impact_results = ImpactResults()
+"""Reports seen by this process (the controller under xdist) in --changed-only runs."""
@@ -0,0 +1,318 @@
+"""
+Load-test runner that replays collected pytest items as weighted scenarios.
+
+Each scenario iteration calls the test function with freshly built
+function-scoped fixtures, while session-scoped fixtures (api_client,
+api_config, ...) are built once and shared by every worker thread.
+Requests go through the regular make_*_request helpers, so per-endpoint
+latency comes from ``utils.metrics.request_metrics``.
+"""
+import functools
+import inspect
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable
+
+from utils.metrics import EndpointStats, MetricsRecorder, request_metrics
+
+
+@dataclass
+class LoadConfig:
+    """Load run settings."""
+    concurrency: int = 10
+    duration: float = 30.0
+    iterations: Optional[int] = None
+    rate: Optional[float] = None
+    max_error_rate: float = 0.01
+    seed: Optional[int] = None
+
+    @property
+    def mode(self) -> str:
+        """Open loop when an arrival rate is set, closed loop otherwise."""
+        return "open" if self.rate else "closed"
+
+
+@dataclass
+class LoadReport:
+    """Results of a load run."""
+    mode: str
+    elapsed: float
+    scenarios: Dict[str, EndpointStats] = field(default_factory=dict)
+    endpoints: Dict[str, EndpointStats] = field(default_factory=dict)
+
+    @property
+    def iterations(self) -> int:
+        return sum(stats.histogram.count for stats in self.scenarios.values())
+
+    @property
+    def failures(self) -> int:
+        return sum(stats.errors for stats in self.scenarios.values())
+
+    def error_rate(self) -> float:
+        """Return the fraction of failed scenario iterations."""
+        return self.failures / self.iterations if self.iterations else 0.0
+
+
+class _ScenarioRequest:
+    """
+    Minimal stand-in for pytest's ``request`` fixture. ``param`` is set, as
+    on pytest's SubRequest, when the item's parametrization feeds the
+    fixture being built.
+    """
+
+    def __init__(
+        self,
+        resolver: "FixtureResolver",
+        item,
+        values: Dict[str, Any],
+        finalizers: List[Callable],
+        fixturename: Optional[str] = None
+    ):
+        self._resolver = resolver
+        self._values = values
+        self._finalizers = finalizers
+        self.node = item
+        self.config = item.config
+        self.fixturenames = item.fixturenames
+        self.fixturename = fixturename
+        params = _callspec_params(item)
+        if fixturename in params:
+            self.param = params[fixturename]
+
+    def getfixturevalue(self, name: str) -> Any:
+        return self._resolver.resolve(self.node, name, self._values, self._finalizers)
+
+    def addfinalizer(self, finalizer: Callable):
+        self._finalizers.append(finalizer)
+
+
+def _finish_generator(generator):
+    try:
+        next(generator)
+    except StopIteration:
+        pass
+
+
+def _callspec_params(item) -> Dict[str, Any]:
+    callspec = getattr(item, "callspec", None)
+    return callspec.params if callspec is not None else {}
+
+
+_UNEVALUATED_MARKS = ("skip", "skipif", "xfail")
+
+
+def unsupported_reason(item) -> Optional[str]:
+    """
+    Why an item cannot be replayed as a scenario, or None. The resolver does
+    not evaluate skip/skipif/xfail marks, and caches broader-scoped fixtures
+    once per run, so those may not be parametrized.
+    """
+    for name in _UNEVALUATED_MARKS:
+        if item.get_closest_marker(name) is not None:
+            return f"it is marked {name}, which --load does not evaluate"
+    params = _callspec_params(item)
+    for name in item.fixturenames:
+        for fixturedef in item._fixtureinfo.name2fixturedefs.get(name, ()):
+            if fixturedef.scope != "function" and name in params:
+                return f"its {fixturedef.scope}-scoped fixture {name!r} is parametrized"
+    return None
+
+
+class FixtureResolver:
+    """
+    Builds fixture values for scenario iterations outside pytest's runner.
+
+    Supports direct and indirect parametrization and fixtures with params
+    (through ``request.param``), fixtures that override and request a
+    same-named parent fixture, ``request.getfixturevalue`` and
+    ``request.addfinalizer``. Items it cannot replay faithfully are refused
+    by LoadRunner; see unsupported_reason().
+    """
+
+    def __init__(self):
+        self._shared: Dict[Any, Any] = {}
+        self._shared_finalizers: List[Callable] = []
+        self._shared_values: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def resolve(self, item, name: str, values: Dict[str, Any], finalizers: List[Callable]) -> Any:
+        """Return the value of fixture ``name`` for ``item``."""
+        if name in values:
+            return values[name]
+        if name == "request":
+            return _ScenarioRequest(self, item, values, finalizers)
+        if name == "pytestconfig":
+            return item.config
+        value = values[name] = self._fixture_value(item, name, -1, values, finalizers)
+        return value
+
+    def _fixture_value(self, item, name: str, index: int, values: Dict[str, Any], finalizers: List[Callable]) -> Any:
+        # index walks name2fixturedefs from the closest definition outwards,
+        # so an overriding fixture can request the one it overrides.
+        fixturedef = item._fixtureinfo.name2fixturedefs[name][index]
+        if fixturedef.scope == "function":
+            return self._execute(item, fixturedef, index, values, finalizers)
+
+        with self._lock:
+            if fixturedef not in self._shared:
+                self._shared[fixturedef] = self._execute(
+                    item, fixturedef, index, self._shared_values, self._shared_finalizers
+                )
+            return self._shared[fixturedef]
+
+    def _execute(self, item, fixturedef, index: int, values: Dict[str, Any], finalizers: List[Callable]) -> Any:
+        kwargs = {}
+        for arg in fixturedef.argnames:
+            if arg == "request":
+                kwargs[arg] = _ScenarioRequest(self, item, values, finalizers, fixturedef.argname)
+            elif arg == fixturedef.argname:
+                kwargs[arg] = self._fixture_value(item, arg, index - 1, values, finalizers)
+            else:
+                kwargs[arg] = self.resolve(item, arg, values, finalizers)
+        result = fixturedef.func(**kwargs)
+        if inspect.isgenerator(result):
+            value = next(result)
+            finalizers.append(functools.partial(_finish_generator, result))
+            return value
+        return result
+
+    def run(self, item):
+        """Run one iteration of a test item, tearing down its fixtures afterwards."""
+        values: Dict[str, Any] = {}
+        finalizers: List[Callable] = []
+        try:
+            for name in item.fixturenames:
+                self.resolve(item, name, values, finalizers)
+            # Direct parametrize arguments resolve to their param like any fixture.
+            kwargs = {name: values[name] for name in item._fixtureinfo.argnames}
+            args = (item.cls(),) if item.cls is not None else ()
+            item.function(*args, **kwargs)
+        finally:
+            _run_finalizers(finalizers)
+
+    def close(self):
+        """Tear down the shared fixtures."""
+        _run_finalizers(self._shared_finalizers)
+
+
+def _run_finalizers(finalizers: List[Callable]):
+    error = None
+    for finalizer in reversed(finalizers):
+        try:
+            finalizer()
+        except Exception as exc:
+            error = error or exc
+    finalizers.clear()
+    if error is not None:
+        raise error
+
+
+def scenario_weight(item) -> float:
+    """
+    Return the ``load_weight`` marker value of an item, defaulting to 1, or
+    to 0 for ``sla`` tests, which would replay all their samples each time.
+    """
+    marker = item.get_closest_marker("load_weight")
+    if marker and marker.args:
+        return float(marker.args[0])
+    return 0.0 if item.get_closest_marker("sla") is not None else 1.0
+
+
+class LoadRunner:
+    """Replays test items at a target concurrency or arrival rate."""
+
+    def __init__(self, items: List[Any], config: LoadConfig):
+        self.items = [item for item in items if scenario_weight(item) > 0]
+        refused = [
+            f"{item.nodeid}: {reason}"
+            for item, reason in ((item, unsupported_reason(item)) for item in self.items)
+            if reason is not None
+        ]
+        if refused:
+            raise ValueError(
+                "These tests cannot be replayed as load scenarios; deselect them or give them "
+                "@pytest.mark.load_weight(0):\n  " + "\n  ".join(refused)
+            )
+        self.weights = [scenario_weight(item) for item in self.items]
+        self.config = config
+        self.resolver = FixtureResolver()
+        self.scenario_metrics = MetricsRecorder()
+        self._random = random.Random(config.seed)
+        self._budget_lock = threading.Lock()
+        self._remaining = config.iterations
+
+    def _pick(self):
+        with self._budget_lock:
+            if self._remaining is not None:
+                if self._remaining <= 0:
+                    return None
+                self._remaining -= 1
+            return self._random.choices(self.items, weights=self.weights)[0]
+
+    def _execute(self, item, scheduled: float):
+        failed = False
+        try:
+            self.resolver.run(item)
+        except Exception:
+            failed = True
+        self.scenario_metrics.record(item.nodeid, time.perf_counter() - scheduled, error=failed)
+
+    def _closed_loop(self, deadline: float):
+        def _worker():
+            while time.perf_counter() < deadline:
+                item = self._pick()
+                if item is None:
+                    return
+                self._execute(item, time.perf_counter())
+
+        threads = [
+            threading.Thread(target=_worker, name=f"load-{index}", daemon=True)
+            for index in range(self.config.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _open_loop(self, start: float, deadline: float):
+        # Latency is measured from the scheduled arrival time, so a slow
+        # server shows up as queueing delay instead of fewer samples.
+        interval = 1.0 / self.config.rate
+        with ThreadPoolExecutor(max_workers=self.config.concurrency, thread_name_prefix="load") as executor:
+            arrival = 0
+            while True:
+                scheduled = start + arrival * interval
+                if scheduled >= deadline:
+                    break
+                item = self._pick()
+                if item is None:
+                    break
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self._execute, item, scheduled)
+                arrival += 1
+
+    def run(self) -> LoadReport:
+        """Run the load test and return the collected report."""
+        request_metrics.reset()
+        start = time.perf_counter()
+        deadline = start + self.config.duration
+        try:
+            if self.items:
+                if self.config.rate:
+                    self._open_loop(start, deadline)
+                else:
+                    self._closed_loop(deadline)
+        finally:
+            self.resolver.close()
+
+        return LoadReport(
+            mode=self.config.mode,
+            elapsed=time.perf_counter() - start,
+            scenarios=self.scenario_metrics.snapshot(),
+            endpoints=request_metrics.snapshot()
+        )
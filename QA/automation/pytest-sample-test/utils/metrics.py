@@ -0,0 +1,408 @@
+"""
+Latency metrics for API requests.
+
+Requests are grouped by method and templated Petstore path
+(``GET /pet/{petId}``) and recorded into log-bucketed histograms, so
+recording is O(1) and memory stays flat no matter how many requests run.
+"""
+import math
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+
+_RESOURCE_ROOTS = ("pet", "store", "user")
+
+_PATH_TEMPLATES = [
+    (re.compile(r"^/pet/[^/]+/uploadImage$"), "/pet/{petId}/uploadImage"),
+    (re.compile(r"^/pet/(?!findByStatus$|findByTags$)[^/]+$"), "/pet/{petId}"),
+    (re.compile(r"^/store/order/[^/]+$"), "/store/order/{orderId}"),
+    (re.compile(r"^/user/(?!login$|logout$|createWithArray$|createWithList$)[^/]+$"), "/user/{username}"),
+]
+
+
+def resource_path(path: str) -> str:
+    """Strip the API base path, e.g. ``/api/pet/1`` becomes ``/pet/1``."""
+    segments = path.split("/")
+    for index, segment in enumerate(segments):
+        if segment in _RESOURCE_ROOTS:
+            return "/" + "/".join(segments[index:])
+    return path
+
+
+@lru_cache(maxsize=4096)
+def _template_path(path: str) -> str:
+    path = resource_path(path)
+    for pattern, template in _PATH_TEMPLATES:
+        if pattern.match(path):
+            return template
+    return path
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Build the metrics key for a request, e.g. ``GET /pet/{petId}``."""
+    return f"{method.upper()} {_template_path(urlsplit(url).path)}"
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with roughly 1% relative precision."""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    _LOG_BASE = math.log(1.01)
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        """Record a single latency sample in seconds."""
+        micros = seconds * 1e6
+        index = int(math.log(micros) / self._LOG_BASE) if micros > 1.0 else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, percent: float) -> float:
+        """Return the latency in seconds at the given percentile (0-100)."""
+        if not self.count:
+            return 0.0
+
+        target = max(1, math.ceil(self.count * percent / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= target:
+                value = math.exp((index + 0.5) * self._LOG_BASE) / 1e6
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def mean(self) -> float:
+        """Return the mean latency in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add the samples of another histogram into this one."""
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the histogram, including raw buckets for later merging."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """Rebuild a histogram serialized with to_dict()."""
+        histogram = cls()
+        histogram.buckets = {int(index): count for index, count in data["buckets"].items()}
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"] if histogram.count else math.inf
+        histogram.max = data["max"]
+        return histogram
+
+
+class EndpointStats:
+    """Latency histogram plus error count for one endpoint or scenario."""
+
+    __slots__ = ("histogram", "errors")
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+
+    def error_rate(self) -> float:
+        """Return the fraction of samples that were errors."""
+        return self.errors / self.histogram.count if self.histogram.count else 0.0
+
+
+class MetricsRecorder:
+    """Thread-safe collection of latency stats keyed by name."""
+
+    def __init__(self):
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float, error: bool = False):
+        """Record one sample for the given key."""
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.histogram.record(seconds)
+            if error:
+                stats.errors += 1
+
+    def merge(self, exported: Dict[str, Any]):
+        """Merge stats produced by export_stats(), e.g. from an xdist worker."""
+        with self._lock:
+            for key, data in exported.items():
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = EndpointStats()
+                stats.histogram.merge(LatencyHistogram.from_dict(data["histogram"]))
+                stats.errors += data["errors"]
+
+    def add(self, stats: Dict[str, EndpointStats]):
+        """Merge stats returned by snapshot() or drain() of another recorder."""
+        with self._lock:
+            for key, other in stats.items():
+                current = self._stats.get(key)
+                if current is None:
+                    current = self._stats[key] = EndpointStats()
+                current.histogram.merge(other.histogram)
+                current.errors += other.errors
+
+    def snapshot(self) -> Dict[str, EndpointStats]:
+        """Return the current stats keyed by name."""
+        with self._lock:
+            return dict(self._stats)
+
+    def drain(self) -> Dict[str, EndpointStats]:
+        """Return the current stats and start over, e.g. at the end of a time window."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            return stats
+
+    def reset(self):
+        """Drop all recorded samples."""
+        with self._lock:
+            self._stats.clear()
+
+
+class EndpointTrace:
+    """Set of endpoint keys called between start() and stop()."""
+
+    def __init__(self):
+        self._endpoints: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self._endpoints = set()
+
+    def add(self, key: str):
+        if self._endpoints is not None:
+            with self._lock:
+                if self._endpoints is not None:
+                    self._endpoints.add(key)
+
+    def stop(self) -> Set[str]:
+        """Return the traced endpoints and stop tracing."""
+        with self._lock:
+            endpoints, self._endpoints = self._endpoints or set(), None
+            return endpoints
+
+
+class PayloadStats:
+    """JSON encode/decode time and body sizes before and after compression for one endpoint."""
+
+    __slots__ = (
+        "encodes", "encode_seconds", "request_bytes", "request_wire_bytes",
+        "decodes", "decode_seconds", "response_bytes", "response_wire_bytes",
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0.0 if name.endswith("seconds") else 0)
+
+    def add(self, other: "PayloadStats"):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PayloadStats":
+        stats = cls()
+        for name in cls.__slots__:
+            setattr(stats, name, data.get(name, 0))
+        return stats
+
+
+class PayloadRecorder:
+    """Thread-safe payload stats keyed by endpoint."""
+
+    def __init__(self):
+        self._stats: Dict[str, PayloadStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> PayloadStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = PayloadStats()
+        return stats
+
+    def record_encode(self, key: str, seconds: float, size: int, wire_size: int):
+        """Record one request body serialization and its size before and after compression."""
+        with self._lock:
+            stats = self._get(key)
+            stats.encodes += 1
+            stats.encode_seconds += seconds
+            stats.request_bytes += size
+            stats.request_wire_bytes += wire_size
+
+    def record_decode(self, key: str, seconds: float):
+        """Record one response body parse."""
+        with self._lock:
+            stats = self._get(key)
+            stats.decodes += 1
+            stats.decode_seconds += seconds
+
+    def record_response(self, key: str, size: int, wire_size: int):
+        """Record a response body size after and before content decoding."""
+        with self._lock:
+            stats = self._get(key)
+            stats.response_bytes += size
+            stats.response_wire_bytes += wire_size
+
+    def export(self) -> Dict[str, Any]:
+        with self._lock:
+            return {key: stats.to_dict() for key, stats in sorted(self._stats.items())}
+
+    def merge(self, exported: Dict[str, Any]):
+        """Merge stats produced by export(), e.g. from an xdist worker."""
+        with self._lock:
+            for key, data in exported.items():
+                self._get(key).add(PayloadStats.from_dict(data))
+
+    def snapshot(self) -> Dict[str, PayloadStats]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+class RequestLog:
+    """Timings of the requests made between start() and stop(), capped at ``limit`` entries."""
+
+    def __init__(self, limit: int = 500):
+        self.limit = limit
+        self._entries: Optional[List[Dict[str, Any]]] = None
+        self._dropped = 0
+        self._started = 0.0
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self._entries = []
+            self._dropped = 0
+            self._started = time.perf_counter()
+
+    def add(self, key: str, seconds: float, error: bool):
+        if self._entries is None:
+            return
+        with self._lock:
+            if self._entries is None:
+                return
+            if len(self._entries) >= self.limit:
+                self._dropped += 1
+                return
+            self._entries.append({
+                "endpoint": key,
+                "offset_ms": round((time.perf_counter() - self._started - seconds) * 1000, 3),
+                "ms": round(seconds * 1000, 3),
+                "error": error,
+            })
+
+    def stop(self) -> Tuple[List[Dict[str, Any]], int]:
+        """Return the logged requests and how many were dropped over the limit, and stop logging."""
+        with self._lock:
+            entries, self._entries = self._entries or [], None
+            return entries, self._dropped
+
+
+request_metrics = MetricsRecorder()
+"""Process-wide latency stats for every make_*_request call."""
+
+payload_metrics = PayloadRecorder()
+"""Process-wide JSON codec and compression stats for every make_*_request call."""
+
+endpoint_trace = EndpointTrace()
+"""Endpoints called by the running test, when test impact analysis is on."""
+
+request_log = RequestLog()
+"""Requests made by the running test, when the results sink is on."""
+
+
+def record_request(method: str, url: str, seconds: float, error: bool = False):
+    """Record the latency of one API request in ``request_metrics``."""
+    key = endpoint_key(method, url)
+    request_metrics.record(key, seconds, error)
+    endpoint_trace.add(key)
+    request_log.add(key, seconds, error)
+
+
+def export_stats(stats: Dict[str, EndpointStats]) -> Dict[str, Any]:
+    """Serialize stats to JSON-friendly dicts with percentiles in milliseconds."""
+    exported = {}
+    for key in sorted(stats):
+        histogram = stats[key].histogram
+        exported[key] = {
+            "count": histogram.count,
+            "errors": stats[key].errors,
+            "mean_ms": round(histogram.mean() * 1000, 3),
+            "p50_ms": round(histogram.percentile(50) * 1000, 3),
+            "p95_ms": round(histogram.percentile(95) * 1000, 3),
+            "p99_ms": round(histogram.percentile(99) * 1000, 3),
+            "max_ms": round(histogram.max * 1000, 3),
+            "histogram": histogram.to_dict(),
+        }
+    return exported
+
+
+def summary_rows(
+    stats: Dict[str, EndpointStats],
+    elapsed: Optional[float] = None
+) -> List[Tuple[str, ...]]:
+    """Build table rows of count, error rate and latency percentiles in ms."""
+    rows = []
+    for key in sorted(stats):
+        histogram = stats[key].histogram
+        row = [key, str(histogram.count)]
+        if elapsed:
+            row.append(f"{histogram.count / elapsed:.1f}")
+        row.append(f"{stats[key].error_rate() * 100:.1f}%")
+        row.extend(
+            f"{histogram.percentile(percent) * 1000:.1f}" for percent in (50, 95, 99)
+        )
+        row.append(f"{histogram.max * 1000:.1f}")
+        rows.append(tuple(row))
+    return rows
+
+
+def format_table(header: Tuple[str, ...], rows: List[Tuple[str, ...]]) -> List[str]:
+    """Format rows as left-aligned first column and right-aligned numbers."""
+    widths = [len(column) for column in header]
+    for row in rows:
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+
+    def _line(cells: Tuple[str, ...]) -> str:
+        first = cells[0].ljust(widths[0])
+        rest = [cell.rjust(width) for cell, width in zip(cells[1:], widths[1:])]
+        return "  ".join([first] + rest)
+
+    return [_line(header)] + [_line(row) for row in rows]
@@ -0,0 +1,302 @@
+"""
+In-memory Petstore emulator mounted on a requests.Session.
+
+Covers the /pet, /store and /user endpoints used by the tests. Requests
+are answered by an adapter in the same process, so no socket is opened
+and the suite runs without the Petstore container.
+"""
+import io
+import itertools
+import json
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from utils.api_helpers import decompress_body
+
+
+INPROC_SCHEME = "inproc://"
+INPROC_HOST = "http://petstore.inproc"
+
+_PET_STATUSES = ("available", "pending", "sold")
+
+Result = Tuple[int, Any]
+
+
+def _message(code: int, message: str) -> Dict[str, Any]:
+    return {"code": code, "type": "unknown" if code == 200 else "error", "message": message}
+
+
+def _not_found(what: str) -> Result:
+    return 404, _message(404, f"{what} not found")
+
+
+def _parse_id(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+class PetstoreEmulator:
+    """Thread-safe in-memory implementation of the Petstore API."""
+
+    def __init__(self):
+        self.pets: Dict[int, Dict[str, Any]] = {}
+        self.orders: Dict[int, Dict[str, Any]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._routes = [
+            ("POST", re.compile(r"^/pet$"), self._add_pet),
+            ("PUT", re.compile(r"^/pet$"), self._update_pet),
+            ("GET", re.compile(r"^/pet/findByStatus$"), self._find_pets_by_status),
+            ("GET", re.compile(r"^/pet/findByTags$"), self._find_pets_by_tags),
+            ("GET", re.compile(r"^/pet/(?P<pet_id>[^/]+)$"), self._get_pet),
+            ("POST", re.compile(r"^/pet/(?P<pet_id>[^/]+)$"), self._update_pet_with_form),
+            ("DELETE", re.compile(r"^/pet/(?P<pet_id>[^/]+)$"), self._delete_pet),
+            ("GET", re.compile(r"^/store/inventory$"), self._get_inventory),
+            ("POST", re.compile(r"^/store/order$"), self._place_order),
+            ("GET", re.compile(r"^/store/order/(?P<order_id>[^/]+)$"), self._get_order),
+            ("DELETE", re.compile(r"^/store/order/(?P<order_id>[^/]+)$"), self._delete_order),
+            ("POST", re.compile(r"^/user$"), self._create_user),
+            ("POST", re.compile(r"^/user/createWith(Array|List)$"), self._create_users),
+            ("GET", re.compile(r"^/user/login$"), self._login),
+            ("GET", re.compile(r"^/user/logout$"), self._logout),
+            ("GET", re.compile(r"^/user/(?P<username>[^/]+)$"), self._get_user),
+            ("PUT", re.compile(r"^/user/(?P<username>[^/]+)$"), self._update_user),
+            ("DELETE", re.compile(r"^/user/(?P<username>[^/]+)$"), self._delete_user),
+        ]
+
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: Any) -> Result:
+        """Dispatch a request and return (status code, JSON payload)."""
+        path_matched = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method == method:
+                with self._lock:
+                    return handler(query=query, body=body, **match.groupdict())
+        if path_matched:
+            return 405, _message(405, "Method not allowed")
+        return 404, _message(404, f"No route for {method} {path}")
+
+    def _next_id(self, store: Dict[int, Any]) -> int:
+        new_id = next(self._ids)
+        while new_id in store:
+            new_id = next(self._ids)
+        return new_id
+
+    # Pets
+
+    def _valid_pet(self, body: Any) -> bool:
+        return isinstance(body, dict) and isinstance(body.get("name"), str) and isinstance(body.get("photoUrls"), list)
+
+    def _add_pet(self, body: Any, **_) -> Result:
+        if not self._valid_pet(body):
+            return 405, _message(405, "Invalid input")
+        pet = dict(body)
+        if not pet.get("id"):
+            pet["id"] = self._next_id(self.pets)
+        self.pets[pet["id"]] = pet
+        return 200, pet
+
+    def _update_pet(self, body: Any, **_) -> Result:
+        if not self._valid_pet(body) or not isinstance(body.get("id"), int):
+            return 400, _message(400, "Invalid ID supplied")
+        if body["id"] not in self.pets:
+            return _not_found("Pet")
+        self.pets[body["id"]] = dict(body)
+        return 200, self.pets[body["id"]]
+
+    def _find_pets_by_status(self, query: Dict[str, List[str]], **_) -> Result:
+        statuses = {status for value in query.get("status", []) for status in value.split(",")}
+        if not statuses or not statuses <= set(_PET_STATUSES):
+            return 400, _message(400, "Invalid status value")
+        return 200, [pet for pet in self.pets.values() if pet.get("status") in statuses]
+
+    def _find_pets_by_tags(self, query: Dict[str, List[str]], **_) -> Result:
+        tags = {tag for value in query.get("tags", []) for tag in value.split(",")}
+        return 200, [
+            pet for pet in self.pets.values()
+            if tags & {tag.get("name") for tag in pet.get("tags", []) if isinstance(tag, dict)}
+        ]
+
+    def _get_pet(self, pet_id: str, **_) -> Result:
+        parsed = _parse_id(pet_id)
+        if parsed is None:
+            return 400, _message(400, "Invalid ID supplied")
+        if parsed not in self.pets:
+            return _not_found("Pet")
+        return 200, self.pets[parsed]
+
+    def _update_pet_with_form(self, pet_id: str, body: Any, **_) -> Result:
+        parsed = _parse_id(pet_id)
+        if parsed not in self.pets:
+            return _not_found("Pet")
+        if isinstance(body, dict):
+            for field in ("name", "status"):
+                if field in body:
+                    self.pets[parsed][field] = body[field]
+        return 200, _message(200, str(parsed))
+
+    def _delete_pet(self, pet_id: str, **_) -> Result:
+        parsed = _parse_id(pet_id)
+        if parsed is None:
+            return 400, _message(400, "Invalid ID supplied")
+        if self.pets.pop(parsed, None) is None:
+            return _not_found("Pet")
+        return 200, _message(200, str(parsed))
+
+    # Store
+
+    def _get_inventory(self, **_) -> Result:
+        inventory: Dict[str, int] = {}
+        for pet in self.pets.values():
+            status = pet.get("status")
+            if status:
+                inventory[status] = inventory.get(status, 0) + 1
+        return 200, inventory
+
+    def _place_order(self, body: Any, **_) -> Result:
+        if not isinstance(body, dict):
+            return 400, _message(400, "Invalid Order")
+        order = dict(body)
+        if not order.get("id"):
+            order["id"] = self._next_id(self.orders)
+        self.orders[order["id"]] = order
+        return 200, order
+
+    def _get_order(self, order_id: str, **_) -> Result:
+        parsed = _parse_id(order_id)
+        if parsed is None:
+            return 400, _message(400, "Invalid ID supplied")
+        if parsed not in self.orders:
+            return _not_found("Order")
+        return 200, self.orders[parsed]
+
+    def _delete_order(self, order_id: str, **_) -> Result:
+        parsed = _parse_id(order_id)
+        if parsed is None:
+            return 400, _message(400, "Invalid ID supplied")
+        if self.orders.pop(parsed, None) is None:
+            return _not_found("Order")
+        return 200, _message(200, str(parsed))
+
+    # Users
+
+    def _store_user(self, user: Any) -> Optional[int]:
+        if not isinstance(user, dict) or not user.get("username"):
+            return None
+        stored = dict(user)
+        stored.setdefault("id", next(self._ids))
+        self.users[stored["username"]] = stored
+        return stored["id"]
+
+    def _create_user(self, body: Any, **_) -> Result:
+        user_id = self._store_user(body)
+        if user_id is None:
+            return 400, _message(400, "Invalid user")
+        return 200, _message(200, str(user_id))
+
+    def _create_users(self, body: Any, **_) -> Result:
+        if not isinstance(body, list) or not all(isinstance(user, dict) and user.get("username") for user in body):
+            return 400, _message(400, "Invalid user list")
+        for user in body:
+            self._store_user(user)
+        return 200, _message(200, "ok")
+
+    def _login(self, query: Dict[str, List[str]], **_) -> Result:
+        username = query.get("username", [""])[0]
+        password = query.get("password", [""])[0]
+        user = self.users.get(username)
+        if user is not None and user.get("password") not in (None, password):
+            return 400, _message(400, "Invalid username/password supplied")
+        return 200, _message(200, f"logged in user session:{int(time.time() * 1000)}")
+
+    def _logout(self, **_) -> Result:
+        return 200, _message(200, "ok")
+
+    def _get_user(self, username: str, **_) -> Result:
+        if username not in self.users:
+            return _not_found("User")
+        return 200, self.users[username]
+
+    def _update_user(self, username: str, body: Any, **_) -> Result:
+        if username not in self.users:
+            return _not_found("User")
+        if not isinstance(body, dict):
+            return 400, _message(400, "Invalid user supplied")
+        updated = dict(body)
+        updated.setdefault("id", self.users[username].get("id"))
+        self.users.pop(username)
+        self.users[updated.get("username") or username] = updated
+        return 200, _message(200, str(updated["id"]))
+
+    def _delete_user(self, username: str, **_) -> Result:
+        if self.users.pop(username, None) is None:
+            return _not_found("User")
+        return 200, _message(200, username)
+
+
+class InProcessAdapter(HTTPAdapter):
+    """Transport adapter that answers requests from a PetstoreEmulator."""
+
+    def __init__(self, emulator: PetstoreEmulator, base_path: str = ""):
+        self.emulator = emulator
+        self.base_path = base_path.rstrip("/")
+        super().__init__()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        path = url.path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+
+        body = request.body
+        if isinstance(body, str):
+            body = body.encode()
+        if body:
+            body = decompress_body(body, request.headers.get("Content-Encoding"))
+        content_type = request.headers.get("Content-Type", "")
+        if not body:
+            payload = None
+        elif "application/x-www-form-urlencoded" in content_type:
+            payload = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+        else:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = None
+
+        status, result = self.emulator.handle(request.method, path, parse_qs(url.query), payload)
+        content = json.dumps(result).encode()
+        raw = HTTPResponse(
+            body=io.BytesIO(content),
+            headers={"Content-Type": "application/json", "Content-Length": str(len(content))},
+            status=status,
+            preload_content=False,
+            decode_content=False
+        )
+        return self.build_response(request, raw)
+
+
+def resolve_inproc_url(base_url: str) -> Optional[str]:
+    """
+    Map an ``inproc://`` base URL onto the emulator host.
+
+    ``inproc://`` and ``inproc:///api`` both become ``http://petstore.inproc/api``.
+    Returns None for regular URLs.
+    """
+    if not base_url.startswith(INPROC_SCHEME):
+        return None
+    path = base_url[len(INPROC_SCHEME):]
+    path = path[path.find("/"):] if "/" in path else ""
+    return INPROC_HOST + (path.rstrip("/") or "/api")
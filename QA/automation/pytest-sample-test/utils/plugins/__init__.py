@@ -0,0 +1,12 @@
+"""
+Pytest plugins registered by the root conftest.py through ``pytest_plugins``.
+
+- ``load``: --load runs.
+- ``soak``: --soak runs.
+- ``dist``: --dist-coordinator, --dist-worker and --dist-local runs.
+- ``impact``: --changed-only test impact analysis.
+- ``summary``: the terminal summary sections.
+
+``state`` holds the stash keys and worker hand-over shared by conftest.py
+and these plugins; the plugins never import conftest.py.
+"""
@@ -0,0 +1,171 @@
+"""
+--dist-coordinator, --dist-worker and --dist-local: hand the collected
+tests out to worker processes on any number of machines. A worker joins
+before anything else is configured, since the coordinator hands it the
+run's shared settings; the coordinator starts once they are all known.
+utils.distributed is imported only when one of the options is given.
+"""
+import os
+import socket
+from typing import Tuple
+
+import pytest
+
+from utils.durations import DurationStore, longest_first
+from utils.plugins.state import (
+    dist_coordinator_address, dist_coordinator_key, dist_input_key, dist_local_workers_key, dist_worker_key,
+    merge_worker_output, worker_settings
+)
+
+
+def pytest_addoption(parser):
+    """Register the distributed run command line options."""
+    dist = parser.getgroup("dist", "distributed runs")
+    dist.addoption("--dist-coordinator", default="",
+                   help="Serve the collected tests to --dist-worker processes from HOST:PORT (port 0 picks a free one)")
+    dist.addoption("--dist-local", type=int, default=0,
+                   help="Coordinate N worker processes started on this machine (coordinator on 127.0.0.1 by default)")
+    dist.addoption("--dist-worker", default="",
+                   help="Run the tests handed out by the coordinator at HOST:PORT")
+    dist.addoption("--dist-worker-id", default="",
+                   help="Unique name of this worker (default: <hostname>-<pid>)")
+    dist.addoption("--dist-timeout", type=float, default=120.0,
+                   help="Seconds before a silent worker is dropped, a worker gives up connecting, "
+                        "or the coordinator gives up without workers")
+    dist.addoption("--dist-max-requeue", type=int, default=1,
+                   help="Times a test whose worker died while running it is requeued before it is reported as an error")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Validate the dist options and join the coordinator before the rest of the run is configured."""
+    coordinator_address = dist_coordinator_address(config)
+    if not (coordinator_address or config.getoption("dist_worker")):
+        return
+    if coordinator_address and config.getoption("dist_worker"):
+        raise pytest.UsageError("a process is either a --dist-coordinator or a --dist-worker, not both")
+    if config.getoption("numprocesses", None) or config.getoption("load") or config.getoption("soak"):
+        raise pytest.UsageError("--dist-coordinator/--dist-worker cannot be combined with -n, --load or --soak")
+    address = _parse_address(coordinator_address or config.getoption("dist_worker"))
+    if config.getoption("dist_worker"):
+        _join_coordinator(config, address)
+
+
+def pytest_sessionstart(session):
+    """Start the coordinator once the settings it hands to workers are configured."""
+    config = session.config
+    coordinator_address = dist_coordinator_address(config)
+    if coordinator_address and not config.option.collectonly:
+        _start_coordinator(config, _parse_address(coordinator_address))
+
+
+def pytest_unconfigure(config):
+    """Stop the dist coordinator and its local workers."""
+    coordinator = config.stash.get(dist_coordinator_key, None)
+    if coordinator is not None:
+        coordinator.stop()
+    local_workers = config.stash.get(dist_local_workers_key, None)
+    if local_workers is not None:
+        local_workers.stop()
+
+
+def _parse_address(address: str) -> Tuple[str, int]:
+    from utils.distributed import parse_address
+    try:
+        return parse_address(address)
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+
+
+def _join_coordinator(config, address: Tuple[str, int]):
+    """Connect to the coordinator before anything else is configured: it hands out the shared run settings."""
+    from utils.distributed import DistWorker
+    worker_id = config.getoption("dist_worker_id") or f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        client = DistWorker(address, worker_id, connect_timeout=config.getoption("dist_timeout"))
+        config.stash[dist_input_key] = client.join()
+    except (OSError, ValueError) as exc:
+        raise pytest.UsageError(f"cannot join the dist coordinator at {address[0]}:{address[1]}: {exc}")
+    config.stash[dist_worker_key] = client
+
+
+def _start_coordinator(config, address: Tuple[str, int]):
+    """Listen for workers and start the --dist-local ones; they collect while this process does."""
+    from utils.distributed import Coordinator, LocalWorkers
+    settings = worker_settings(config)
+    # The limiter state file only exists on this machine; remote workers limit themselves.
+    settings.pop("rate_limit_state", None)
+    try:
+        coordinator = Coordinator(
+            address,
+            settings,
+            timeout=config.getoption("dist_timeout"),
+            max_requeue=config.getoption("dist_max_requeue")
+        )
+    except OSError as exc:
+        raise pytest.UsageError(f"cannot listen on {address[0]}:{address[1]}: {exc}")
+    coordinator.start()
+    config.stash[dist_coordinator_key] = coordinator
+
+    if config.getoption("dist_local"):
+        local_workers = config.stash[dist_local_workers_key] = LocalWorkers(
+            list(config.invocation_params.args),
+            coordinator.address,
+            log_dir=str(config.rootpath / "reports" / "dist"),
+            cwd=str(config.invocation_params.dir)
+        )
+        local_workers.start(config.getoption("dist_local"))
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """Run the collected tests through the dist coordinator, or the ones it hands to this worker."""
+    config = session.config
+    if config.option.collectonly:
+        return None
+    if dist_coordinator_key in config.stash:
+        return _run_dist_coordinator(session)
+    if dist_worker_key in config.stash:
+        return _run_dist_worker(session)
+    return None
+
+
+def _run_dist_coordinator(session):
+    from utils.distributed import run_coordinator
+    config = session.config
+    coordinator = config.stash[dist_coordinator_key]
+    nodeids = [item.nodeid for item in session.items]
+    store = DurationStore(config.getoption("durations_store"))
+    coordinator.load([nodeids[index] for index in longest_first(nodeids, store)])
+    if not session.items:
+        return True
+
+    reporter = config.pluginmanager.get_plugin("terminalreporter")
+
+    def _log(line: str):
+        if reporter is not None:
+            reporter.write_line(line)
+
+    host, port = coordinator.address
+    _log(f"dist coordinator listening on {host}:{port}, {len(session.items)} tests queued")
+    run_coordinator(session, coordinator, config.stash.get(dist_local_workers_key, None), _log)
+    for worker, state in coordinator.workers.items():
+        if state.output:
+            merge_worker_output(config, worker, state.output)
+    return True
+
+
+def _run_dist_worker(session):
+    from utils.distributed import WorkerReporter, run_worker
+    config = session.config
+    client = config.stash[dist_worker_key]
+    try:
+        client.check_collection([item.nodeid for item in session.items])
+        config.pluginmanager.register(WorkerReporter(client, config), "dist-worker-reporter")
+        run_worker(session, client)
+    except (OSError, ValueError) as exc:
+        reporter = config.pluginmanager.get_plugin("terminalreporter")
+        if reporter is not None:
+            reporter.write_line(f"dist worker {client.worker} stopped: {exc}", red=True)
+        raise session.Failed(str(exc))
+    return True
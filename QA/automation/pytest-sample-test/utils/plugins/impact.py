@@ -0,0 +1,136 @@
+"""
+--changed-only: deselect tests whose fingerprint matches the one cached
+when they last passed, fingerprint the ones that run and cache them again
+once they pass.
+"""
+import os
+from typing import Any, Dict
+
+import pytest
+
+from utils.impact import Fingerprinter, ImpactCache, impact_results, load_spec, operation_digests
+from utils.metrics import endpoint_trace
+from utils.petstore_emulator import resolve_inproc_url
+from utils.plugins.state import impact_cache_key, impact_key, impact_spec_error_key, is_worker, worker_input
+
+
+def pytest_addoption(parser):
+    """Register the test impact analysis command line options."""
+    impact = parser.getgroup("impact", "test impact analysis")
+    impact.addoption("--changed-only", action="store_true", default=False,
+                     help="Run only tests whose code, utils, fixtures, API operations or target build changed since they last passed")
+    impact.addoption("--impact-cache", default="reports/impact.json",
+                     help="Fingerprints of passed tests used by --changed-only")
+    impact.addoption("--api-spec", default=os.getenv("API_SPEC_URL", ""),
+                     help="OpenAPI/Swagger JSON URL or file (default: <API_BASE_URL>/swagger.json)")
+    impact.addoption("--target-build", default=os.getenv("API_BUILD_ID", ""),
+                     help="Identifier of the API build under test (default: digest of the API spec)")
+
+
+def pytest_configure(config):
+    """Load the impact analysis inputs under --changed-only."""
+    if config.getoption("changed_only"):
+        _configure_impact(config, worker_input(config))
+
+
+def _configure_impact(config, workerinput: Dict[str, Any]):
+    """
+    Load the API spec once on the controller and share its digests with xdist
+    workers. Without the spec only --target-build can tell builds apart, so
+    the run stops rather than skip tests against an unknown build.
+    """
+    if "impact_build" in workerinput:
+        build, operations = workerinput["impact_build"], workerinput["impact_operations"]
+    else:
+        spec_source = config.getoption("api_spec")
+        base_url = os.getenv("API_BASE_URL", "http://localhost:8080/api")
+        if not spec_source and resolve_inproc_url(base_url) is None:
+            spec_source = f"{base_url.rstrip('/')}/swagger.json"
+        build = config.getoption("target_build")
+        try:
+            operations = operation_digests(load_spec(spec_source))
+        except ValueError as exc:
+            if not build:
+                raise pytest.UsageError(
+                    f"--changed-only cannot identify the API build: {exc}; pass --api-spec or --target-build"
+                )
+            config.stash[impact_spec_error_key] = str(exc)
+            operations = {}
+        build = build or Fingerprinter.spec_build(operations)
+
+    config.stash[impact_key] = Fingerprinter(str(config.rootpath), build, operations)
+    config.stash[impact_cache_key] = ImpactCache(config.getoption("impact_cache"))
+
+
+def pytest_report_header(config):
+    """Show the impact analysis inputs."""
+    fingerprinter = config.stash.get(impact_key, None)
+    if fingerprinter is None:
+        return None
+    lines = [
+        f"changed-only: target build {fingerprinter.build}, "
+        f"{len(fingerprinter.operations)} spec operations, cache {config.getoption('impact_cache')}"
+    ]
+    spec_error = config.stash.get(impact_spec_error_key, None)
+    if spec_error:
+        lines.append(f"changed-only: {spec_error}; operation definitions are not fingerprinted")
+    return lines
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Deselect tests whose fingerprint matches their last pass."""
+    fingerprinter = config.stash.get(impact_key, None)
+    if fingerprinter is None:
+        return
+
+    cache = config.stash[impact_cache_key]
+    selected, unchanged = [], []
+    for item in items:
+        operations = cache.operations(item.nodeid)
+        if operations is not None and cache.is_unchanged(item.nodeid, fingerprinter.fingerprint(item, operations)):
+            unchanged.append(item)
+        else:
+            selected.append(item)
+
+    if unchanged:
+        config.hook.pytest_deselected(items=unchanged)
+        items[:] = selected
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Start tracing the API operations the test calls."""
+    if impact_key in item.config.stash:
+        endpoint_trace.start()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """Attach the test's fingerprint and traced operations to its teardown report."""
+    outcome = yield
+    fingerprinter = item.config.stash.get(impact_key, None)
+    if fingerprinter is not None and call.when == "teardown":
+        report = outcome.get_result()
+        operations = endpoint_trace.stop()
+        report.impact_fingerprint = fingerprinter.fingerprint(item, operations)
+        report.impact_operations = sorted(operations)
+
+
+def pytest_runtest_logreport(report):
+    """Collect outcomes and fingerprints, including those reported by xdist and dist workers."""
+    impact_results.add(report)
+
+
+def pytest_sessionfinish(session):
+    """Cache the fingerprints of tests that passed; a run where nothing changed passes."""
+    config = session.config
+    cache = config.stash.get(impact_cache_key, None)
+    if cache is None or is_worker(config):
+        return
+
+    impact_results.apply(cache)
+    cache.save()
+    if session.exitstatus == pytest.ExitCode.NO_TESTS_COLLECTED and cache.tests:
+        # Nothing changed: an empty selection is a pass, not a usage error.
+        session.exitstatus = pytest.ExitCode.OK
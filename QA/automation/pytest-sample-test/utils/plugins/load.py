@@ -0,0 +1,71 @@
+"""
+--load: replay the collected tests as weighted load scenarios instead of
+running each once. The load runner is imported only under --load.
+"""
+import math
+
+import pytest
+
+from utils.plugins.state import load_report_key
+
+
+def pytest_addoption(parser):
+    """Register the load-test command line options."""
+    group = parser.getgroup("load", "load testing")
+    group.addoption("--load", action="store_true", default=False,
+                    help="Replay the selected tests as weighted load scenarios instead of running them once")
+    group.addoption("--load-concurrency", type=int, default=10,
+                    help="Closed loop: number of concurrent virtual users. Open loop: max in-flight scenarios")
+    group.addoption("--load-duration", type=float, default=None,
+                    help="Run duration in seconds (default 30, unlimited when --load-iterations is set)")
+    group.addoption("--load-iterations", type=int, default=None,
+                    help="Stop after this many scenario iterations")
+    group.addoption("--load-rate", type=float, default=None,
+                    help="Open loop: constant scenario arrival rate per second")
+    group.addoption("--load-max-error-rate", type=float, default=0.01,
+                    help="Fail the run when the scenario error rate exceeds this fraction")
+    group.addoption("--load-seed", type=int, default=None,
+                    help="Seed for weighted scenario selection")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Refuse --load with -n: it manages its own concurrency."""
+    if config.getoption("load") and config.getoption("numprocesses", None):
+        raise pytest.UsageError("--load manages its own concurrency; do not combine it with -n")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """Run the collected tests as load scenarios when --load is given."""
+    if session.config.option.collectonly or not session.config.getoption("load"):
+        return None
+    return _run_load(session)
+
+
+def _run_load(session):
+    from utils.load_runner import LoadConfig, LoadRunner
+    config = session.config
+    iterations = config.getoption("load_iterations")
+    duration = config.getoption("load_duration")
+    if duration is None:
+        duration = math.inf if iterations else 30.0
+
+    load_config = LoadConfig(
+        concurrency=config.getoption("load_concurrency"),
+        duration=duration,
+        iterations=iterations,
+        rate=config.getoption("load_rate"),
+        max_error_rate=config.getoption("load_max_error_rate"),
+        seed=config.getoption("load_seed")
+    )
+    try:
+        runner = LoadRunner(session.items, load_config)
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+    report = runner.run()
+    config.stash[load_report_key] = report
+
+    if report.error_rate() > load_config.max_error_rate:
+        session.testsfailed = report.failures
+    return True
@@ -0,0 +1,94 @@
+"""
+--soak: loop the collected tests for a long run, sampling latency, error
+rate and memory per window and flagging drift. The soak runner is
+imported only under --soak.
+"""
+import json
+import math
+import os
+
+import pytest
+
+from utils.plugins.state import load_report_key
+
+
+def pytest_addoption(parser):
+    """Register the soak-test command line options."""
+    soak = parser.getgroup("soak", "soak testing")
+    soak.addoption("--soak", action="store_true", default=False,
+                   help="Loop the selected tests for a long run and flag latency, error rate or memory drift")
+    soak.addoption("--soak-duration", type=float, default=None,
+                   help="Soak duration in seconds (default 3600, unlimited when --soak-iterations is set)")
+    soak.addoption("--soak-iterations", type=int, default=None,
+                   help="Stop the soak after this many scenario iterations")
+    soak.addoption("--soak-window", type=float, default=60.0,
+                   help="Length in seconds of each sampling window")
+    soak.addoption("--soak-concurrency", type=int, default=1,
+                   help="Number of concurrent virtual users during the soak")
+    soak.addoption("--soak-drift-windows", type=int, default=5,
+                   help="Minimum number of full windows before drift is judged")
+    soak.addoption("--soak-drift-min-change", type=float, default=0.1,
+                   help="Smallest growth over the run flagged as drift, as a fraction of the series median")
+    soak.addoption("--soak-drift-min-error-rate", type=float, default=0.01,
+                   help="Smallest rise in the window error rate flagged as drift")
+    soak.addoption("--soak-max-error-rate", type=float, default=0.01,
+                   help="Fail the soak when the overall scenario error rate exceeds this fraction")
+    soak.addoption("--soak-no-tracemalloc", action="store_true", default=False,
+                   help="Skip tracemalloc allocation tracking (lower overhead, no allocator drift)")
+    soak.addoption("--soak-report", default="reports/soak.json",
+                   help="Write the per-window soak samples and drift findings to this JSON file (empty to disable)")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    """Refuse --soak with --load or -n: it manages its own concurrency."""
+    if config.getoption("soak"):
+        if config.getoption("load"):
+            raise pytest.UsageError("--soak and --load are mutually exclusive")
+        if config.getoption("numprocesses", None):
+            raise pytest.UsageError("--soak manages its own concurrency; do not combine it with -n")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtestloop(session):
+    """Run the collected tests as a soak under --soak."""
+    if session.config.option.collectonly or not session.config.getoption("soak"):
+        return None
+    return _run_soak(session)
+
+
+def _run_soak(session):
+    from utils.soak import SoakConfig, SoakRunner
+    config = session.config
+    iterations = config.getoption("soak_iterations")
+    duration = config.getoption("soak_duration")
+    if duration is None:
+        duration = math.inf if iterations else 3600.0
+
+    soak_config = SoakConfig(
+        duration=duration,
+        iterations=iterations,
+        window=config.getoption("soak_window"),
+        concurrency=config.getoption("soak_concurrency"),
+        drift_windows=config.getoption("soak_drift_windows"),
+        drift_min_change=config.getoption("soak_drift_min_change"),
+        drift_min_error_rate=config.getoption("soak_drift_min_error_rate"),
+        trace_allocations=not config.getoption("soak_no_tracemalloc"),
+        seed=config.getoption("load_seed")
+    )
+    try:
+        runner = SoakRunner(session.items, soak_config)
+    except ValueError as exc:
+        raise pytest.UsageError(str(exc))
+    report = runner.run()
+    config.stash[load_report_key] = report
+
+    path = config.getoption("soak_report")
+    if path:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as report_file:
+            json.dump(report.to_dict(), report_file, indent=2)
+
+    if report.error_rate() > config.getoption("soak_max_error_rate") or report.drifts:
+        session.testsfailed = max(report.failures, 1)
+    return True
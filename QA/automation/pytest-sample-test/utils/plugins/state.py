@@ -0,0 +1,132 @@
+"""
+Run state shared by conftest.py and the plugins: the config stash keys,
+the settings handed down to xdist and dist workers, and the stats they
+hand back.
+"""
+from typing import TYPE_CHECKING, Any, Dict
+
+import pytest
+
+from utils.cleanup import cleanup_report
+from utils.deadline import DeadlineBudget
+from utils.http_pool import PoolStats, pool_totals
+from utils.id_space import IdSpace
+from utils.impact import Fingerprinter, ImpactCache
+from utils.metrics import export_stats, payload_metrics, request_metrics
+from utils.rate_limit import SharedRateLimiter
+from utils.results_sink import ResultsSink
+from utils.startup import StartupProfile, startup_profiler
+from utils.warmup import WarmupReport
+
+if TYPE_CHECKING:
+    from utils.distributed import Coordinator, DistWorker, LocalWorkers
+    from utils.load_runner import LoadReport
+
+
+load_report_key = pytest.StashKey["LoadReport"]()
+pool_stats_key = pytest.StashKey[Dict[str, PoolStats]]()
+deadline_key = pytest.StashKey[DeadlineBudget]()
+deadline_rejected_key = pytest.StashKey[int]()
+impact_key = pytest.StashKey[Fingerprinter]()
+impact_cache_key = pytest.StashKey[ImpactCache]()
+impact_spec_error_key = pytest.StashKey[str]()
+warmup_key = pytest.StashKey[Dict[str, WarmupReport]]()
+rate_limiter_key = pytest.StashKey[SharedRateLimiter]()
+results_sink_key = pytest.StashKey[ResultsSink]()
+results_run_key = pytest.StashKey[str]()
+startup_key = pytest.StashKey[Dict[str, StartupProfile]]()
+dist_coordinator_key = pytest.StashKey["Coordinator"]()
+dist_local_workers_key = pytest.StashKey["LocalWorkers"]()
+dist_worker_key = pytest.StashKey["DistWorker"]()
+dist_input_key = pytest.StashKey[Dict[str, Any]]()
+id_space_key = pytest.StashKey[IdSpace]()
+
+
+def dist_coordinator_address(config) -> str:
+    """The address --dist-coordinator or --dist-local listens on; empty when neither is given."""
+    address = config.getoption("dist_coordinator")
+    if not address and config.getoption("dist_local"):
+        address = "127.0.0.1:0"
+    return address
+
+
+def is_worker(config) -> bool:
+    """True in an xdist or dist worker, which hands its stats to the controller or coordinator."""
+    return hasattr(config, "workeroutput") or dist_worker_key in config.stash
+
+
+def worker_input(config) -> Dict[str, Any]:
+    """Settings handed down by the xdist controller or the dist coordinator; empty elsewhere."""
+    return getattr(config, "workerinput", None) or config.stash.get(dist_input_key, {})
+
+
+def worker_settings(config) -> Dict[str, Any]:
+    """The data seed, rate limiter, results run id and impact analysis inputs workers share with this process."""
+    settings = {"data_seed": config.getoption("data_seed")}
+    limiter = config.stash.get(rate_limiter_key, None)
+    if limiter is not None:
+        settings["rate_limit_state"] = limiter.path
+    run_id = config.stash.get(results_run_key, None)
+    if run_id is not None:
+        settings["results_run_id"] = run_id
+    fingerprinter = config.stash.get(impact_key, None)
+    if fingerprinter is not None:
+        settings["impact_build"] = fingerprinter.build
+        settings["impact_operations"] = fingerprinter.operations
+    return settings
+
+
+def worker_output(config) -> Dict[str, Any]:
+    """Request latency, payload, pool, cleanup, warm-up and start-up stats recorded by this worker."""
+    budget = config.stash.get(deadline_key, None)
+    warmup = config.stash.get(warmup_key, {}).get("main")
+    output = {
+        "request_metrics": export_stats(request_metrics.snapshot()),
+        "payload_metrics": payload_metrics.export(),
+        "pool_stats": pool_totals.to_dict(),
+        "deadline_rejected": budget.rejected if budget else 0,
+        "cleanup": cleanup_report.to_dict(),
+        "warmup": warmup.to_dict() if warmup else None,
+    }
+    id_space = config.stash.get(id_space_key, None)
+    if id_space is not None and id_space.detector is not None:
+        output["interference"] = id_space.detector.export()
+    if config.getoption("import_profile"):
+        output["startup"] = startup_profiler.profile.to_dict()
+    return output
+
+
+def merge_worker_output(config, worker_id: str, workeroutput: Dict[str, Any]):
+    """Merge request latency, payload, pool, cleanup and start-up stats recorded by an xdist or dist worker."""
+    worker_metrics = workeroutput.get("request_metrics")
+    if worker_metrics:
+        request_metrics.merge(worker_metrics)
+
+    worker_payloads = workeroutput.get("payload_metrics")
+    if worker_payloads:
+        payload_metrics.merge(worker_payloads)
+
+    worker_cleanup = workeroutput.get("cleanup")
+    if worker_cleanup:
+        cleanup_report.merge(worker_cleanup)
+
+    worker_interference = workeroutput.get("interference")
+    id_space = config.stash.get(id_space_key, None)
+    if worker_interference and id_space is not None and id_space.detector is not None:
+        id_space.detector.merge(worker_interference)
+
+    rejected = workeroutput.get("deadline_rejected")
+    if rejected:
+        config.stash[deadline_rejected_key] = config.stash.get(deadline_rejected_key, 0) + rejected
+
+    worker_warmup = workeroutput.get("warmup")
+    if worker_warmup:
+        config.stash.setdefault(warmup_key, {})[worker_id] = WarmupReport(**worker_warmup)
+
+    worker_pool = workeroutput.get("pool_stats")
+    if worker_pool and worker_pool.get("requests"):
+        config.stash.setdefault(pool_stats_key, {})[worker_id] = PoolStats(**worker_pool)
+
+    worker_startup = workeroutput.get("startup")
+    if worker_startup:
+        config.stash.setdefault(startup_key, {})[worker_id] = StartupProfile(**worker_startup)
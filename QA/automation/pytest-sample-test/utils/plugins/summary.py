@@ -0,0 +1,359 @@
+"""
+Terminal summary sections: start-up, warm-up, connection pool, rate limit,
+run deadline, cleanup, interference, dist workers and worker balance, then
+the request payload and latency tables, or the load or soak report.
+"""
+from typing import TYPE_CHECKING, Dict, Tuple
+
+from utils.api_helpers import transport
+from utils.cleanup import cleanup_report
+from utils.durations import run_durations
+from utils.http_pool import PoolStats
+from utils.metrics import PayloadStats, format_table, payload_metrics, request_metrics, summary_rows
+from utils.plugins.state import (
+    deadline_key, deadline_rejected_key, dist_coordinator_key, id_space_key, load_report_key, pool_stats_key,
+    rate_limiter_key, startup_key, warmup_key
+)
+from utils.startup import PHASES
+
+if TYPE_CHECKING:
+    from utils.soak import SoakReport
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Print the request latency table, or the load-test report under --load."""
+    _write_startup_summary(terminalreporter, config)
+    _write_warmup_summary(terminalreporter, config)
+    _write_pool_summary(terminalreporter, config)
+    _write_rate_limit_summary(terminalreporter, config)
+    _write_deadline_summary(terminalreporter, config)
+    _write_cleanup_summary(terminalreporter)
+    _write_interference_summary(terminalreporter, config)
+    _write_dist_summary(terminalreporter, config)
+    _write_worker_balance(terminalreporter)
+
+    report = config.stash.get(load_report_key, None)
+    if report is None:
+        _write_payload_summary(terminalreporter)
+        _write_latency_summary(terminalreporter, config)
+        return
+
+    if report.mode == "soak":
+        _write_soak_summary(terminalreporter, report)
+    else:
+        terminalreporter.section(f"load test ({report.mode} loop)")
+    terminalreporter.write_line(
+        f"{report.iterations} iterations in {report.elapsed:.1f}s "
+        f"({report.iterations / report.elapsed:.1f}/s), "
+        f"error rate {report.error_rate() * 100:.2f}%"
+    )
+    for title, stats in (("scenario", report.scenarios), ("endpoint", report.endpoints)):
+        header = (title, "count", "rps", "errors", "p50 ms", "p95 ms", "p99 ms", "max ms")
+        terminalreporter.write_line("")
+        for line in format_table(header, summary_rows(stats, report.elapsed)):
+            terminalreporter.write_line(line)
+
+
+def _write_soak_summary(terminalreporter, report: "SoakReport"):
+    terminalreporter.section(f"soak test ({len(report.windows)} windows)")
+    rows = [
+        (
+            str(window.index),
+            f"{window.seconds:.0f}",
+            str(window.iterations),
+            f"{window.error_rate * 100:.2f}%",
+            f"{window.p50_ms:.1f}",
+            f"{window.p95_ms:.1f}",
+            f"{window.p99_ms:.1f}",
+            f"{window.rss_bytes / 1048576:.1f}",
+            f"{window.traced_bytes / 1048576:.2f}",
+            "-" if window.open_fds is None else str(window.open_fds)
+        )
+        for window in report.windows
+    ]
+    header = ("window", "s", "iterations", "errors", "p50 ms", "p95 ms", "p99 ms", "rss MiB", "traced MiB", "fds")
+    for line in format_table(header, rows):
+        terminalreporter.write_line(line)
+
+    terminalreporter.write_line("")
+    if not report.drifts:
+        terminalreporter.write_line("no drift detected")
+    for drift in report.drifts:
+        terminalreporter.write_line(f"DRIFT {drift.describe()}", red=True)
+    terminalreporter.write_line("")
+
+
+def _write_dist_summary(terminalreporter, config):
+    coordinator = config.stash.get(dist_coordinator_key, None)
+    if coordinator is None or not coordinator.workers:
+        return
+
+    terminalreporter.section("dist workers")
+    rows = [
+        (worker, str(state.tests), str(state.requeued), "lost" if state.lost else "finished")
+        for worker, state in sorted(coordinator.workers.items())
+    ]
+    for line in format_table(("worker", "tests", "requeued", "status"), rows):
+        terminalreporter.write_line(line)
+    for worker, state in sorted(coordinator.workers.items()):
+        if state.lost:
+            terminalreporter.write_line(f"LOST {worker}: {state.lost}", red=True)
+    terminalreporter.write_line(
+        f"{coordinator.queue.requeued} tests requeued after a lost worker, "
+        f"{len(coordinator.given_up)} given up after --dist-max-requeue"
+    )
+
+
+def _write_worker_balance(terminalreporter):
+    busy = run_durations.workers
+    if len(busy) < 2:
+        return
+
+    terminalreporter.section("worker balance")
+    rows = [
+        (worker_id, str(run_durations.worker_tests.get(worker_id, 0)), f"{seconds:.2f}")
+        for worker_id, seconds in sorted(busy.items())
+    ]
+    for line in format_table(("worker", "tests", "busy s"), rows):
+        terminalreporter.write_line(line)
+    terminalreporter.write_line(
+        f"ideal {sum(busy.values()) / len(busy):.2f}s per worker, slowest {max(busy.values()):.2f}s"
+    )
+
+
+def _write_cleanup_summary(terminalreporter):
+    if not cleanup_report.stats:
+        return
+
+    terminalreporter.section("cleanup")
+    rows = [
+        (resource_type, str(stats.deleted), str(stats.missing), str(stats.leaked), f"{stats.seconds:.2f}")
+        for resource_type, stats in sorted(cleanup_report.stats.items())
+    ]
+    for line in format_table(("type", "deleted", "missing", "leaked", "time s"), rows):
+        terminalreporter.write_line(line)
+
+    for leak in cleanup_report.leaks[:20]:
+        terminalreporter.write_line(f"LEAKED {leak['type']} {leak['id']}: {leak['url']} ({leak['error']})", red=True)
+    if len(cleanup_report.leaks) > 20:
+        terminalreporter.write_line(f"... and {len(cleanup_report.leaks) - 20} more leaked resources", red=True)
+
+
+def _write_interference_summary(terminalreporter, config):
+    id_space = config.stash.get(id_space_key, None)
+    detector = id_space.detector if id_space is not None else None
+    if detector is None or not detector.total:
+        return
+
+    terminalreporter.section("resource interference")
+    rows = [(kind, str(count)) for kind, count in sorted(detector.counts.items())]
+    for line in format_table(("finding", "count"), rows):
+        terminalreporter.write_line(line)
+    for finding in detector.findings[:20]:
+        terminalreporter.write_line(
+            f"{finding['kind'].upper()} {finding['resource']} in {finding['test']}: {finding['detail']}",
+            red=config.getoption("interference") == "fail"
+        )
+    if detector.total > 20:
+        terminalreporter.write_line(f"... and {detector.total - 20} more findings")
+
+
+def _write_deadline_summary(terminalreporter, config):
+    budget = config.stash.get(deadline_key, None)
+    if budget is None:
+        return
+
+    rejected = config.stash.get(deadline_rejected_key, 0)
+    terminalreporter.section("run deadline")
+    terminalreporter.write_line(
+        f"budget {budget.seconds:.1f}s, used {min(budget.elapsed(), budget.seconds):.1f}s, "
+        f"{rejected} requests rejected after the deadline"
+    )
+
+    stats = request_metrics.snapshot()
+    spent = sorted(stats.items(), key=lambda item: item[1].histogram.total, reverse=True)[:5]
+    rows = [
+        (
+            key,
+            str(endpoint.histogram.count),
+            f"{endpoint.histogram.total:.2f}",
+            f"{endpoint.histogram.total / budget.seconds * 100:.1f}%"
+        )
+        for key, endpoint in spent
+    ]
+    if rows:
+        terminalreporter.write_line("")
+        for line in format_table(("endpoint", "count", "time s", "of budget"), rows):
+            terminalreporter.write_line(line)
+
+
+def _write_startup_summary(terminalreporter, config):
+    profiles = config.stash.get(startup_key, {})
+    if not profiles:
+        return
+
+    # Workers are "ready" relative to the earliest process start, the controller's under xdist.
+    first_start = min(profile.started for profile in profiles.values())
+    terminalreporter.section("start-up")
+    header = ("process", "total s") + tuple(f"{phase} s" for phase in PHASES) + ("modules", "ready at s")
+    rows = [
+        (
+            name,
+            f"{profile.total:.2f}",
+        ) + tuple(
+            f"{profile.phases[phase]:.2f}" if phase in profile.phases else "-" for phase in PHASES
+        ) + (
+            str(sum(profile.modules.values())),
+            f"{profile.ready - first_start:.2f}"
+        )
+        for name, profile in sorted(profiles.items())
+    ]
+    for line in format_table(header, rows):
+        terminalreporter.write_line(line)
+
+    slowest: Dict[str, float] = {}
+    for profile in profiles.values():
+        for path, seconds in profile.test_modules.items():
+            slowest[path] = max(slowest.get(path, 0.0), seconds)
+    if slowest:
+        terminalreporter.write_line("")
+        rows = [
+            (path, f"{seconds * 1000:.1f}")
+            for path, seconds in sorted(slowest.items(), key=lambda item: item[1], reverse=True)[:5]
+        ]
+        for line in format_table(("test module", "collect ms"), rows):
+            terminalreporter.write_line(line)
+
+    budget_seconds = config.getoption("import_budget")
+    if budget_seconds <= 0:
+        return
+    terminalreporter.write_line("")
+    over = [(name, profile.total) for name, profile in sorted(profiles.items()) if profile.total > budget_seconds]
+    if not over:
+        terminalreporter.write_line(f"all processes started within the {budget_seconds:.2f}s budget")
+    for name, total in over:
+        terminalreporter.write_line(
+            f"OVER BUDGET {name}: {total:.2f}s > {budget_seconds:.2f}s (break it down with python -X importtime)",
+            red=True
+        )
+
+
+def _write_warmup_summary(terminalreporter, config):
+    reports = config.stash.get(warmup_key, {})
+    if not reports:
+        return
+
+    terminalreporter.section("warm-up")
+    families = sorted({family for report in reports.values() for family in report.families})
+    header = ("worker", "ready s", "attempts", "connections", "requests", "warm-up s") + tuple(
+        f"{family} ms" for family in families
+    )
+    rows = [
+        (
+            worker_id,
+            f"{report.ready_seconds:.2f}",
+            str(report.attempts),
+            str(report.connections),
+            str(report.requests),
+            f"{report.warmup_seconds:.2f}",
+        ) + tuple(f"{report.families.get(family, 0.0) * 1000:.1f}" for family in families)
+        for worker_id, report in sorted(reports.items())
+    ]
+    for line in format_table(header, rows):
+        terminalreporter.write_line(line)
+
+
+def _write_pool_summary(terminalreporter, config):
+    pools = config.stash.get(pool_stats_key, {})
+    if not pools:
+        return
+
+    total = PoolStats()
+    rows = []
+    for worker_id in sorted(pools):
+        stats = pools[worker_id]
+        total.add(stats)
+        rows.append(_pool_row(worker_id, stats))
+    if len(rows) > 1:
+        rows.append(_pool_row("total", total))
+
+    terminalreporter.section("connection pool")
+    header = ("worker", "requests", "opened", "reused", "reuse")
+    for line in format_table(header, rows):
+        terminalreporter.write_line(line)
+
+
+def _write_rate_limit_summary(terminalreporter, config):
+    limiter = config.stash.get(rate_limiter_key, None)
+    if limiter is None:
+        return
+
+    state = limiter.state()
+    terminalreporter.section(f"rate limit ({limiter.mode})")
+    cap = f"{limiter.rps:g} rps cap" if limiter.rps else "no rps cap"
+    line = f"{state.requests} requests, {cap}, {state.throttled} throttled for {state.waited:.2f}s in total"
+    if limiter.mode == "adaptive":
+        line += (
+            f"; in-flight limit {state.limit:.1f} at the end "
+            f"(range {state.lowest_limit:.1f}-{state.highest_limit:.1f}, {state.decreases} backoffs)"
+        )
+    terminalreporter.write_line(line)
+
+
+def _pool_row(name: str, stats: PoolStats) -> Tuple[str, ...]:
+    return (
+        name,
+        str(stats.requests),
+        str(stats.connections_opened),
+        str(stats.connections_reused),
+        f"{stats.reuse_ratio() * 100:.1f}%"
+    )
+
+
+def _write_payload_summary(terminalreporter):
+    stats = payload_metrics.snapshot()
+    if not stats:
+        return
+
+    total = PayloadStats()
+    rows = []
+    for key in sorted(stats):
+        total.add(stats[key])
+        rows.append(_payload_row(key, stats[key]))
+    rows.append(_payload_row("total", total))
+
+    terminalreporter.section(f"payloads ({transport.codec.name}, request encoding {transport.request_encoding or 'none'})")
+    header = ("endpoint", "encode ms", "sent KiB", "wire KiB", "decode ms", "received KiB", "wire KiB", "saved")
+    for line in format_table(header, rows):
+        terminalreporter.write_line(line)
+
+
+def _payload_row(name: str, stats: PayloadStats) -> Tuple[str, ...]:
+    raw = stats.request_bytes + stats.response_bytes
+    wire = stats.request_wire_bytes + stats.response_wire_bytes
+    return (
+        name,
+        f"{stats.encode_seconds * 1000:.1f}",
+        f"{stats.request_bytes / 1024:.1f}",
+        f"{stats.request_wire_bytes / 1024:.1f}",
+        f"{stats.decode_seconds * 1000:.1f}",
+        f"{stats.response_bytes / 1024:.1f}",
+        f"{stats.response_wire_bytes / 1024:.1f}",
+        f"{(1 - wire / raw) * 100:.1f}%" if raw else "-"
+    )
+
+
+def _write_latency_summary(terminalreporter, config):
+    stats = request_metrics.snapshot()
+    if not stats:
+        return
+
+    terminalreporter.section("request latency")
+    header = ("endpoint", "count", "errors", "p50 ms", "p95 ms", "p99 ms", "max ms")
+    for line in format_table(header, summary_rows(stats)):
+        terminalreporter.write_line(line)
+
+    path = config.getoption("latency_report")
+    if path:
+        terminalreporter.write_line(f"latency report: {path}")
+
@@ -0,0 +1,204 @@
+"""
+Client-side rate limiting shared by every xdist worker.
+
+The limiter state (token bucket, in-flight limit and counters) lives in
+one small JSON file that all worker processes update under an exclusive
+file lock, so ``-n 16`` sends no more than ``-n 1`` would be allowed to.
+
+Two modes:
+
+* ``adaptive`` looks for the maximum safe throughput. The in-flight limit
+  grows by one per limit's worth of fast, successful responses and is
+  halved on a 5xx, 429, connection error, timeout or response slower than
+  the latency target (at most once per target interval, so one burst of
+  failures counts as one signal). An RPS value, if set, is a ceiling.
+* ``fixed`` caps the request rate at a constant RPS and never adapts.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, Callable
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+MODES = ("off", "adaptive", "fixed")
+
+_POLL_SECONDS = 0.005
+_MAX_SLEEP_SECONDS = 0.05
+
+
+@dataclass
+class RateLimitState:
+    """Limiter state shared between processes."""
+    limit: float
+    tokens: float
+    refilled: float
+    inflight: Dict[str, int] = field(default_factory=dict)
+    last_decrease: float = 0.0
+    lowest_limit: float = 0.0
+    highest_limit: float = 0.0
+    decreases: int = 0
+    requests: int = 0
+    throttled: int = 0
+    waited: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedRateLimiter:
+    """Token bucket plus AIMD in-flight limit backed by a file shared across processes."""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "adaptive",
+        rps: float = 0.0,
+        concurrency: int = 8,
+        max_concurrency: int = 256,
+        latency_target: float = 1.0,
+        decrease_factor: float = 0.5
+    ):
+        if mode not in MODES[1:]:
+            raise ValueError(f"rate limit mode must be one of {', '.join(MODES[1:])}, got {mode!r}")
+        if mode == "fixed" and rps <= 0:
+            raise ValueError("fixed rate limiting needs a positive RPS")
+        self.path = path
+        self.mode = mode
+        self.rps = rps
+        self.concurrency = max(1, concurrency)
+        self.max_concurrency = max(self.concurrency, max_concurrency)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._burst = max(1.0, rps / 10)
+        self._pid = str(os.getpid())
+        self._lock = threading.Lock()
+
+    def initialize(self):
+        """Write the starting state; called once by the process that owns the file."""
+        limit = float(self.concurrency) if self.mode == "adaptive" else float(self.max_concurrency)
+        state = RateLimitState(
+            limit=limit,
+            tokens=self._burst,
+            refilled=time.time(),
+            lowest_limit=limit,
+            highest_limit=limit
+        )
+        with open(self.path, "w") as state_file:
+            json.dump(state.to_dict(), state_file)
+
+    def _update(self, change: Callable[[RateLimitState], Any]) -> Any:
+        with self._lock, open(self.path, "r+") as state_file:
+            if fcntl is not None:
+                fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state = RateLimitState(**json.load(state_file))
+                result = change(state)
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump(state.to_dict(), state_file)
+                state_file.flush()
+                return result
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(state_file, fcntl.LOCK_UN)
+
+    def _try_acquire(self, state: RateLimitState) -> float:
+        """Take a slot and return 0, or return how long to wait before retrying."""
+        now = time.time()
+        if self.rps > 0:
+            state.tokens = min(self._burst, state.tokens + (now - state.refilled) * self.rps)
+            state.refilled = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / self.rps
+
+        if sum(state.inflight.values()) >= int(state.limit):
+            # A worker that died mid-request would hold its slots forever.
+            for pid in [pid for pid in state.inflight if pid != self._pid and not _pid_alive(int(pid))]:
+                del state.inflight[pid]
+            if sum(state.inflight.values()) >= int(state.limit):
+                return _POLL_SECONDS
+
+        if self.rps > 0:
+            state.tokens -= 1
+        state.inflight[self._pid] = state.inflight.get(self._pid, 0) + 1
+        state.requests += 1
+        return 0.0
+
+    def acquire(self) -> float:
+        """Block until a request may be sent and return the seconds spent waiting."""
+        start = time.monotonic()
+        throttled = False
+        while True:
+            wait = self._update(self._try_acquire)
+            if not wait:
+                break
+            throttled = True
+            time.sleep(min(wait, _MAX_SLEEP_SECONDS))
+        if not throttled:
+            return 0.0
+
+        waited = time.monotonic() - start
+
+        def _count(state: RateLimitState):
+            state.throttled += 1
+            state.waited += waited
+        self._update(_count)
+        return waited
+
+    def release(self, latency: float, failed: bool):
+        """Free the slot taken by acquire() and feed the outcome back into the limit."""
+        def _release(state: RateLimitState):
+            count = state.inflight.get(self._pid, 0) - 1
+            if count > 0:
+                state.inflight[self._pid] = count
+            else:
+                state.inflight.pop(self._pid, None)
+            if self.mode != "adaptive":
+                return
+
+            now = time.time()
+            if failed or latency > self.latency_target:
+                if now - state.last_decrease >= self.latency_target:
+                    state.limit = max(1.0, state.limit * self.decrease_factor)
+                    state.last_decrease = now
+                    state.decreases += 1
+            else:
+                state.limit = min(float(self.max_concurrency), state.limit + 1 / state.limit)
+            state.lowest_limit = min(state.lowest_limit, state.limit)
+            state.highest_limit = max(state.highest_limit, state.limit)
+
+        self._update(_release)
+
+    def state(self) -> RateLimitState:
+        """Return a copy of the current shared state."""
+        return self._update(lambda state: RateLimitState(**state.to_dict()))
+
+    def close(self):
+        """Remove the state file; called by the owning process at the end of the run."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def is_backpressure(status_code: int) -> bool:
+    """Return True for responses that mean the server is over capacity."""
+    return status_code == 429 or status_code >= 500
+
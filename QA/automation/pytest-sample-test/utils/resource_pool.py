@@ -0,0 +1,133 @@
+"""
+Session-wide pools of pre-created pets, orders and users.
+
+Read-only tests borrow a shared instance; tests that update or delete a
+resource check out an exclusive one that no other test sees. Instances
+are created in batches on first use (users in one ``/user/createWithArray``
+call, pets and orders with concurrent POSTs) and deleted together through
+the cleanup engine when the session ends.
+
+Instances take their ids and usernames from the pool's own id scope, so
+they never collide with a test's or another worker's resources, and a
+checked-out instance is claimed by the test that took it.
+"""
+import copy
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Deque, List, Optional
+
+import requests
+
+from utils.api_helpers import make_post_request
+from utils.cleanup import CleanupEngine
+from utils.data_factory import DataFactory
+from utils.id_space import IdScope
+
+
+RESOURCE_KINDS = ("pet", "order", "user")
+
+
+class ResourcePool:
+    """Pre-created Petstore resources shared across the tests of one process."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        base_url: str,
+        factory: DataFactory,
+        cleanup_engine: CleanupEngine,
+        size: int = 2,
+        ids: Optional[IdScope] = None
+    ):
+        self.session = session
+        self.base_url = base_url
+        self.factory = factory
+        self.cleanup_engine = cleanup_engine
+        self.size = size
+        self.ids = ids
+        self._shared: Dict[str, List[Dict[str, Any]]] = {}
+        self._next_shared: Dict[str, int] = {}
+        self._exclusive: Dict[str, Deque[Dict[str, Any]]] = {kind: deque() for kind in RESOURCE_KINDS}
+        self._owned: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="pool")
+        self._creators: Dict[str, Callable[[int], List[Dict[str, Any]]]] = {
+            "pet": self._create_pets,
+            "order": self._create_orders,
+            "user": self._create_users,
+        }
+
+    def shared(self, kind: str) -> Dict[str, Any]:
+        """
+        Borrow a shared instance for a read-only test, round robin.
+        Returns a copy; the server-side resource must not be modified.
+        """
+        with self._lock:
+            if kind not in self._shared:
+                self._shared[kind] = self._create(kind, self.size)
+                self._next_shared[kind] = 0
+            instances = self._shared[kind]
+            position = self._next_shared[kind]
+            self._next_shared[kind] = position + 1
+            return copy.deepcopy(instances[position % len(instances)])
+
+    def checkout(self, kind: str, owner: Optional[IdScope] = None) -> Dict[str, Any]:
+        """
+        Take an instance that only the calling test uses; it may be changed or
+        deleted. The instance's id is claimed by ``owner`` when given.
+        """
+        with self._lock:
+            available = self._exclusive[kind]
+            if not available:
+                available.extend(self._create(kind, self.size))
+            instance = available.popleft()
+        if owner is not None and instance.get("id") is not None:
+            owner.claim(instance["id"])
+        return instance
+
+    def close(self):
+        """Delete every instance the pool created, in one concurrent batch."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            owned, self._owned = self._owned, []
+        self.cleanup_engine.cleanup(owned)
+
+    def _create(self, kind: str, count: int) -> List[Dict[str, Any]]:
+        if self.ids is None:
+            return self._creators[kind](count)
+        with self.ids.space.acting(self.ids):
+            return self._creators[kind](count)
+
+    def _bound(self, func):
+        # The acting scope is thread-local; carry it onto the executor threads.
+        return func if self.ids is None else self.ids.space.bound(func)
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        url = f"{self.base_url}{path}"
+        response = make_post_request(self.session, url, json_data=payload)
+        response.assert_success(f"Resource pool could not create {path}: {response.status_code}")
+        created = response.get_data()
+        self._owned.append({"type": path.rsplit("/", 1)[-1], "id": created["id"], "url": f"{url}/{created['id']}"})
+        return created
+
+    def _create_pets(self, count: int) -> List[Dict[str, Any]]:
+        payloads = [self.factory.pet(self.ids) for _ in range(count)]
+        return list(self._executor.map(self._bound(lambda payload: self._post("/pet", payload)), payloads))
+
+    def _create_orders(self, count: int) -> List[Dict[str, Any]]:
+        payloads = [self.factory.order(self.ids) for _ in range(count)]
+        return list(self._executor.map(self._bound(lambda payload: self._post("/store/order", payload)), payloads))
+
+    def _create_users(self, count: int) -> List[Dict[str, Any]]:
+        users = [self.factory.user(self.ids) for _ in range(count)]
+        url = f"{self.base_url}/user/createWithArray"
+        response = make_post_request(self.session, url, json_data=users)
+        response.assert_success(f"Resource pool could not create users: {response.status_code}")
+        for user in users:
+            self._owned.append({
+                "type": "user",
+                "username": user["username"],
+                "url": f"{self.base_url}/user/{user['username']}"
+            })
+        return users
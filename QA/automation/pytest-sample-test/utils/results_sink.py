@@ -0,0 +1,204 @@
+"""
+Streaming JSON Lines results sink.
+
+Every process (``main`` or each xdist worker) appends one line per test
+to ``<directory>/<segment>.jsonl`` the moment the test's teardown ends:
+outcome, phase durations and the timing of every API request it made.
+Lines are flushed immediately, so ``tail -f`` or a dashboard can follow a
+run live. Segments are merged by finish time into ``merged.jsonl`` at the
+end of the run, and JUnit XML can be rendered from the merged file:
+
+    python -m utils.results_sink reports/results --junitxml test-results/junit.xml
+
+The command only merges when the run did not (``merged.jsonl`` is
+missing, e.g. the run was killed) or when asked to with ``--merge``.
+"""
+import argparse
+import glob
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Iterator, List, Optional
+from xml.etree import ElementTree
+
+from utils.metrics import request_log
+
+
+MERGED_NAME = "merged.jsonl"
+_LONGREPR_LIMIT = 4000
+
+
+class ResultsSink:
+    """Appends one JSON line per finished test to this process's segment."""
+
+    def __init__(self, directory: str, segment: str = "main", run_id: str = ""):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{segment}.jsonl")
+        self.segment = segment
+        self.run_id = run_id
+        self.tests = 0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._write({"event": "session_start", "worker": segment, "run_id": run_id, "time": time.time()})
+
+    def _write(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def start_test(self):
+        """Start capturing the request timings of the test about to run."""
+        request_log.start()
+
+    def add(self, report):
+        """Add one setup/call/teardown report; the test's line is written after teardown."""
+        record = self._pending.get(report.nodeid)
+        if record is None:
+            record = self._pending[report.nodeid] = {
+                "event": "test",
+                "nodeid": report.nodeid,
+                "worker": self.segment,
+                "outcome": "passed",
+                "duration": 0.0,
+                "phases": {},
+                "start": getattr(report, "start", time.time()),
+            }
+        record["duration"] += report.duration
+        record["phases"][report.when] = round(report.duration, 6)
+
+        if report.failed:
+            record["outcome"] = "failed" if report.when == "call" else "error"
+            record["message"] = report.longreprtext[:_LONGREPR_LIMIT]
+        elif report.skipped and record["outcome"] == "passed":
+            record["outcome"] = "skipped"
+            record["message"] = report.longreprtext[:_LONGREPR_LIMIT]
+        if report.when == "call" and hasattr(report, "wasxfail"):
+            record["outcome"] = "xfailed" if report.skipped else "xpassed"
+
+        if report.when == "teardown":
+            del self._pending[report.nodeid]
+            record["stop"] = getattr(report, "stop", time.time())
+            record["duration"] = round(record["duration"], 6)
+            record["requests"], record["requests_dropped"] = request_log.stop()
+            self.tests += 1
+            self._write(record)
+
+    def close(self, exitstatus: int):
+        """Write the session end marker and close the segment."""
+        self._write({
+            "event": "session_finish",
+            "worker": self.segment,
+            "run_id": self.run_id,
+            "time": time.time(),
+            "tests": self.tests,
+            "exitstatus": int(exitstatus),
+        })
+        self._file.close()
+
+
+def clear_segments(directory: str):
+    """Remove segments and the merged file left by an earlier run."""
+    for path in glob.glob(os.path.join(directory, "*.jsonl")):
+        os.remove(path)
+
+
+def _read(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as segment_file:
+        for line in segment_file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _finished_at(record: Dict[str, Any]) -> float:
+    return record.get("stop", record.get("time", 0.0))
+
+
+def iter_merged(directory: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of every segment ordered by finish time. Each segment
+    is already in that order, so this is a streaming k-way merge.
+    """
+    paths = sorted(
+        path for path in glob.glob(os.path.join(directory, "*.jsonl"))
+        if os.path.basename(path) != MERGED_NAME
+    )
+    yield from heapq.merge(*(_read(path) for path in paths), key=_finished_at)
+
+
+def merge_segments(directory: str) -> str:
+    """Merge all segments into ``merged.jsonl`` and return its path."""
+    merged_path = os.path.join(directory, MERGED_NAME)
+    temp_path = merged_path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as merged_file:
+        for record in iter_merged(directory):
+            merged_file.write(json.dumps(record, separators=(",", ":")) + "\n")
+    os.replace(temp_path, merged_path)
+    return merged_path
+
+
+def write_junit(records: Iterator[Dict[str, Any]], path: str, suite_name: str = "pytest"):
+    """Render test records as a JUnit XML report."""
+    tests: List[Dict[str, Any]] = [record for record in records if record.get("event") == "test"]
+    counts = {"failed": 0, "error": 0, "skipped": 0}
+    suite = ElementTree.Element("testsuite", name=suite_name)
+    for record in tests:
+        module, _, name = record["nodeid"].rpartition("::")
+        module = module.replace(".py::", "::")
+        if module.endswith(".py"):
+            module = module[:-3]
+        case = ElementTree.SubElement(
+            suite,
+            "testcase",
+            classname=module.replace("/", ".").replace("::", "."),
+            name=name,
+            time=f"{record['duration']:.3f}"
+        )
+        outcome = record["outcome"]
+        message: Optional[str] = record.get("message")
+        if outcome == "failed":
+            counts["failed"] += 1
+            element = ElementTree.SubElement(case, "failure", message=(message or outcome).splitlines()[0][:200])
+            element.text = message
+        elif outcome == "error":
+            counts["error"] += 1
+            element = ElementTree.SubElement(case, "error", message=(message or outcome).splitlines()[0][:200])
+            element.text = message
+        elif outcome in ("skipped", "xfailed"):
+            counts["skipped"] += 1
+            ElementTree.SubElement(case, "skipped", message=(message or outcome).splitlines()[0][:200])
+
+    suite.set("tests", str(len(tests)))
+    suite.set("failures", str(counts["failed"]))
+    suite.set("errors", str(counts["error"]))
+    suite.set("skipped", str(counts["skipped"]))
+    suite.set("time", f"{sum(record['duration'] for record in tests):.3f}")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    ElementTree.ElementTree(suite).write(path, encoding="utf-8", xml_declaration=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.results_sink",
+        description="Render JUnit XML from merged JSON Lines results, merging the segments if the run did not."
+    )
+    parser.add_argument("directory", nargs="?", default="reports/results", help="Results directory")
+    parser.add_argument("--junitxml", default=None, help="Write a JUnit XML report to this path")
+    parser.add_argument("--merge", action="store_true", help="Merge the segments again even if merged.jsonl exists")
+    args = parser.parse_args(argv)
+
+    merged_path = os.path.join(args.directory, MERGED_NAME)
+    if args.merge or not os.path.exists(merged_path):
+        merged_path = merge_segments(args.directory)
+        print(f"merged results: {merged_path}")
+    if args.junitxml:
+        write_junit(_read(merged_path), args.junitxml)
+        print(f"junit xml: {args.junitxml}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,60 @@
+"""
+Duration-aware test distribution for pytest-xdist.
+
+Tests are queued longest first by their historical duration and handed
+out one at a time, so every idle worker takes the longest remaining test
+(greedy LPT scheduling). Long CRUD flows start early and the run ends
+with short tests filling the gaps instead of one straggler worker.
+"""
+from typing import Optional
+
+import pytest
+from xdist.scheduler import LoadScheduling
+
+from utils.durations import DurationStore, longest_first
+
+
+# Tests queued per worker: the one running plus one ready to start,
+# which the xdist worker protocol needs to keep going.
+_PREFETCH = 2
+
+
+class DurationScheduling(LoadScheduling):
+    """LoadScheduling variant ordered by a DurationStore."""
+
+    def __init__(self, config: pytest.Config, log=None, store: Optional[DurationStore] = None):
+        super().__init__(config, log)
+        self.store = store or DurationStore("")
+
+    def schedule(self):
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        self.pending[:] = longest_first(self.collection, self.store)
+        if not self.collection:
+            return
+
+        # Deal round by round so the N longest tests start on N different workers.
+        for _ in range(_PREFETCH):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration: float = 0):
+        if node.shutting_down:
+            return
+        if self.pending:
+            self._send_tests(node, max(0, _PREFETCH - len(self.node2pending[node])))
+        else:
+            node.shutdown()
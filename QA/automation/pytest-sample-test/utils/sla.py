@@ -0,0 +1,135 @@
+"""
+Latency budgets checked by repeated sampling.
+
+``@pytest.mark.sla(p95_ms=300, samples=30, concurrency=4)`` on a test
+makes the ``sla`` fixture run the test's request ``samples`` times and
+fail when an observed percentile exceeds its budget. Failure messages
+include a distribution-free confidence interval for the percentile, so a
+budget missed by noise is easy to tell from a real regression.
+"""
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Any, Callable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from utils.id_space import IdSpace
+
+
+DEFAULT_SAMPLES = 20
+_BUDGET_KEYS = {"p50_ms": 50.0, "p90_ms": 90.0, "p95_ms": 95.0, "p99_ms": 99.0}
+
+
+def percentile(latencies: List[float], percent: float) -> float:
+    """Nearest-rank percentile of latencies in seconds."""
+    ordered = sorted(latencies)
+    return ordered[max(1, math.ceil(len(ordered) * percent / 100.0)) - 1]
+
+
+def percentile_interval(latencies: List[float], percent: float, confidence: float = 0.95) -> Tuple[float, float]:
+    """
+    Confidence interval for a percentile from order statistics, using the
+    normal approximation of the binomial rank distribution.
+    """
+    ordered = sorted(latencies)
+    count = len(ordered)
+    p = percent / 100.0
+    z = statistics.NormalDist().inv_cdf((1 + confidence) / 2)
+    spread = z * math.sqrt(count * p * (1 - p))
+    lower = min(max(math.floor(count * p - spread), 1), count)
+    upper = min(max(math.ceil(count * p + spread) + 1, 1), count)
+    return ordered[lower - 1], ordered[upper - 1]
+
+
+def assert_percentile(
+    latencies: List[float],
+    percent: float,
+    budget_ms: float,
+    confidence: float = 0.95,
+    label: str = "request"
+):
+    """Raise AssertionError when the observed percentile of latencies exceeds budget_ms."""
+    if not latencies:
+        raise AssertionError(f"No latency samples for {label}")
+    observed = percentile(latencies, percent) * 1000
+    if observed > budget_ms:
+        lower, upper = percentile_interval(latencies, percent, confidence)
+        raise AssertionError(
+            f"{label} p{percent:g} {observed:.1f} ms exceeds budget {budget_ms:g} ms "
+            f"({confidence * 100:g}% CI {lower * 1000:.1f}-{upper * 1000:.1f} ms, "
+            f"{len(latencies)} samples, max {max(latencies) * 1000:.1f} ms)"
+        )
+
+
+@dataclass
+class SLAResult:
+    """Samples taken for one SLA check."""
+    latencies: List[float]
+    results: List[Any] = field(default_factory=list)
+
+    def percentile(self, percent: float) -> float:
+        return percentile(self.latencies, percent)
+
+
+class SLASampler:
+    """Runs a request repeatedly and checks the budgets from an ``sla`` marker."""
+
+    def __init__(
+        self,
+        budgets: Dict[float, float],
+        samples: int = DEFAULT_SAMPLES,
+        concurrency: int = 1,
+        confidence: float = 0.95,
+        label: str = "request",
+        id_space: Optional["IdSpace"] = None
+    ):
+        if samples < 1:
+            raise ValueError("sla samples must be at least 1")
+        self.budgets = budgets
+        self.samples = samples
+        self.concurrency = max(1, concurrency)
+        self.confidence = confidence
+        self.label = label
+        self.id_space = id_space
+        self.result: Optional[SLAResult] = None
+
+    @classmethod
+    def from_marker(cls, marker, label: str, id_space: Optional["IdSpace"] = None) -> "SLASampler":
+        """Build a sampler from ``@pytest.mark.sla(p95_ms=..., samples=..., concurrency=...)``."""
+        options = dict(marker.kwargs)
+        budgets = {_BUDGET_KEYS[key]: float(options.pop(key)) for key in list(options) if key in _BUDGET_KEYS}
+        if not budgets:
+            raise ValueError(f"sla marker needs at least one of {', '.join(sorted(_BUDGET_KEYS))}")
+        return cls(budgets, label=label, id_space=id_space, **options)
+
+    def sample(self, request: Callable[[], Any]) -> SLAResult:
+        """
+        Call request ``samples`` times, ``concurrency`` at a time, then
+        assert every budget. Latency is APIResponse.elapsed when the call
+        returns one, and wall time otherwise.
+        """
+        if self.concurrency == 1:
+            timed = [self._timed(request) for _ in range(self.samples)]
+        else:
+            # Sampler threads act for the test that called sample().
+            if self.id_space is not None:
+                request = self.id_space.bound(request)
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="sla") as executor:
+                timed = list(executor.map(lambda _: self._timed(request), range(self.samples)))
+
+        self.result = SLAResult(
+            latencies=[latency for latency, _ in timed],
+            results=[result for _, result in timed]
+        )
+        for percent, budget_ms in sorted(self.budgets.items()):
+            assert_percentile(self.result.latencies, percent, budget_ms, self.confidence, self.label)
+        return self.result
+
+    @staticmethod
+    def _timed(request: Callable[[], Any]) -> Tuple[float, Any]:
+        start = time.perf_counter()
+        result = request()
+        elapsed = getattr(result, "elapsed", None)
+        return (elapsed if isinstance(elapsed, float) else time.perf_counter() - start), result
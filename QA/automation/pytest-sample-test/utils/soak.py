@@ -0,0 +1,295 @@
+"""
+Soak runs: the load runner's closed loop held for hours, sampled per window.
+
+Every window records request latency percentiles, the scenario error
+rate, the process RSS, open file descriptors and tracemalloc's top
+allocators. At the end each series is checked for a monotonic upward
+trend (Mann-Kendall test with Sen's slope), which is how leaks and
+connection exhaustion show up long before anything fails outright.
+
+Scenarios run through the same fixtures as regular tests, so
+``cleanup_resources`` deletes what each iteration created.
+"""
+import math
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.load_runner import LoadConfig, LoadReport, LoadRunner
+from utils.metrics import LatencyHistogram, MetricsRecorder, export_stats, request_metrics
+
+
+# One-sided 95% critical value of the Mann-Kendall z statistic.
+_TREND_Z = 1.645
+_TOP_ALLOCATORS = 10
+
+
+@dataclass
+class SoakConfig:
+    """Soak run settings."""
+    duration: float = 3600.0
+    iterations: Optional[int] = None
+    window: float = 60.0
+    concurrency: int = 1
+    drift_windows: int = 5
+    drift_min_change: float = 0.1
+    drift_min_error_rate: float = 0.01
+    trace_allocations: bool = True
+    seed: Optional[int] = None
+
+
+@dataclass
+class SoakWindow:
+    """Measurements of one time window."""
+    index: int
+    seconds: float
+    iterations: int
+    errors: int
+    requests: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    rss_bytes: int
+    open_fds: Optional[int]
+    traced_bytes: int
+    allocators: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.iterations if self.iterations else 0.0
+
+
+@dataclass
+class Drift:
+    """A series that kept growing over the run."""
+    series: str
+    first: float
+    last: float
+    slope_per_window: float
+    z: float
+
+    def describe(self) -> str:
+        return (
+            f"{self.series}: {_format_value(self.series, self.first)} -> {_format_value(self.series, self.last)} "
+            f"({_format_value(self.series, self.slope_per_window)}/window, z={self.z:.1f})"
+        )
+
+
+@dataclass
+class SoakReport(LoadReport):
+    """Load report plus per-window samples and detected drift."""
+    windows: List[SoakWindow] = field(default_factory=list)
+    drifts: List[Drift] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "elapsed": self.elapsed,
+            "iterations": self.iterations,
+            "error_rate": self.error_rate(),
+            "windows": [dict(asdict(window), error_rate=window.error_rate) for window in self.windows],
+            "drifts": [asdict(drift) for drift in self.drifts],
+            "scenarios": export_stats(self.scenarios),
+            "endpoints": export_stats(self.endpoints),
+        }
+
+
+def _format_value(series: str, value: float) -> str:
+    if series.endswith("_ms"):
+        return f"{value:.1f} ms"
+    if series == "error_rate":
+        return f"{value * 100:.2f}%"
+    if series.endswith("bytes") or series.startswith("alloc "):
+        return f"{value / 1048576:.2f} MiB"
+    return f"{value:.1f}"
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def open_fds() -> Optional[int]:
+    """Number of open file descriptors (sockets included), where /proc is available."""
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+def trend(values: List[float]) -> Tuple[float, float]:
+    """Mann-Kendall z statistic and Sen's slope of a series."""
+    count = len(values)
+    score = 0
+    slopes = []
+    for i in range(count - 1):
+        for j in range(i + 1, count):
+            difference = values[j] - values[i]
+            score += (difference > 0) - (difference < 0)
+            slopes.append(difference / (j - i))
+    variance = count * (count - 1) * (2 * count + 5) / 18
+    if score == 0 or variance == 0:
+        z = 0.0
+    else:
+        z = (score - math.copysign(1, score)) / math.sqrt(variance)
+    return z, statistics.median(slopes) if slopes else 0.0
+
+
+def detect_drift(
+    series: str,
+    values: List[float],
+    min_windows: int,
+    min_change: float,
+    absolute: bool = False
+) -> Optional[Drift]:
+    """
+    Flag a significant upward trend whose total growth over the run is at
+    least min_change of the series median, or min_change itself when absolute.
+    """
+    if len(values) < min_windows:
+        return None
+    z, slope = trend(values)
+    growth = slope * (len(values) - 1)
+    threshold = min_change if absolute else min_change * abs(statistics.median(values))
+    if z < _TREND_Z or growth <= 0 or growth < threshold:
+        return None
+    return Drift(series, values[0], values[-1], slope, z)
+
+
+def _top_allocators() -> Dict[str, int]:
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    ))
+    return {
+        f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}": stat.size
+        for stat in snapshot.statistics("lineno")[:_TOP_ALLOCATORS * 2]
+    }
+
+
+class SoakRunner(LoadRunner):
+    """Closed-loop load run sampled per time window with drift detection."""
+
+    def __init__(self, items: List[Any], config: SoakConfig):
+        super().__init__(items, LoadConfig(
+            concurrency=config.concurrency,
+            duration=config.duration,
+            iterations=config.iterations,
+            seed=config.seed
+        ))
+        self.soak_config = config
+        self.windows: List[SoakWindow] = []
+        self.endpoint_totals = MetricsRecorder()
+        self.scenario_totals = MetricsRecorder()
+        self._window_started = 0.0
+
+    def _sample(self):
+        now = time.perf_counter()
+        endpoints = request_metrics.drain()
+        scenarios = self.scenario_metrics.drain()
+        self.endpoint_totals.add(endpoints)
+        self.scenario_totals.add(scenarios)
+
+        latency = LatencyHistogram()
+        for stats in endpoints.values():
+            latency.merge(stats.histogram)
+        tracing = tracemalloc.is_tracing()
+
+        self.windows.append(SoakWindow(
+            index=len(self.windows),
+            seconds=now - self._window_started,
+            iterations=sum(stats.histogram.count for stats in scenarios.values()),
+            errors=sum(stats.errors for stats in scenarios.values()),
+            requests=latency.count,
+            p50_ms=latency.percentile(50) * 1000,
+            p95_ms=latency.percentile(95) * 1000,
+            p99_ms=latency.percentile(99) * 1000,
+            rss_bytes=current_rss(),
+            open_fds=open_fds(),
+            traced_bytes=tracemalloc.get_traced_memory()[0] if tracing else 0,
+            allocators=_top_allocators() if tracing else {}
+        ))
+        self._window_started = now
+
+    def _sample_until(self, stop: threading.Event):
+        # Windows end on fixed boundaries so the time spent taking a
+        # tracemalloc snapshot does not stretch the next window.
+        boundary = self._window_started
+        while True:
+            boundary += self.soak_config.window
+            if stop.wait(max(0.0, boundary - time.perf_counter())):
+                return
+            self._sample()
+
+    def _drifts(self) -> List[Drift]:
+        # The first window pays for connection set-up and lazy imports, and a
+        # short trailing window is too noisy; both are reported but not trended.
+        windows = [window for window in self.windows[1:] if window.seconds >= self.soak_config.window / 2]
+        series: Dict[str, List[float]] = {
+            "p50_ms": [window.p50_ms for window in windows if window.requests],
+            "p95_ms": [window.p95_ms for window in windows if window.requests],
+            "p99_ms": [window.p99_ms for window in windows if window.requests],
+            "error_rate": [window.error_rate for window in windows if window.iterations],
+            "rss_bytes": [float(window.rss_bytes) for window in windows],
+        }
+        if windows and windows[-1].open_fds is not None:
+            series["open_fds"] = [float(window.open_fds or 0) for window in windows]
+        if windows and self.soak_config.trace_allocations:
+            series["traced_bytes"] = [float(window.traced_bytes) for window in windows]
+            final = sorted(windows[-1].allocators.items(), key=lambda entry: entry[1], reverse=True)
+            for location, _ in final[:_TOP_ALLOCATORS]:
+                series[f"alloc {location}"] = [float(window.allocators.get(location, 0)) for window in windows]
+
+        drifts = []
+        config = self.soak_config
+        for name, values in series.items():
+            if name == "error_rate":
+                drift = detect_drift(name, values, config.drift_windows, config.drift_min_error_rate, absolute=True)
+            else:
+                drift = detect_drift(name, values, config.drift_windows, config.drift_min_change)
+            if drift is not None:
+                drifts.append(drift)
+        return drifts
+
+    def run(self) -> SoakReport:
+        """Run the soak test and return the windows and any drift found."""
+        request_metrics.reset()
+        started_tracing = self.soak_config.trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        start = self._window_started = time.perf_counter()
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample_until, args=(stop,), name="soak-sampler", daemon=True)
+        sampler.start()
+        try:
+            if self.items:
+                self._closed_loop(start + self.soak_config.duration)
+        finally:
+            stop.set()
+            sampler.join()
+            self._sample()
+            try:
+                self.resolver.close()
+            finally:
+                self.endpoint_totals.add(request_metrics.drain())
+                if started_tracing:
+                    tracemalloc.stop()
+
+        return SoakReport(
+            mode="soak",
+            elapsed=time.perf_counter() - start,
+            scenarios=self.scenario_totals.snapshot(),
+            endpoints=self.endpoint_totals.snapshot(),
+            windows=self.windows,
+            drifts=self._drifts()
+        )
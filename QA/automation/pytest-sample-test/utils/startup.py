@@ -0,0 +1,87 @@
+"""
+Start-up profile of a harness process.
+
+Measures the time from the process being spawned to the end of test
+collection, split into phases: interpreter and plugin start-up, the
+conftest import, pytest_configure and collection, with the number of
+modules each phase imported and the time spent collecting (importing)
+each test module. Every xdist worker pays this cost before it sends its
+first request. ``python -X importtime`` breaks a phase down further.
+"""
+import os
+import sys
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, Optional
+
+
+PLUGINS = "interpreter + plugins"
+CONFTEST = "conftest"
+CONFIGURE = "configure"
+COLLECTION = "collection"
+PHASES = (PLUGINS, CONFTEST, CONFIGURE, COLLECTION)
+
+
+def process_start_time() -> Optional[float]:
+    """Wall-clock time this process was spawned, where /proc is available."""
+    try:
+        with open("/proc/self/stat") as stat_file:
+            # The command name in field 2 may contain spaces; fields after it are safe to split.
+            fields = stat_file.read().rpartition(")")[2].split()
+        started_ticks = int(fields[19])
+        since_boot = time.clock_gettime(time.CLOCK_BOOTTIME)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return time.time() - (since_boot - started_ticks / os.sysconf("SC_CLK_TCK"))
+
+
+@dataclass
+class StartupProfile:
+    """Seconds and imported module counts per start-up phase of one process."""
+    phases: Dict[str, float] = field(default_factory=dict)
+    modules: Dict[str, int] = field(default_factory=dict)
+    test_modules: Dict[str, float] = field(default_factory=dict)
+    started: float = 0.0
+    ready: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class StartupProfiler:
+    """
+    Closes one phase per mark(). Created when utils.startup is first
+    imported, which conftest does before anything else.
+    """
+
+    def __init__(self):
+        now = time.time()
+        self.profile = StartupProfile(started=now)
+        self._marked = now
+        self._module_count = len(sys.modules)
+        started = process_start_time()
+        if started is not None and started < now:
+            self.profile.started = started
+            self.profile.phases[PLUGINS] = now - started
+            self.profile.modules[PLUGINS] = self._module_count
+
+    def mark(self, phase: str):
+        """End the given phase now."""
+        now = time.time()
+        modules = len(sys.modules)
+        self.profile.phases[phase] = self.profile.phases.get(phase, 0.0) + now - self._marked
+        self.profile.modules[phase] = self.profile.modules.get(phase, 0) + modules - self._module_count
+        self._marked = now
+        self._module_count = modules
+        self.profile.ready = now
+
+    def add_test_module(self, path: str, seconds: float):
+        """Record how long collecting (and so importing) one test module took."""
+        self.profile.test_modules[path] = seconds
+
+
+startup_profiler = StartupProfiler()
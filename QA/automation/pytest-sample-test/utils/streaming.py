@@ -0,0 +1,93 @@
+"""
+Incremental parsing of JSON array bodies.
+
+Elements are decoded one at a time from a stream of byte chunks, so
+memory stays bounded by the largest element rather than the whole list.
+"""
+import codecs
+import json
+from typing import Any, Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class _Buffer:
+    """Decoded text window over a stream of byte chunks."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk, dropping already consumed text. False at end of stream."""
+        if self.exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            tail = self._decoder.decode(b"", final=True)
+        else:
+            tail = self._decoder.decode(chunk)
+        self.text = self.text[self.pos:] + tail
+        self.pos = 0
+        return True
+
+    def skip_whitespace(self) -> bool:
+        """Advance to the next significant character. False at end of stream."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return True
+            if not self.fill():
+                return False
+
+    def expect(self, characters: str) -> str:
+        if not self.skip_whitespace():
+            raise ValueError("Unexpected end of JSON array")
+        found = self.text[self.pos]
+        if found not in characters:
+            raise ValueError(f"Expected one of {characters!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+        return found
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a JSON array read from byte chunks."""
+    decoder = json.JSONDecoder()
+    buffer = _Buffer(chunks)
+
+    if not buffer.skip_whitespace() or buffer.text[buffer.pos] != "[":
+        raise ValueError("Response body is not a JSON array")
+    buffer.pos += 1
+
+    if not buffer.skip_whitespace():
+        raise ValueError("Unexpected end of JSON array")
+    if buffer.text[buffer.pos] == "]":
+        return
+
+    while True:
+        if not buffer.skip_whitespace():
+            raise ValueError("Unexpected end of JSON array")
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer.text, buffer.pos)
+            except json.JSONDecodeError:
+                if not buffer.fill():
+                    raise
+                continue
+            # A number cut at the buffer edge ("12" of "12.5") decodes
+            # cleanly, so only accept an element once its delimiter is in.
+            if not buffer.exhausted and (end == len(buffer.text) or buffer.text[end] not in _DELIMITERS):
+                buffer.fill()
+                continue
+            break
+
+        buffer.pos = end
+        yield item
+        if buffer.expect(",]") == "]":
+            return
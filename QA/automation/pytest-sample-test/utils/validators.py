@@ -1,7 +1,10 @@
 """
 Validation helpers for API responses.
 """
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable, Iterable
+
+from utils.schemas import model_schema
 
 
 def validate_pet_structure(data: Dict[str, Any]) -> bool:
@@ -30,3 +33,112 @@ def validate_list_response(data: Any, min_items: int = 0) -> bool:
 def validate_id_field(data: Dict[str, Any], field_name: str = "id") -> bool:
     """Validate that ID field exists and is valid."""
     return field_name in data and isinstance(data[field_name], (int, str)) and data[field_name] is not None
+
+
+class SchemaValidator:
+    """
+    Compiled JSON-Schema validator for one Petstore model.
+    
+    Uses fastjsonschema when installed, which compiles the schema to
+    Python code, and falls back to jsonschema otherwise.
+    """
+    
+    def __init__(self, model: str):
+        self.model = model
+        self._check_one = _compile(model_schema(model))
+        self._check_many = _compile(model_schema(model, many=True))
+    
+    def error(self, data: Any) -> Optional[str]:
+        """Return the first schema violation in data, or None when valid."""
+        return self._check_one(data)
+    
+    def error_many(self, items: Any) -> Optional[str]:
+        """Return the first schema violation in a list of items, checked in one pass."""
+        return self._check_many(items)
+    
+    def error_stream(self, items: Iterable[Any]) -> Optional[str]:
+        """
+        Check items one at a time as they arrive and return the first
+        violation, prefixed with its index. Stops consuming on failure.
+        """
+        for index, item in enumerate(items):
+            error = self._check_one(item)
+            if error is not None:
+                return f"item {index}: {error}"
+        return None
+    
+    def validate(self, data: Any) -> bool:
+        """Check that data matches the model schema."""
+        return self.error(data) is None
+    
+    def validate_many(self, items: Any) -> bool:
+        """Check that items is a list whose every element matches the model schema."""
+        return self.error_many(items) is None
+    
+    def validate_stream(self, items: Iterable[Any]) -> bool:
+        """Check that every element of an item stream matches the model schema."""
+        return self.error_stream(items) is None
+    
+    def assert_valid(self, data: Any, many: bool = False):
+        """Raise AssertionError describing the first schema violation."""
+        error = self.error_many(data) if many else self.error(data)
+        if error is not None:
+            kind = f"list of {self.model}" if many else self.model
+            raise AssertionError(f"Response does not match {kind} schema: {error}")
+    
+    def assert_valid_stream(self, items: Iterable[Any]):
+        """Raise AssertionError on the first streamed element that violates the schema."""
+        error = self.error_stream(items)
+        if error is not None:
+            raise AssertionError(f"Response does not match list of {self.model} schema: {error}")
+
+
+def _compile(schema: Dict[str, Any]) -> Callable[[Any], Optional[str]]:
+    try:
+        import fastjsonschema
+    except ImportError:
+        fastjsonschema = None
+    
+    if fastjsonschema is not None:
+        check = fastjsonschema.compile(schema)
+        
+        def _fast(data: Any) -> Optional[str]:
+            try:
+                check(data)
+            except fastjsonschema.JsonSchemaException as exc:
+                return exc.message
+            return None
+        
+        return _fast
+    
+    from jsonschema import validators
+    validator_class = validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    validator = validator_class(schema)
+    
+    def _slow(data: Any) -> Optional[str]:
+        error = next(validator.iter_errors(data), None)
+        return None if error is None else f"{error.json_path}: {error.message}"
+    
+    return _slow
+
+
+@lru_cache(maxsize=None)
+def get_schema_validator(model: str) -> SchemaValidator:
+    """Return the process-wide compiled validator for a model."""
+    return SchemaValidator(model)
+
+
+def validate_pet_schema(data: Any) -> bool:
+    """Validate pet data against the Pet schema."""
+    return get_schema_validator("Pet").validate(data)
+
+
+def validate_order_schema(data: Any) -> bool:
+    """Validate order data against the Order schema."""
+    return get_schema_validator("Order").validate(data)
+
+
+def validate_user_schema(data: Any) -> bool:
+    """Validate user data against the User schema."""
+    return get_schema_validator("User").validate(data)
@@ -0,0 +1,117 @@
+"""
+Readiness gate and connection pre-warm run once per session.
+
+Readiness is polled with exponential backoff instead of a fixed sleep.
+Once the API answers, the session's pool is filled with open connections
+and each endpoint family is called a few times, so DNS, TCP connects and
+server-side warm-up are paid before the first test. Warm-up requests
+bypass ``make_*_request`` and never show up in the latency percentiles.
+"""
+import time
+from dataclasses import dataclass, asdict, field
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import requests
+
+
+# Statuses that count as ready unless the caller passes its own.
+READY_STATUSES: Tuple[int, ...] = tuple(range(200, 300))
+
+# Read-only calls that exercise each endpoint family without creating data.
+WARMUP_ENDPOINTS: Tuple[Tuple[str, str, Optional[Dict[str, str]]], ...] = (
+    ("pet", "/pet/findByStatus", {"status": "available"}),
+    ("store", "/store/inventory", None),
+    ("user", "/user/logout", None),
+)
+
+
+class APINotReady(Exception):
+    """Raised when the API does not answer within the readiness timeout."""
+
+
+@dataclass
+class WarmupReport:
+    """What the session-start phase did and how long it took."""
+    ready_seconds: float = 0.0
+    attempts: int = 0
+    connections: int = 0
+    requests: int = 0
+    warmup_seconds: float = 0.0
+    families: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def wait_until_ready(
+    url: str,
+    timeout: float,
+    initial_delay: float = 0.1,
+    max_delay: float = 2.0,
+    report: Optional[WarmupReport] = None,
+    ready_statuses: Iterable[int] = READY_STATUSES
+) -> WarmupReport:
+    """
+    Poll url until it answers with one of ready_statuses (any 2xx by
+    default), backing off exponentially between attempts. Raises
+    APINotReady after timeout seconds.
+    """
+    report = report or WarmupReport()
+    ready_statuses = frozenset(ready_statuses)
+    start = time.monotonic()
+    delay = initial_delay
+    last_error = "no attempt made"
+    while True:
+        report.attempts += 1
+        try:
+            response = requests.get(url, timeout=(min(1.0, timeout), 5.0))
+            if response.status_code in ready_statuses:
+                report.ready_seconds = time.monotonic() - start
+                return report
+            last_error = f"status {response.status_code}"
+        except requests.RequestException as exc:
+            last_error = str(exc)
+
+        remaining = timeout - (time.monotonic() - start)
+        if remaining <= 0:
+            raise APINotReady(f"{url} not ready after {timeout:.0f}s and {report.attempts} attempts: {last_error}")
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max_delay)
+
+
+def prewarm(
+    session: requests.Session,
+    base_url: str,
+    connections: int,
+    rounds: int,
+    report: Optional[WarmupReport] = None
+) -> WarmupReport:
+    """
+    Open up to ``connections`` pooled connections and call every endpoint
+    family ``rounds`` times on the session.
+    """
+    report = report or WarmupReport()
+    start = time.monotonic()
+
+    # Streamed responses hold their connection until read, so each
+    # request in this loop has to open a new one.
+    held: List[requests.Response] = []
+    try:
+        for index in range(connections):
+            _, path, params = WARMUP_ENDPOINTS[index % len(WARMUP_ENDPOINTS)]
+            held.append(session.get(f"{base_url}{path}", params=params, stream=True))
+    finally:
+        for response in held:
+            response.content
+        report.connections += len(held)
+        report.requests += len(held)
+
+    for _ in range(rounds):
+        for family, path, params in WARMUP_ENDPOINTS:
+            family_start = time.monotonic()
+            session.get(f"{base_url}{path}", params=params).content
+            report.families[family] = report.families.get(family, 0.0) + time.monotonic() - family_start
+            report.requests += 1
+
+    report.warmup_seconds += time.monotonic() - start
+    return report